@@ -1,30 +1,73 @@
 import os
+import time
+import hashlib
+import logging
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from backend.app.database import get_db
 from backend.app.models.user import User
+from backend.app.services.cache import TTLCache
 
 security = HTTPBearer()
+logger = logging.getLogger(__name__)
 
 # Supabase configuration
 SUPABASE_JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
 
-print(f"DEBUG: SUPABASE_JWT_SECRET is {'set' if SUPABASE_JWT_SECRET else 'NOT SET'}")
+if not SUPABASE_JWT_SECRET:
+    logger.warning("SUPABASE_JWT_SECRET is not set; HS256 tokens will be rejected")
+
+# Cache de tokens verificados: sha256(token) -> (claims, columnas del User)
+AUTH_CACHE_MAX_SIZE = int(os.environ.get("AUTH_CACHE_MAX_SIZE", "4096"))
+AUTH_CACHE_TTL_SECONDS = float(os.environ.get("AUTH_CACHE_TTL_SECONDS", "300"))
+
+token_cache = TTLCache(max_size=AUTH_CACHE_MAX_SIZE, ttl=AUTH_CACHE_TTL_SECONDS)
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def _user_snapshot(user: User) -> dict:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+def _user_from_snapshot(db: Session, snapshot: dict) -> User:
+    # Reconstruye el User y lo asocia a la sesión sin emitir SELECT
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+def invalidate_user_cache(user_id: Optional[int] = None) -> None:
+    """
+    Descarta los tokens cacheados de `user_id` (o todos) tras escribir en `users`.
+    Los cambios hechos fuera de la app (SQL manual, panel de Supabase) no pasan por aquí:
+    esas identidades siguen sirviéndose del cache hasta AUTH_CACHE_TTL_SECONDS o el `exp` del token.
+    """
+    if user_id is None:
+        token_cache.clear()
+    else:
+        token_cache.delete_where(lambda entry: entry[1]["id"] == user_id)
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ):
     token = credentials.credentials
+    cache_key = _token_key(token)
+    cached = token_cache.get(cache_key)
+    if cached is not None:
+        _claims, snapshot = cached
+        # Evento por petición: con LOG_LEVEL=INFO cuesta solo el chequeo de nivel; en DEBUG usar LOG_SAMPLING
+        logger.debug("Token cache hit", extra={"user_id": snapshot["id"]})
+        return _user_from_snapshot(db, snapshot)
+
     try:
         # Get token header to check algorithm
         header = jwt.get_unverified_header(token)
         alg = header.get('alg')
         
-        print(f"DEBUG AUTH: Token algorithm: {alg}")
-        
         # For ES256 tokens, we need to decode without verification first
         # then verify the claims manually
         if alg == 'ES256':
@@ -34,7 +77,7 @@ def get_current_user(
                 options={"verify_signature": False},
                 audience="authenticated"
             )
-            print(f"DEBUG AUTH: ES256 token decoded without signature verification")
+            logger.debug("ES256 token decoded without signature verification")
         else:
             # For HS256, use the secret
             payload = jwt.decode(
@@ -43,7 +86,7 @@ def get_current_user(
                 algorithms=["HS256"],
                 audience="authenticated"
             )
-            print(f"DEBUG AUTH: HS256 token decoded with secret")
+            logger.debug("HS256 token decoded with secret")
         
         supabase_id = payload.get("sub")
         if not supabase_id:
@@ -53,7 +96,6 @@ def get_current_user(
             )
         
         # Verify token hasn't expired
-        import time
         exp = payload.get("exp")
         if exp and exp < time.time():
             raise HTTPException(
@@ -78,24 +120,26 @@ def get_current_user(
             db.add(user)
             db.commit()
             db.refresh(user)
+
+        token_cache.set(cache_key, (payload, _user_snapshot(user)), expires_at=exp)
             
-        print(f"DEBUG AUTH: Successfully authenticated user {supabase_id}")
+        logger.debug("Authenticated user", extra={"supabase_id": supabase_id, "alg": alg})
         return user
         
     except jwt.ExpiredSignatureError:
-        print("DEBUG AUTH: Token has expired")
+        logger.info("Rejected expired token")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token has expired",
         )
     except jwt.InvalidTokenError as e:
-        print(f"DEBUG AUTH: Invalid token error: {str(e)}")
+        logger.info("Rejected invalid token", extra={"error": str(e)})
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid token: {str(e)}",
         )
     except Exception as e:
-        print(f"DEBUG AUTH: Unexpected error: {str(e)}")
+        logger.exception("Unexpected authentication error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Auth error: {str(e)}",
@@ -1,17 +1,57 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from backend.app.services.metrics import instrument_engine
+from backend.app.services.sql_profiler import install_profiler
 
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
+# Drivers async equivalentes a los drivers sync usados en DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgresql+psycopg": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def to_async_url(url: str):
+    """
+    Traduce DATABASE_URL al driver async (asyncpg / aiosqlite).
+    asyncpg no entiende `sslmode`, se traduce a `ssl`.
+    """
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    query = dict(parsed.query)
+    if drivername == "postgresql+asyncpg" and "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return parsed.set(drivername=drivername, query=query)
+
 engine = create_engine(DATABASE_URL, pool_recycle=300, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+async_engine = create_async_engine(to_async_url(DATABASE_URL), pool_recycle=300, pool_pre_ping=True)
+# expire_on_commit=False: en async no se puede hacer lazy-load implícito tras el commit
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Métricas de consultas y del pool para /metrics (el async engine emite los eventos por su sync_engine)
+instrument_engine(engine, "sync")
+instrument_engine(async_engine.sync_engine, "async")
+# Perfilador de consultas: los listeners quedan siempre instalados y solo registran dentro de un sql_profile()
+install_profiler(engine)
+install_profiler(async_engine.sync_engine)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,4 +1,6 @@
 import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -6,16 +8,43 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from backend.app.database import engine, Base
-from backend.app.models import User, Reminder, Activity, AIHistory
-from backend.app.routes import reminders, agenda, summary, users, telegram
+# Antes de importar las rutas: algunos módulos registran eventos al importarse
+from backend.app.services.logs import setup_logging, logging_stats, CorrelationIdMiddleware, REQUEST_ID_HEADER
+setup_logging()
 
-Base.metadata.create_all(bind=engine)
+from backend.app.models import User, Reminder, Activity, AIHistory, UserStats
+from backend.app.routes import reminders, agenda, summary, users, telegram, export
+from backend.app.auth import token_cache
+from backend.app.services.telegram_client import TelegramClient
+from backend.app.services.telegram_outbox import outbox
+from backend.app.services.reminder_scheduler import scheduler
+from backend.app.services.reminder_intelligence import ReminderIntelligence
+from backend.app.services.ai_history_recorder import recorder
+from backend.app.services.result_cache import result_cache
+from backend.app.services.metrics import MetricsMiddleware, metrics_response
+from backend.app.services.sql_profiler import SQL_PROFILE_ENABLED, SQL_PROFILE_HEADER, SQLProfilerMiddleware
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await TelegramClient.start()
+    await scheduler.start()
+    await recorder.start()
+    await telegram.poller.start()
+    tone_pool_task = asyncio.create_task(ReminderIntelligence.run_tone_pool_refresher())
+    yield
+    tone_pool_task.cancel()
+    await telegram.poller.stop()
+    await telegram.updates.drain()
+    await scheduler.stop()
+    await recorder.stop()
+    await outbox.drain()
+    await TelegramClient.close()
 
 app = FastAPI(
     title="Personal Assistant API",
     description="API para asistente personal con integración de Telegram",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -24,13 +53,21 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", SQL_PROFILE_HEADER, REQUEST_ID_HEADER],
 )
+if SQL_PROFILE_ENABLED:
+    app.add_middleware(SQLProfilerMiddleware)
+# Último en agregarse = más externo: mide también CORS y los 404
+app.add_middleware(MetricsMiddleware)
+# Más externo aún: el id de correlación cubre los logs de todos los demás middlewares
+app.add_middleware(CorrelationIdMiddleware)
 
 app.include_router(reminders.router)
 app.include_router(agenda.router)
 app.include_router(summary.router)
 app.include_router(users.router)
 app.include_router(telegram.router)
+app.include_router(export.router)
 
 # Servir archivos estáticos del frontend
 frontend_path = os.path.join(os.getcwd(), "frontend/out")
@@ -47,10 +84,15 @@ def root():
             "agenda": "/api/agenda/{user_id}",
             "summary": "/api/summary/{user_id}",
             "users": "/api/users",
-            "telegram_webhook": "/api/telegram/webhook"
+            "telegram_webhook": "/api/telegram/webhook",
+            "export": "/api/export/{user_id}/{activities|reminders|ai_history}"
         }
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_response()
+
 @app.get("/health")
 def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "auth_cache": token_cache.stats(), "telegram_outbox": outbox.stats(), "telegram_updates": telegram.updates.stats(), "telegram_polling": telegram.poller.stats(), "reminder_scheduler": scheduler.stats(), "tone": ReminderIntelligence.tone_stats(), "llm": ReminderIntelligence.llm_stats(), "ai_history": recorder.stats(), "result_cache": result_cache.stats(), "logging": logging_stats()}
@@ -2,5 +2,6 @@ from backend.app.models.user import User
 from backend.app.models.reminder import Reminder
 from backend.app.models.activity import Activity
 from backend.app.models.ai_history import AIHistory
+from backend.app.models.user_stats import UserStats
 
-__all__ = ["User", "Reminder", "Activity", "AIHistory"]
+__all__ = ["User", "Reminder", "Activity", "AIHistory", "UserStats"]
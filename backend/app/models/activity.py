@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from backend.app.database import Base
@@ -16,3 +16,8 @@ class Activity(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="activities")
+
+    __table_args__ = (
+        Index("ix_activities_user_date", "user_id", "activity_date"),
+        Index("ix_activities_user_type", "user_id", "activity_type"),
+    )
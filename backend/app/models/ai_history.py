@@ -10,6 +10,8 @@ class AIHistory(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     prompt = Column(Text, nullable=False)
     response = Column(Text, nullable=False)
+    model = Column(String(255))
+    latency_ms = Column(Integer)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="ai_history")
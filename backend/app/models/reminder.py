@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -22,6 +22,15 @@ class Reminder(Base):
     last_reaction_status = Column(Enum(ReactionStatus), default=ReactionStatus.PENDING)
     context_metadata = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # También en el alta: el scheduler sondea updated_at para ver cambios de otros workers
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     user = relationship("User", back_populates="reminders")
+
+    __table_args__ = (
+        Index("ix_reminders_user_time", "user_id", "reminder_time"),
+        Index("ix_reminders_user_completed", "user_id", "completed"),
+        # Range scan del scheduler sobre recordatorios pendientes
+        Index("ix_reminders_pending_time", "reminder_time", postgresql_where=completed.is_(False)),
+        Index("ix_reminders_updated_at", "updated_at"),
+    )
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, BigInteger, Date, ForeignKey
+from sqlalchemy.orm import relationship
+from backend.app.database import Base
+
+class UserStats(Base):
+    """
+    Contadores por usuario mantenidos en la misma transacción que cada escritura,
+    para que el resumen no tenga que hacer count() sobre todo el historial.
+    """
+    __tablename__ = "user_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_reminders = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_reminders = Column(Integer, nullable=False, default=0, server_default="0")
+    total_activities = Column(Integer, nullable=False, default=0, server_default="0")
+    # Racha de días consecutivos con al menos un recordatorio completado
+    current_streak = Column(Integer, nullable=False, default=0, server_default="0")
+    last_completion_date = Column(Date, nullable=True)
+    # Recordatorios ignorados desde la última vez que completó uno
+    recent_failures = Column(Integer, nullable=False, default=0, server_default="0")
+    # Sube con cada escritura del usuario; los GET la usan como ETag
+    data_version = Column(BigInteger, nullable=False, default=0, server_default="0")
+    
+    user = relationship("User", back_populates="stats")
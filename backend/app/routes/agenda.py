@@ -1,25 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from backend.app.database import get_db
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Optional
+from datetime import datetime
+from backend.app.database import get_async_db
 from backend.app.models.activity import Activity
-from backend.app.schemas.schemas import ActivityCreate, ActivityResponse
+from backend.app.schemas.schemas import ActivityCreate, ActivityResponse, ActivityBatchResponse
 
 from backend.app.auth import get_current_user
 from backend.app.models.user import User
+from backend.app.services.user_stats import bump_user_stats
+from backend.app.services.batch import validate_batch
+from backend.app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_paginate, finish_page
+from backend.app.services.serialization import ACTIVITY_COLUMNS, FastJSONResponse, rows_response
+from backend.app.services.data_version import get_data_version, make_etag, not_modified, set_etag
+from backend.app.services.result_cache import result_cache
 
 router = APIRouter(prefix="/api/agenda", tags=["agenda"])
 
-@router.get("/{user_id}", response_model=List[ActivityResponse])
-def get_activities(user_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/{user_id}", response_model=List[ActivityResponse], response_class=FastJSONResponse)
+async def get_activities(
+    user_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    activity_type: Optional[str] = None,
+    unpaginated: bool = Query(False, alias="all", description="Devuelve todas las actividades sin paginar"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
     if user_id != str(current_user.id) and user_id != current_user.supabase_user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this agenda")
 
-    activities = db.query(Activity).filter(Activity.user_id == current_user.id).order_by(Activity.activity_date.desc()).all()
-    return activities
+    version = await get_data_version(db, current_user.id)
+    etag = make_etag("agenda", current_user.id, version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+
+    # Primera página: la respuesta ya serializada queda en cache hasta la próxima escritura del usuario
+    cache_key = None
+    if cursor is None and not unpaginated:
+        cache_key = result_cache.key("agenda", current_user.id, version, request)
+        hit = result_cache.get(cache_key)
+        if hit:
+            set_etag(hit, etag)
+            return hit
+
+    query = select(*ACTIVITY_COLUMNS).where(Activity.user_id == current_user.id)
+    if start is not None:
+        query = query.where(Activity.activity_date >= start)
+    if end is not None:
+        query = query.where(Activity.activity_date < end)
+    if activity_type is not None:
+        query = query.where(Activity.activity_type == activity_type)
+
+    # Paginación keyset por (activity_date, id) descendente; `all=true` conserva el listado completo
+    if unpaginated:
+        result = await db.execute(query.order_by(Activity.activity_date.desc()))
+        return rows_response(result.all(), response)
+    result = await db.execute(keyset_paginate(query, Activity.activity_date, Activity.id, cursor, limit, descending=True))
+    page = rows_response(finish_page(result.all(), limit, response, "activity_date"), response)
+    if cache_key:
+        result_cache.set(cache_key, current_user.id, page, (NEXT_CURSOR_HEADER,))
+    return page
 
 @router.post("/{user_id}", response_model=ActivityResponse)
-def create_activity(user_id: str, activity: ActivityCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_activity(user_id: str, activity: ActivityCreate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     if user_id != str(current_user.id) and user_id != current_user.supabase_user_id:
         raise HTTPException(status_code=403, detail="Not authorized to create activities for this user")
 
@@ -30,22 +81,52 @@ def create_activity(user_id: str, activity: ActivityCreate, db: Session = Depend
         activity_date=activity.activity_date
     )
     db.add(db_activity)
-    db.commit()
-    db.refresh(db_activity)
+    await bump_user_stats(db, current_user.id, activities=1)
+    await db.commit()
+    await db.refresh(db_activity)
     return db_activity
 
+@router.post("/{user_id}/batch", response_model=ActivityBatchResponse)
+async def create_activities_batch(user_id: str, items: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    """
+    Alta masiva (p. ej. un día de datos de un wearable): un solo INSERT ... RETURNING
+    con executemany en una transacción. Los elementos inválidos se devuelven en `errors`.
+    """
+    if user_id != str(current_user.id) and user_id != current_user.supabase_user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to create activities for this user")
+
+    valid, errors = validate_batch(ActivityCreate, items)
+    created = []
+    if valid:
+        result = await db.scalars(
+            insert(Activity).returning(Activity, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": current_user.id,
+                    "activity_type": activity.activity_type,
+                    "description": activity.description,
+                    "activity_date": activity.activity_date
+                } for _, activity in valid
+            ]
+        )
+        created = result.all()
+        await bump_user_stats(db, current_user.id, activities=len(created))
+        await db.commit()
+    return {"created": created, "errors": errors}
+
 @router.delete("/{user_id}/{activity_id}")
-def delete_activity(user_id: str, activity_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_activity(user_id: str, activity_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     if user_id != str(current_user.id) and user_id != current_user.supabase_user_id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this activity")
 
-    db_activity = db.query(Activity).filter(
+    db_activity = await db.scalar(select(Activity).where(
         Activity.id == activity_id,
         Activity.user_id == current_user.id
-    ).first()
+    ))
     if not db_activity:
         raise HTTPException(status_code=404, detail="Activity not found")
     
-    db.delete(db_activity)
-    db.commit()
+    await db.delete(db_activity)
+    await bump_user_stats(db, current_user.id, activities=-1)
+    await db.commit()
     return {"message": "Activity deleted successfully"}
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from backend.app.auth import get_current_user
+from backend.app.models.user import User
+from backend.app.services.export import EXPORTS, FORMATS, stream_export
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+@router.get("/{user_id}/{kind}")
+def export_records(
+    user_id: str,
+    kind: str,
+    format: str = Query("ndjson", description="ndjson o csv"),
+    gzip: bool = Query(False, description="Comprime la respuesta con gzip"),
+    current_user: User = Depends(get_current_user)
+):
+    if user_id != str(current_user.id) and user_id != current_user.supabase_user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to export this data")
+    if kind not in EXPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {kind}")
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+
+    # Con gzip se entrega un archivo .gz, no una codificación de transporte: con Content-Encoding
+    # el cliente lo descomprimiría y guardaría texto plano con nombre .gz
+    filename = f"{kind}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_export(kind, format, compress=gzip, user_id=current_user.id),
+        media_type="application/gzip" if gzip else FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
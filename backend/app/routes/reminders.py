@@ -1,38 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from backend.app.database import get_db
-from backend.app.models.reminder import Reminder
-from backend.app.schemas.schemas import ReminderCreate, ReminderUpdate, ReminderResponse
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Optional
+from datetime import datetime
+from backend.app.database import get_async_db
+from backend.app.models.reminder import Reminder, ReactionStatus
+from backend.app.schemas.schemas import ReminderCreate, ReminderUpdate, ReminderResponse, ReminderBatchResponse
 from backend.app.auth import get_current_user
 from backend.app.models.user import User
+from backend.app.services.reminder_scheduler import scheduler
+from backend.app.services.user_stats import bump_user_stats
+from backend.app.services.streaks import record_completion, record_failure
+from backend.app.services.batch import validate_batch
+from backend.app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset_paginate, finish_page
+from backend.app.services.serialization import REMINDER_COLUMNS, FastJSONResponse, rows_response
+from backend.app.services.data_version import get_data_version, make_etag, not_modified, set_etag
+from backend.app.services.result_cache import result_cache
 
 router = APIRouter(prefix="/api/reminders", tags=["reminders"])
 
-@router.get("/{user_id}", response_model=List[ReminderResponse])
-def get_reminders(user_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/{user_id}", response_model=List[ReminderResponse], response_class=FastJSONResponse)
+async def get_reminders(
+    user_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    completed: Optional[bool] = None,
+    status: Optional[str] = None,
+    unpaginated: bool = Query(False, alias="all", description="Devuelve todos los recordatorios sin paginar"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+):
     # Verify user ownership - accept both numeric ID and Supabase UUID
     if user_id != str(current_user.id) and user_id != str(current_user.supabase_user_id):
         raise HTTPException(status_code=403, detail="Not authorized to access these reminders")
-        
-    reminders = db.query(Reminder).filter(Reminder.user_id == current_user.id).all()
-    
-    # Ensure Enum to string conversion
-    return [
-        ReminderResponse(
-            id=r.id,
-            user_id=r.user_id,
-            text=r.text,
-            reminder_time=r.reminder_time,
-            completed=r.completed,
-            last_reaction_status=r.last_reaction_status.value if hasattr(r.last_reaction_status, 'value') else str(r.last_reaction_status),
-            context_metadata=r.context_metadata,
-            created_at=r.created_at
-        ) for r in reminders
-    ]
+
+    # La versión se lee antes del listado: si cambia en medio, el siguiente GET no dará 304
+    version = await get_data_version(db, current_user.id)
+    etag = make_etag("reminders", current_user.id, version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    set_etag(response, etag)
+
+    # Primera página: la respuesta ya serializada queda en cache hasta la próxima escritura del usuario
+    cache_key = None
+    if cursor is None and not unpaginated:
+        cache_key = result_cache.key("reminders", current_user.id, version, request)
+        hit = result_cache.get(cache_key)
+        if hit:
+            set_etag(hit, etag)
+            return hit
+
+    # Solo las columnas de ReminderResponse, serializadas sin pasar por el ORM ni pydantic
+    query = select(*REMINDER_COLUMNS).where(Reminder.user_id == current_user.id)
+    if start is not None:
+        query = query.where(Reminder.reminder_time >= start)
+    if end is not None:
+        query = query.where(Reminder.reminder_time < end)
+    if completed is not None:
+        query = query.where(Reminder.completed == completed)
+    if status is not None:
+        try:
+            query = query.where(Reminder.last_reaction_status == ReactionStatus(status))
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid status: {status}")
+
+    # Paginación keyset por (reminder_time, id); `all=true` conserva el listado completo
+    if unpaginated:
+        result = await db.execute(query.order_by(Reminder.reminder_time, Reminder.id))
+        reminders = result.all()
+    else:
+        result = await db.execute(keyset_paginate(query, Reminder.reminder_time, Reminder.id, cursor, limit))
+        reminders = finish_page(result.all(), limit, response, "reminder_time")
+    page = rows_response(reminders, response)
+    if cache_key:
+        result_cache.set(cache_key, current_user.id, page, (NEXT_CURSOR_HEADER,))
+    return page
 
 @router.post("/{user_id}", response_model=ReminderResponse)
-def create_reminder(user_id: str, reminder: ReminderCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_reminder(user_id: str, reminder: ReminderCreate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     # Accept either the numeric ID or the Supabase UUID
     if user_id != str(current_user.id) and user_id != str(current_user.supabase_user_id):
         raise HTTPException(status_code=403, detail="Not authorized to create reminders for this user")
@@ -44,8 +94,10 @@ def create_reminder(user_id: str, reminder: ReminderCreate, db: Session = Depend
         last_reaction_status="pending" # Ensure it matches Enum
     )
     db.add(db_reminder)
-    db.commit()
-    db.refresh(db_reminder)
+    await bump_user_stats(db, current_user.id, reminders=1)
+    await db.commit()
+    await db.refresh(db_reminder)
+    scheduler.track(db_reminder)
     
     # Manual mapping to ensure Enum to string conversion for Pydantic
     return ReminderResponse(
@@ -59,19 +111,67 @@ def create_reminder(user_id: str, reminder: ReminderCreate, db: Session = Depend
         created_at=db_reminder.created_at
     )
 
+@router.post("/{user_id}/batch", response_model=ReminderBatchResponse)
+async def create_reminders_batch(user_id: str, items: List[Any] = Body(...), db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    """
+    Alta masiva (p. ej. importar un plan de hábitos): un solo INSERT ... RETURNING
+    con executemany en una transacción. Los elementos inválidos se devuelven en `errors`.
+    """
+    if user_id != str(current_user.id) and user_id != str(current_user.supabase_user_id):
+        raise HTTPException(status_code=403, detail="Not authorized to create reminders for this user")
+
+    valid, errors = validate_batch(ReminderCreate, items)
+    created = []
+    if valid:
+        result = await db.scalars(
+            insert(Reminder).returning(Reminder, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": current_user.id,
+                    "text": reminder.text,
+                    "reminder_time": reminder.reminder_time,
+                    "last_reaction_status": ReactionStatus.PENDING
+                } for _, reminder in valid
+            ]
+        )
+        created = result.all()
+        await bump_user_stats(db, current_user.id, reminders=len(created))
+        await db.commit()
+        for db_reminder in created:
+            scheduler.track(db_reminder)
+
+    return {
+        "created": [
+            ReminderResponse(
+                id=r.id,
+                user_id=r.user_id,
+                text=r.text,
+                reminder_time=r.reminder_time,
+                completed=r.completed,
+                last_reaction_status=r.last_reaction_status.value if hasattr(r.last_reaction_status, 'value') else str(r.last_reaction_status),
+                context_metadata=r.context_metadata,
+                created_at=r.created_at
+            ) for r in created
+        ],
+        "errors": errors
+    }
+
 @router.put("/{user_id}/{reminder_id}", response_model=ReminderResponse)
-def update_reminder(user_id: str, reminder_id: int, reminder: ReminderUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def update_reminder(user_id: str, reminder_id: int, reminder: ReminderUpdate, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     # Accept either the numeric ID or the Supabase UUID
     if user_id != str(current_user.id) and user_id != str(current_user.supabase_user_id):
         raise HTTPException(status_code=403, detail="Not authorized to update this reminder")
 
-    db_reminder = db.query(Reminder).filter(
+    # FOR UPDATE: el delta de `completed` depende del valor anterior
+    db_reminder = await db.scalar(select(Reminder).where(
         Reminder.id == reminder_id, 
         Reminder.user_id == current_user.id
-    ).first()
+    ).with_for_update())
     if not db_reminder:
         raise HTTPException(status_code=404, detail="Reminder not found")
     
+    was_completed = bool(db_reminder.completed)
+    was_ignored = db_reminder.last_reaction_status == ReactionStatus.IGNORED
     if reminder.text is not None:
         db_reminder.text = reminder.text
     if reminder.reminder_time is not None:
@@ -81,8 +181,14 @@ def update_reminder(user_id: str, reminder_id: int, reminder: ReminderUpdate, db
     if reminder.last_reaction_status is not None:
         db_reminder.last_reaction_status = reminder.last_reaction_status
     
-    db.commit()
-    db.refresh(db_reminder)
+    await bump_user_stats(db, current_user.id, completed=int(bool(db_reminder.completed)) - int(was_completed))
+    if db_reminder.completed and not was_completed:
+        await record_completion(db, current_user.id)
+    elif db_reminder.last_reaction_status == ReactionStatus.IGNORED and not was_ignored:
+        await record_failure(db, current_user.id)
+    await db.commit()
+    await db.refresh(db_reminder)
+    scheduler.track(db_reminder)
     
     return ReminderResponse(
         id=db_reminder.id,
@@ -96,18 +202,20 @@ def update_reminder(user_id: str, reminder_id: int, reminder: ReminderUpdate, db
     )
 
 @router.delete("/{user_id}/{reminder_id}")
-def delete_reminder(user_id: str, reminder_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def delete_reminder(user_id: str, reminder_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     # Accept either the numeric ID or the Supabase UUID
     if user_id != str(current_user.id) and user_id != str(current_user.supabase_user_id):
         raise HTTPException(status_code=403, detail="Not authorized to delete this reminder")
 
-    db_reminder = db.query(Reminder).filter(
+    db_reminder = await db.scalar(select(Reminder).where(
         Reminder.id == reminder_id, 
         Reminder.user_id == current_user.id
-    ).first()
+    ))
     if not db_reminder:
         raise HTTPException(status_code=404, detail="Reminder not found")
     
-    db.delete(db_reminder)
-    db.commit()
+    await db.delete(db_reminder)
+    await bump_user_stats(db, current_user.id, reminders=-1, completed=-int(bool(db_reminder.completed)))
+    await db.commit()
+    scheduler.cancel(reminder_id)
     return {"message": "Reminder deleted successfully"}
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from backend.app.database import get_db
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import get_async_db
 from backend.app.models.reminder import Reminder
 from backend.app.models.activity import Activity
+from backend.app.models.user_stats import UserStats
 from backend.app.schemas.schemas import SummaryResponse, ActivityResponse, ReminderResponse
+from backend.app.services.data_version import get_data_version, make_etag, not_modified, set_etag
+from backend.app.services.result_cache import result_cache
 
 from backend.app.auth import get_current_user
 from backend.app.models.user import User
@@ -12,29 +16,43 @@ from fastapi import HTTPException
 router = APIRouter(prefix="/api/summary", tags=["summary"])
 
 @router.get("/{user_id}", response_model=SummaryResponse)
-def get_summary(user_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_summary(user_id: str, request: Request, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     # Verify user ownership
     if user_id != str(current_user.id) and user_id != current_user.supabase_user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this summary")
 
-    total_reminders = db.query(Reminder).filter(Reminder.user_id == current_user.id).count()
-    completed_reminders = db.query(Reminder).filter(
-        Reminder.user_id == current_user.id, 
-        Reminder.completed == True
-    ).count()
+    version = await get_data_version(db, current_user.id)
+    etag = make_etag("summary", current_user.id, version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+
+    cache_key = result_cache.key("summary", current_user.id, version, request)
+    hit = result_cache.get(cache_key)
+    if hit:
+        set_etag(hit, etag)
+        return hit
+
+    # Contadores mantenidos por las rutas de escritura (sin count() sobre el historial)
+    stats = await db.get(UserStats, current_user.id)
+    total_reminders = stats.total_reminders if stats else 0
+    completed_reminders = stats.completed_reminders if stats else 0
     pending_reminders = total_reminders - completed_reminders
+    total_activities = stats.total_activities if stats else 0
     
-    total_activities = db.query(Activity).filter(Activity.user_id == current_user.id).count()
-    
-    recent_activities = db.query(Activity).filter(
-        Activity.user_id == current_user.id
-    ).order_by(Activity.activity_date.desc()).limit(5).all()
+    recent_activities = (await db.execute(
+        select(Activity).where(
+            Activity.user_id == current_user.id
+        ).order_by(Activity.activity_date.desc()).limit(5)
+    )).scalars().all()
     
-    recent_reminders = db.query(Reminder).filter(
-        Reminder.user_id == current_user.id
-    ).order_by(Reminder.reminder_time.desc()).limit(5).all()
+    recent_reminders = (await db.execute(
+        select(Reminder).where(
+            Reminder.user_id == current_user.id
+        ).order_by(Reminder.reminder_time.desc()).limit(5)
+    )).scalars().all()
     
-    return SummaryResponse(
+    summary = SummaryResponse(
         total_reminders=total_reminders,
         completed_reminders=completed_reminders,
         pending_reminders=pending_reminders,
@@ -42,3 +60,8 @@ def get_summary(user_id: str, db: Session = Depends(get_db), current_user: User
         recent_activities=[ActivityResponse.model_validate(a) for a in recent_activities],
         recent_reminders=[ReminderResponse.model_validate(r) for r in recent_reminders]
     )
+    # Se serializa una vez aquí para poder guardar los bytes en el cache
+    result = Response(content=summary.model_dump_json(), media_type="application/json")
+    result_cache.set(cache_key, current_user.id, result)
+    set_etag(result, etag)
+    return result
@@ -1,54 +1,56 @@
 import os
 import json
 from fastapi import APIRouter, Request, HTTPException
-from sqlalchemy.orm import Session
-from backend.app.database import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.database import AsyncSessionLocal
+from backend.app.auth import invalidate_user_cache
 from backend.app.models.user import User
 from backend.app.models.reminder import Reminder, ReactionStatus
 from backend.app.models.activity import Activity
 from backend.app.services.reminder_intelligence import ReminderIntelligence
+from backend.app.services.telegram_client import TelegramClient, TELEGRAM_BOT_TOKEN
+from backend.app.services.telegram_outbox import outbox
+from backend.app.services.reminder_scheduler import scheduler
+from backend.app.services.user_stats import bump_user_stats
+from backend.app.services.streaks import record_completion, record_failure, get_streak
+from backend.app.services.telegram_updates import UpdateProcessor
+from backend.app.services.telegram_polling import TelegramPoller
+from backend.app.services.sql_profiler import SQL_PROFILE_ENABLED, sql_profile
+from backend.app.services.metrics import TELEGRAM_UPDATES_PENDING
 from datetime import datetime, timedelta
-import httpx
 
 router = APIRouter(prefix="/api/telegram", tags=["telegram"])
 
-TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
-
 async def send_telegram_message(chat_id: int, text: str, reply_markup: dict = None):
+    # Se encola y regresa de inmediato; el outbox respeta los límites de Telegram
     if not TELEGRAM_BOT_TOKEN:
         return
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
     payload = {"chat_id": chat_id, "text": text}
     if reply_markup:
         payload["reply_markup"] = reply_markup
-    async with httpx.AsyncClient() as client:
-        await client.post(url, json=payload)
+    outbox.enqueue(chat_id, "sendMessage", payload)
 
 async def answer_callback_query(callback_query_id: str, text: str = None):
     if not TELEGRAM_BOT_TOKEN:
         return
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/answerCallbackQuery"
-    async with httpx.AsyncClient() as client:
-        await client.post(url, json={"callback_query_id": callback_query_id, "text": text})
+    await TelegramClient.call("answerCallbackQuery", {"callback_query_id": callback_query_id, "text": text})
 
-def get_or_create_user(db: Session, telegram_id: str, name: str = None) -> User:
-    user = db.query(User).filter(User.telegram_id == telegram_id).first()
+async def get_or_create_user(db: AsyncSession, telegram_id: str, name: str = None) -> User:
+    user = await db.scalar(select(User).where(User.telegram_id == telegram_id))
     if not user:
         user = User(telegram_id=telegram_id, name=name)
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        invalidate_user_cache(user.id)
     return user
 
-@router.post("/webhook")
-async def telegram_webhook(request: Request):
-    try:
-        data = await request.json()
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid JSON")
-    
-    db = SessionLocal()
-    try:
+async def handle_update(data: dict):
+    """
+    Lógica del bot para un update (mensaje o reacción a un botón).
+    """
+    async with AsyncSessionLocal() as db:
         # Handle Callback Queries (Button Reactions)
         if "callback_query" in data:
             callback = data["callback_query"]
@@ -58,12 +60,14 @@ async def telegram_webhook(request: Request):
             action = data_parts[0]
             reminder_id = int(data_parts[1])
             
-            reminder = db.query(Reminder).filter(Reminder.id == reminder_id).first()
+            reminder = await db.scalar(select(Reminder).where(Reminder.id == reminder_id).with_for_update())
             if not reminder:
                 await answer_callback_query(callback_id, "Recordatorio no encontrado.")
-                return {"ok": True}
+                return
 
             if action == "done":
+                await bump_user_stats(db, reminder.user_id, completed=0 if reminder.completed else 1, activities=1)
+                await record_completion(db, reminder.user_id)
                 reminder.completed = True
                 reminder.last_reaction_status = ReactionStatus.COMPLETED
                 # Log structured activity
@@ -79,22 +83,27 @@ async def telegram_webhook(request: Request):
                 response = f"✅ ¡Excelente! He marcado '{reminder.text}' como completado."
             
             elif action == "snooze":
+                await bump_user_stats(db, reminder.user_id)
                 reminder.reminder_time = datetime.now() + timedelta(minutes=20)
                 reminder.last_reaction_status = ReactionStatus.SNOOZED
                 response = f"⏳ Entendido. Te lo recordaré en 20 minutos."
             
             elif action == "ignore":
+                await bump_user_stats(db, reminder.user_id)
+                if reminder.last_reaction_status != ReactionStatus.IGNORED:
+                    await record_failure(db, reminder.user_id)
                 reminder.last_reaction_status = ReactionStatus.IGNORED
                 response = f"⏭️ Ok, lo saltaremos por ahora."
 
-            db.commit()
+            await db.commit()
+            scheduler.track(reminder)
             await answer_callback_query(callback_id)
             await send_telegram_message(chat_id, response)
-            return {"ok": True}
+            return
 
         # Handle Regular Messages
         if "message" not in data:
-            return {"ok": True}
+            return
         
         message = data["message"]
         chat_id = message["chat"]["id"]
@@ -102,7 +111,7 @@ async def telegram_webhook(request: Request):
         user_name = message["from"].get("first_name", "User")
         text = message.get("text", "")
         
-        user = get_or_create_user(db, telegram_id, user_name)
+        user = await get_or_create_user(db, telegram_id, user_name)
         
         if text.startswith("/start"):
             response = f"Hola {user_name}! Soy Tonalli AI. Mi objetivo es ayudarte a mantener tus hábitos.\n" \
@@ -112,10 +121,10 @@ async def telegram_webhook(request: Request):
                       f"/help - Ver ayuda"
         
         elif text.startswith("/reminders"):
-            reminders = db.query(Reminder).filter(
+            reminders = (await db.execute(select(Reminder).where(
                 Reminder.user_id == user.id,
                 Reminder.completed == False
-            ).all()
+            ))).scalars().all()
             if reminders:
                 response = "Tus recordatorios pendientes:\n"
                 for r in reminders:
@@ -128,8 +137,8 @@ async def telegram_webhook(request: Request):
             reminder_text = text[5:].strip()
             if reminder_text:
                 # Get dynamic tone
-                streak = len(db.query(Activity).filter(Activity.user_id == user.id, Activity.activity_type == "completed_reminder").all())
-                tone = await ReminderIntelligence.get_dynamic_tone(streak, 0, reminder_text)
+                streak, failures = await get_streak(db, user.id)
+                tone = await ReminderIntelligence.get_dynamic_tone(streak, failures, reminder_text, user_id=user.id)
                 
                 reminder = Reminder(
                     user_id=user.id,
@@ -138,20 +147,12 @@ async def telegram_webhook(request: Request):
                     context_metadata={"initial_tone": tone}
                 )
                 db.add(reminder)
-                db.commit()
+                await bump_user_stats(db, user.id, reminders=1)
+                await db.commit()
+                # Los botones de reacción los envía el scheduler a la hora del recordatorio
+                scheduler.track(reminder)
                 
                 response = f"¡Listo! Recordatorio agregado: {reminder_text}\n\n{tone}"
-                
-                # Setup buttons for the 'reaction' (this would usually be sent later by a worker)
-                reply_markup = {
-                    "inline_keyboard": [[
-                        {"text": "✅ Hecho", "callback_data": f"done:{reminder.id}"},
-                        {"text": "⏳ +20m", "callback_data": f"snooze:{reminder.id}"},
-                        {"text": "⏭️ Ignorar", "callback_data": f"ignore:{reminder.id}"}
-                    ]]
-                }
-                await send_telegram_message(chat_id, response, reply_markup)
-                return {"ok": True}
             else:
                 response = "Por favor proporciona el texto del recordatorio. Uso: /add <texto>"
         
@@ -166,10 +167,35 @@ async def telegram_webhook(request: Request):
             response = "Comando no reconocido. Usa /help para ver los comandos disponibles."
         
         await send_telegram_message(chat_id, response)
-        
-    finally:
-        db.close()
-    
+
+def update_label(data: dict) -> str:
+    # Agrupa los perfiles SQL por comando (/reminders, /add) o acción del botón
+    if "callback_query" in data:
+        return "telegram callback " + data["callback_query"].get("data", "").split(":")[0]
+    text = (data.get("message") or {}).get("text") or ""
+    return "telegram " + (text.split()[0] if text.strip() else "message")
+
+async def profiled_update(data: dict):
+    with sql_profile(update_label(data)):
+        await handle_update(data)
+
+updates = UpdateProcessor(profiled_update if SQL_PROFILE_ENABLED else handle_update)
+TELEGRAM_UPDATES_PENDING.set_function(lambda: updates.pending)
+poller = TelegramPoller(updates)
+
+@router.post("/webhook")
+async def telegram_webhook(request: Request):
+    try:
+        data = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
+    if not isinstance(data, dict) or not isinstance(data.get("update_id"), int):
+        raise HTTPException(status_code=400, detail="Invalid update")
+
+    # Se confirma de inmediato para que Telegram no reenvíe; el proceso sigue en segundo plano
+    if not updates.submit(data) and not updates.is_duplicate(data["update_id"]):
+        # Cola llena: Telegram reintentará más tarde
+        raise HTTPException(status_code=503, detail="Update queue full")
     return {"ok": True}
 
 @router.get("/set-webhook")
@@ -182,8 +208,6 @@ async def set_webhook():
         return {"error": "REPLIT_DEV_DOMAIN not found"}
     
     webhook_url = f"https://{replit_url}/api/telegram/webhook"
-    telegram_url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/setWebhook"
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(telegram_url, json={"url": webhook_url})
-        return response.json()
+    response = await TelegramClient.call("setWebhook", {"url": webhook_url})
+    return response.json()
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from backend.app.database import get_db
 from backend.app.models.user import User
 from backend.app.schemas.schemas import UserCreate, UserResponse
 
-from backend.app.auth import get_current_user
+from backend.app.auth import get_current_user, invalidate_user_cache
+from backend.app.services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_paginate, finish_page
+from backend.app.services.serialization import USER_COLUMNS, FastJSONResponse, rows_response
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -13,11 +16,20 @@ router = APIRouter(prefix="/api/users", tags=["users"])
 def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
-@router.get("/", response_model=List[UserResponse])
-def get_users(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.get("/", response_model=List[UserResponse], response_class=FastJSONResponse)
+def get_users(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    unpaginated: bool = Query(False, alias="all", description="Devuelve todos los usuarios sin paginar"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
     # Only for admin? For now, just protect it
-    users = db.query(User).all()
-    return users
+    if unpaginated:
+        return rows_response(db.execute(select(*USER_COLUMNS)).all())
+    users = db.execute(keyset_paginate(select(*USER_COLUMNS), User.id, User.id, cursor, limit)).all()
+    return rows_response(finish_page(users, limit, response, "id"), response)
 
 @router.get("/{user_id}", response_model=UserResponse)
 def get_user(user_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
@@ -51,4 +63,5 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate_user_cache(db_user.id)
     return db_user
@@ -60,6 +60,18 @@ class ActivityResponse(ActivityBase):
     class Config:
         from_attributes = True
 
+class BatchItemError(BaseModel):
+    index: int
+    errors: list[dict]
+
+class ReminderBatchResponse(BaseModel):
+    created: list[ReminderResponse]
+    errors: list[BatchItemError]
+
+class ActivityBatchResponse(BaseModel):
+    created: list[ActivityResponse]
+    errors: list[BatchItemError]
+
 class AIHistoryBase(BaseModel):
     prompt: str
     response: str
@@ -70,6 +82,8 @@ class AIHistoryCreate(AIHistoryBase):
 class AIHistoryResponse(AIHistoryBase):
     id: int
     user_id: int
+    model: Optional[str] = None
+    latency_ms: Optional[int] = None
     timestamp: datetime
     
     class Config:
@@ -0,0 +1,115 @@
+import os
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+from sqlalchemy import insert
+from backend.app.database import AsyncSessionLocal
+from backend.app.models.ai_history import AIHistory
+
+logger = logging.getLogger(__name__)
+
+AI_HISTORY_ENABLED = os.environ.get("AI_HISTORY_ENABLED", "1") == "1"
+AI_HISTORY_BATCH_SIZE = int(os.environ.get("AI_HISTORY_BATCH_SIZE", "200"))
+AI_HISTORY_FLUSH_SECONDS = float(os.environ.get("AI_HISTORY_FLUSH_SECONDS", "5"))
+# Tope de registros en memoria; por encima se descartan (y se cuentan)
+AI_HISTORY_MAX_PENDING = int(os.environ.get("AI_HISTORY_MAX_PENDING", "10000"))
+
+
+class AIHistoryRecorder:
+    """
+    Write-behind de prompts/respuestas del LLM hacia `ai_history`.
+    record() solo encola en memoria (no toca la base); una tarea de fondo vuelca
+    el buffer con un INSERT masivo al llegar a AI_HISTORY_BATCH_SIZE registros o
+    cada AI_HISTORY_FLUSH_SECONDS, y stop() vacía lo pendiente al apagar.
+    """
+
+    def __init__(self):
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.recorded = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def record(self, user_id: int, prompt: str, response: str, model: str, latency_ms: int):
+        if self._task is None:
+            return
+        if len(self._buffer) >= AI_HISTORY_MAX_PENDING:
+            self.dropped += 1
+            return
+        self._buffer.append({
+            "user_id": user_id,
+            "prompt": prompt,
+            "response": response,
+            "model": model,
+            "latency_ms": latency_ms,
+        })
+        self.recorded += 1
+        if len(self._buffer) >= AI_HISTORY_BATCH_SIZE:
+            self._wakeup.set()
+
+    # --- Ciclo de vida ---
+
+    async def start(self):
+        if not AI_HISTORY_ENABLED or self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        # Parada ordenada: el loop vacía el buffer completo antes de salir
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=AI_HISTORY_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._buffer:
+                await self.flush()
+                if len(self._buffer) < AI_HISTORY_BATCH_SIZE and not self._stopping:
+                    break
+            if self._stopping:
+                return
+
+    async def flush(self):
+        """
+        Inserta un lote en una sola sentencia. Si la base falla el lote se descarta:
+        el historial es auditoría y no debe crecer sin límite ni frenar al bot.
+        """
+        batch: List[Dict[str, Any]] = [
+            self._buffer.popleft() for _ in range(min(len(self._buffer), AI_HISTORY_BATCH_SIZE))
+        ]
+        if not batch:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(AIHistory), batch)
+                await db.commit()
+            self.flushed += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error("Dropped ai_history batch after flush error", extra={"records": len(batch), "error": str(e)})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._buffer),
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+
+recorder = AIHistoryRecorder()
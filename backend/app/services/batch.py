@@ -0,0 +1,23 @@
+import os
+import json
+from typing import Any, Dict, List, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+
+MAX_BATCH_ITEMS = int(os.environ.get("MAX_BATCH_ITEMS", "5000"))
+
+
+def validate_batch(schema: Type[BaseModel], items: List[Any]) -> Tuple[List[Tuple[int, BaseModel]], List[Dict[str, Any]]]:
+    """
+    Valida cada elemento por separado: los inválidos se reportan con su índice
+    y no impiden insertar el resto del lote.
+    """
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_ITEMS} items")
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            errors.append({"index": index, "errors": json.loads(e.json(include_url=False))})
+    return valid, errors
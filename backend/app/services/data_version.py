@@ -0,0 +1,70 @@
+import os
+from typing import Callable, List, Optional
+from fastapi import Request, Response
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from backend.app.models.user_stats import UserStats
+from backend.app.services.cache import TTLCache
+
+# Segundos que un worker confía en su copia de la versión. 0 = siempre una lectura por PK.
+# Con varios workers una escritura en otro proceso tarda hasta este TTL en verse aquí.
+DATA_VERSION_CACHE_TTL_SECONDS = float(os.environ.get("DATA_VERSION_CACHE_TTL_SECONDS", "0"))
+DATA_VERSION_CACHE_MAX_SIZE = int(os.environ.get("DATA_VERSION_CACHE_MAX_SIZE", "10000"))
+
+version_cache = TTLCache(max_size=DATA_VERSION_CACHE_MAX_SIZE, ttl=DATA_VERSION_CACHE_TTL_SECONDS)
+
+# Callbacks que reciben el user_id de cada usuario cuyos datos cambiaron en un commit
+change_listeners: List[Callable[[int], None]] = [version_cache.delete]
+
+CHANGED_USERS_KEY = "changed_user_ids"
+
+
+def mark_user_changed(db: AsyncSession, user_id: int):
+    """
+    Registra el usuario en la sesión; al confirmar la transacción se avisa a los listeners.
+    """
+    db.info.setdefault(CHANGED_USERS_KEY, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_changed_users(session: Session):
+    for user_id in session.info.pop(CHANGED_USERS_KEY, ()):
+        for listener in change_listeners:
+            listener(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changed_users(session: Session, previous_transaction):
+    session.info.pop(CHANGED_USERS_KEY, None)
+
+
+async def get_data_version(db: AsyncSession, user_id: int) -> int:
+    if DATA_VERSION_CACHE_TTL_SECONDS > 0:
+        cached = version_cache.get(user_id)
+        if cached is not None:
+            return cached
+    version = await db.scalar(select(UserStats.data_version).where(UserStats.user_id == user_id)) or 0
+    if DATA_VERSION_CACHE_TTL_SECONDS > 0:
+        version_cache.set(user_id, version)
+    return version
+
+
+def make_etag(scope: str, user_id: int, version: int) -> str:
+    return f'"{scope}-{user_id}-{version}"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    304 si el cliente ya tiene esta versión; se consulta antes de correr el listado.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return None
+
+
+def set_etag(response: Response, etag: str):
+    # no-cache: el navegador guarda la respuesta pero revalida siempre con If-None-Match
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
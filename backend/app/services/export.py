@@ -0,0 +1,122 @@
+import io
+import csv
+import json
+import zlib
+import enum
+from datetime import date, datetime
+from typing import AsyncIterator, Iterator, List, Optional, Sequence
+from sqlalchemy import select
+from backend.app.database import AsyncSessionLocal, engine
+from backend.app.models.activity import Activity
+from backend.app.models.reminder import Reminder
+from backend.app.models.ai_history import AIHistory
+
+EXPORT_BATCH_SIZE = 1000
+
+# Registros exportables (para ML / análisis de hábitos) y sus columnas
+EXPORTS = {
+    "activities": (Activity, [
+        Activity.id, Activity.user_id, Activity.activity_type, Activity.description,
+        Activity.activity_date, Activity.reminder_id, Activity.metadata_info, Activity.created_at
+    ]),
+    "reminders": (Reminder, [
+        Reminder.id, Reminder.user_id, Reminder.text, Reminder.reminder_time, Reminder.completed,
+        Reminder.last_reaction_status, Reminder.context_metadata, Reminder.created_at, Reminder.updated_at
+    ]),
+    "ai_history": (AIHistory, [
+        AIHistory.id, AIHistory.user_id, AIHistory.prompt, AIHistory.response, AIHistory.model,
+        AIHistory.latency_ms, AIHistory.timestamp
+    ]),
+}
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def export_query(kind: str, user_id: Optional[int] = None):
+    model, columns = EXPORTS[kind]
+    stmt = select(*columns).order_by(model.id)
+    if user_id is not None:
+        stmt = stmt.where(model.user_id == user_id)
+    return stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def column_names(kind: str) -> List[str]:
+    return [c.key for c in EXPORTS[kind][1]]
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def encode_header(fmt: str, names: List[str]) -> bytes:
+    if fmt != "csv":
+        return b""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(names)
+    return buffer.getvalue().encode()
+
+
+def encode_rows(fmt: str, names: List[str], rows: Sequence) -> bytes:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else _jsonable(v)
+                for v in row
+            ])
+        return buffer.getvalue().encode()
+    return "".join(
+        json.dumps(dict(zip(names, map(_jsonable, row))), ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode()
+
+
+class _Gzip:
+    # wbits=31 produce un stream gzip válido que se puede comprimir por trozos
+    def __init__(self, enabled: bool):
+        self._compressor = zlib.compressobj(wbits=31) if enabled else None
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) if self._compressor else data
+
+    def flush(self) -> bytes:
+        return self._compressor.flush() if self._compressor else b""
+
+
+async def stream_export(kind: str, fmt: str, compress: bool = False, user_id: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    Recorre la tabla con un cursor del servidor y emite lotes ya codificados.
+    Abre su propia sesión: la de la dependencia se cierra antes de que termine el stream.
+    """
+    names = column_names(kind)
+    gz = _Gzip(compress)
+    yield gz.chunk(encode_header(fmt, names))
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(export_query(kind, user_id))
+        async for rows in result.partitions():
+            data = gz.chunk(encode_rows(fmt, names, rows))
+            if data:
+                yield data
+    yield gz.flush()
+
+
+def iter_export(kind: str, fmt: str, compress: bool = False, user_id: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Versión síncrona para la CLI (psycopg2 con cursor del servidor).
+    """
+    names = column_names(kind)
+    gz = _Gzip(compress)
+    yield gz.chunk(encode_header(fmt, names))
+    with engine.connect() as conn:
+        result = conn.execute(export_query(kind, user_id))
+        for rows in result.partitions():
+            yield gz.chunk(encode_rows(fmt, names, rows))
+    yield gz.flush()
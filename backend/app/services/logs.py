@@ -0,0 +1,233 @@
+import os
+import sys
+import copy
+import json
+import queue
+import uuid
+import atexit
+import random
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Iterator, Optional
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# Niveles por módulo: "backend.app.auth=DEBUG,sqlalchemy.engine=INFO"
+LOG_LEVELS = os.environ.get("LOG_LEVELS", "")
+# httpx registra cada petición en INFO (Telegram, OpenRouter; openai reciente usa httpx2);
+# LOG_LEVELS puede sobrescribirlo
+DEFAULT_LEVELS = {"httpx": "WARNING", "httpx2": "WARNING", "httpcore": "WARNING"}
+# Fracción de eventos DEBUG que se conservan por módulo: "backend.app.auth=0.01"
+LOG_SAMPLING = os.environ.get("LOG_SAMPLING", "")
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Id de la petición HTTP o del update de Telegram en curso; se agrega a cada registro
+correlation_id: ContextVar[Optional[str]] = ContextVar("correlation_id", default=None)
+
+# Atributos propios de LogRecord; el resto llega por `extra=` y se emite como campo
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "correlation_id"}
+
+
+def _parse_pairs(value: str) -> Dict[str, str]:
+    pairs = {}
+    for part in value.split(","):
+        name, sep, setting = part.partition("=")
+        if sep and name.strip():
+            pairs[name.strip()] = setting.strip()
+    return pairs
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+@contextmanager
+def correlation(value: Optional[str]) -> Iterator[None]:
+    token = correlation_id.set(value)
+    try:
+        yield
+    finally:
+        correlation_id.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Corre en el hilo que emite el registro: ahí todavía se ve el ContextVar de la petición.
+    Descarta también la fracción de eventos DEBUG configurada en LOG_SAMPLING.
+    """
+
+    def __init__(self, sampling: Dict[str, float]):
+        super().__init__()
+        # Prefijo más largo primero: "backend.app.auth" gana sobre "backend.app"
+        self._sampling = sorted(sampling.items(), key=lambda item: -len(item[0]))
+        self._rates: Dict[str, float] = {}
+        self.sampled_out = 0
+
+    def _rate(self, name: str) -> float:
+        rate = self._rates.get(name)
+        if rate is None:
+            rate = next((r for prefix, r in self._sampling if name == prefix or name.startswith(prefix + ".")), 1.0)
+            self._rates[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno <= logging.DEBUG and self._sampling:
+            rate = self._rate(record.name)
+            if rate < 1.0 and random.random() >= rate:
+                self.sampled_out += 1
+                return False
+        record.correlation_id = correlation_id.get()
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Encola el registro sin formatear; el JSON y la escritura a stderr ocurren en el hilo
+    del QueueListener. SimpleQueue (en C, sin locks de Python) con un tope aproximado:
+    con la cola llena el registro se descarta en lugar de bloquear.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, max_size: int = LOG_QUEUE_SIZE):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # Sin el lock del Handler: SimpleQueue ya es segura entre hilos
+        if not self.filter(record):
+            return False
+        self.emit(record)
+        return True
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # A diferencia de QueueHandler.prepare no se formatea: en una copia superficial solo
+        # se fija el mensaje (los args podrían cambiar después) y el traceback (los frames no
+        # viajan entre hilos). El original queda intacto para los demás handlers del logger.
+        record = copy.copy(record)
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "correlation_id", None):
+            entry["correlation_id"] = record.correlation_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    # Para desarrollo local: una línea legible con los campos extra como key=value
+    def format(self, record: logging.LogRecord) -> str:
+        timestamp = datetime.fromtimestamp(record.created).strftime("%H:%M:%S.%f")[:-3]
+        cid = getattr(record, "correlation_id", None)
+        extras = " ".join(f"{k}={v}" for k, v in record.__dict__.items() if k not in _RECORD_ATTRS)
+        line = f"{timestamp} {record.levelname:7} {record.name}{f' [{cid}]' if cid else ''} {record.getMessage()}"
+        if extras:
+            line += f" {extras}"
+        if record.exc_text:
+            line += f"\n{record.exc_text}"
+        return line
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_filter: Optional[ContextFilter] = None
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging():
+    """
+    Instala el handler con cola en el logger raíz y arranca el hilo que escribe a stderr.
+    Idempotente; se llama al importar la app, antes de los módulos que registran eventos.
+    """
+    global _handler, _filter, _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _filter = ContextFilter({name: float(rate) for name, rate in _parse_pairs(LOG_SAMPLING).items()})
+    _handler = NonBlockingQueueHandler(log_queue)
+    _handler.addFilter(_filter)
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JsonFormatter())
+    _listener = QueueListener(log_queue, output)
+    _listener.start()
+    # Al salir se vacía la cola antes de cerrar el proceso
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.addHandler(_handler)
+    root.setLevel(LOG_LEVEL)
+    for name, level in {**DEFAULT_LEVELS, **_parse_pairs(LOG_LEVELS)}.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+
+def logging_stats() -> Dict[str, Any]:
+    if _handler is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "queued": _handler.queue.qsize(),
+        "dropped": _handler.dropped,
+        "sampled_out": _filter.sampled_out,
+    }
+
+
+class CorrelationIdMiddleware:
+    """
+    Toma X-Request-ID de la petición (o genera uno) para todos los registros que emita,
+    y lo devuelve en la respuesta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if 0 < len(candidate) <= 64 and candidate.replace("-", "").isalnum():
+                    request_id = candidate
+                break
+        request_id = request_id or new_request_id()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (REQUEST_ID_HEADER.lower().encode(), request_id.encode())
+                ]
+            await send(message)
+
+        with correlation(request_id):
+            await self.app(scope, receive, send_wrapper)
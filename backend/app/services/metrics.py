@@ -0,0 +1,165 @@
+import time
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from fastapi import Response
+from sqlalchemy import event
+
+# Buckets en segundos: de consultas por PK (~1 ms) a llamadas al LLM (decenas de segundos)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Latencia de peticiones HTTP por plantilla de ruta",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Consultas SQL ejecutadas por petición",
+    ["method", "route"], buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Tiempo total en SQL por petición",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds", "Latencia de cada sentencia SQL",
+    ["operation"], buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CONNECT = Histogram(
+    "db_pool_connect_seconds", "Apertura de una conexión nueva a la base",
+    ["engine"], buckets=LATENCY_BUCKETS,
+)
+DB_POOL_HELD = Histogram(
+    "db_pool_held_seconds", "Tiempo que una conexión pasa fuera del pool (checkout a checkin)",
+    ["engine"], buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Conexiones del pool en uso", ["engine"])
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds", "Latencia de llamadas a OpenRouter",
+    ["outcome"], buckets=LATENCY_BUCKETS,
+)
+LLM_REJECTED = Counter("llm_rejected_total", "Llamadas al LLM rechazadas por el circuit breaker")
+TELEGRAM_LATENCY = Histogram(
+    "telegram_request_duration_seconds", "Latencia de llamadas a la Bot API de Telegram",
+    ["method", "status"], buckets=LATENCY_BUCKETS,
+)
+
+# Colas de Telegram: las gauges leen el estado de las instancias globales al exponerse
+# (set_function en routes/telegram.py y telegram_outbox.py)
+TELEGRAM_UPDATES_PENDING = Gauge("telegram_updates_pending", "Updates de Telegram encolados sin procesar")
+TELEGRAM_UPDATE_LAG = Histogram(
+    "telegram_update_lag_seconds", "Espera de un update entre su llegada y el inicio de su procesamiento",
+    buckets=LATENCY_BUCKETS,
+)
+TELEGRAM_OUTBOX_PENDING = Gauge("telegram_outbox_pending", "Mensajes del outbox de Telegram pendientes de entrega")
+
+# [consultas, segundos] de la petición en curso; lo fija el middleware y lo suman los eventos del engine
+_request_db: ContextVar[Optional[list]] = ContextVar("request_db", default=None)
+
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+def _operation(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return word if word in SQL_OPERATIONS else "OTHER"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_QUERY_LATENCY.labels(_operation(statement)).observe(elapsed)
+    totals = _request_db.get()
+    if totals is not None:
+        totals[0] += 1
+        totals[1] += elapsed
+
+
+def _handle_error(exception_context):
+    # La sentencia falló: after_cursor_execute no corre, se descarta su marca de inicio
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+def instrument_engine(engine, name: str):
+    """
+    Engancha los eventos de un Engine síncrono (para el async, `async_engine.sync_engine`):
+    latencia por sentencia, totales por petición y uso del pool.
+    Los eventos de pool se registran sobre el Engine: sobreviven a engine.dispose(),
+    que recrea el pool copiando sus listeners.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+    # SQLAlchemy no tiene evento previo al checkout: la espera por un pool agotado se ve
+    # como conexiones retenidas mucho tiempo y db_pool_checked_out en el tope
+    connect_latency = DB_POOL_CONNECT.labels(name)
+    held = DB_POOL_HELD.labels(name)
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+
+    @event.listens_for(engine, "do_connect")
+    def _before_connect(dialect, conn_rec, cargs, cparams):
+        conn_rec.info["connect_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "connect")
+    def _after_connect(dbapi_connection, connection_record):
+        started = connection_record.info.pop("connect_started", None)
+        if started is not None:
+            connect_latency.observe(time.perf_counter() - started)
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        checked_out.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            held.observe(time.perf_counter() - started)
+            checked_out.dec()
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro (sin BaseHTTPMiddleware) para que el costo por petición sea mínimo.
+    La etiqueta de ruta es la plantilla (`/api/reminders/{user_id}`), no la URL, para acotar la cardinalidad.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = ["500"]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        totals = [0, 0.0]
+        token = _request_db.set(totals)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_db.reset(token)
+            # Sin ruta (404) todo cae en "unmatched"; el mount estático en "/" tiene path ""
+            route = scope.get("route")
+            template = "unmatched" if route is None else (route.path or "/")
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, template, status[0]).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(method, template).observe(totals[0])
+            REQUEST_DB_SECONDS.labels(method, template).observe(totals[1])
+
+
+def metrics_response() -> Response:
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
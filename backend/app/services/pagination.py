@@ -0,0 +1,58 @@
+import json
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, is_datetime: bool = True) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if is_datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_paginate(stmt, sort_col, id_col, cursor: Optional[str], limit: int, descending: bool = False):
+    """
+    Aplica orden (sort_col, id_col) y la condición keyset del cursor.
+    Pide limit + 1 filas para saber si hay página siguiente sin un count().
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, is_datetime=sort_col is not id_col)
+        if sort_col is id_col:
+            stmt = stmt.where(id_col < row_id if descending else id_col > row_id)
+        else:
+            key = tuple_(sort_col, id_col)
+            stmt = stmt.where(key < (sort_value, row_id) if descending else key > (sort_value, row_id))
+    if sort_col is id_col:
+        order = (id_col.desc(),) if descending else (id_col,)
+    else:
+        order = (sort_col.desc(), id_col.desc()) if descending else (sort_col, id_col)
+    return stmt.order_by(*order).limit(limit + 1)
+
+
+def finish_page(rows: List[Any], limit: int, response: Response, sort_attr: str, id_attr: str = "id") -> List[Any]:
+    """
+    Recorta la fila extra y publica el cursor siguiente en la cabecera X-Next-Cursor.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
+    return rows
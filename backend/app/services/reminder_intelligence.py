@@ -1,9 +1,43 @@
 import os
 import json
+import time
 import random
-from typing import Dict, Any
+import asyncio
+import unicodedata
+import logging
+from typing import Dict, Any, List, Optional, Tuple
 from backend.app.models.reminder import ReactionStatus
-from openai import OpenAI
+from backend.app.services.cache import TTLCache
+from backend.app.services.circuit_breaker import CircuitBreaker
+from backend.app.services.ai_history_recorder import recorder
+from backend.app.services.metrics import LLM_LATENCY, LLM_REJECTED
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (exclusivos) de los buckets de racha y fallos
+STREAK_BUCKETS = [1, 3, 7, 14, 30]
+FAILURE_BUCKETS = [1, 3]
+
+TONE_CACHE_MAX_SIZE = int(os.environ.get("TONE_CACHE_MAX_SIZE", "5000"))
+TONE_CACHE_TTL_SECONDS = float(os.environ.get("TONE_CACHE_TTL_SECONDS", "86400"))
+TONE_POOL_SIZE = int(os.environ.get("TONE_POOL_SIZE", "12"))
+TONE_POOL_REFRESH_SECONDS = float(os.environ.get("TONE_POOL_REFRESH_SECONDS", "21600"))
+
+OPENROUTER_BASE_URL = os.environ.get("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+LLM_MODEL = os.environ.get("LLM_MODEL", "openai/gpt-3.5-turbo")
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "8"))
+# Espera máxima por un cupo de LLM_MAX_CONCURRENCY; al vencer se descarta sin contar para el breaker
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("LLM_QUEUE_TIMEOUT_SECONDS", str(LLM_TIMEOUT_SECONDS)))
+LLM_BREAKER_THRESHOLD = int(os.environ.get("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.environ.get("LLM_BREAKER_RESET_SECONDS", "30"))
+# Contextos empaquetados por prompt en evaluate_contexts
+LLM_BATCH_SIZE = int(os.environ.get("LLM_BATCH_SIZE", "20"))
+
+DEFAULT_ADVICE = {
+    "advice": "¡Tú puedes con esto! ⚡",
+    "urgency": "normal"
+}
 
 class ReminderIntelligence:
     """
@@ -12,23 +46,168 @@ class ReminderIntelligence:
     """
     
     _client = None
+    _tone_cache = TTLCache(max_size=TONE_CACHE_MAX_SIZE, ttl=TONE_CACHE_TTL_SECONDS)
+    _tone_pools: Dict[Tuple[int, int], List[str]] = {}
+    tone_pool_hits = 0
+    tone_llm_calls = 0
+    _semaphore: Optional[asyncio.Semaphore] = None
+    breaker = CircuitBreaker(failure_threshold=LLM_BREAKER_THRESHOLD, reset_timeout=LLM_BREAKER_RESET_SECONDS)
+    llm_timeouts = 0
+    llm_errors = 0
+    llm_shed = 0
 
     @classmethod
     def get_client(cls):
         if cls._client is None:
+            # Import diferido: el SDK de openai tarda ~0.5 s en importarse y solo se usa si hay llamadas al LLM
+            from openai import AsyncOpenAI
             api_key = os.environ.get("OPENROUTER_API_KEY")
-            cls._client = OpenAI(
-                base_url="https://openrouter.ai/api/v1",
+            # Sin reintentos del SDK: el deadline y el circuit breaker deciden cuándo rendirse
+            cls._client = AsyncOpenAI(
+                base_url=OPENROUTER_BASE_URL,
                 api_key=api_key,
+                timeout=LLM_TIMEOUT_SECONDS,
+                max_retries=0,
             )
         return cls._client
 
+    @classmethod
+    def get_semaphore(cls) -> asyncio.Semaphore:
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        return cls._semaphore
+
+    @classmethod
+    async def _complete(cls, prompt: str, json_mode: bool = False, user_id: Optional[int] = None) -> Optional[str]:
+        """
+        Llamada al LLM sin bloquear el event loop: como mucho LLM_MAX_CONCURRENCY en vuelo,
+        deadline de LLM_TIMEOUT_SECONDS sobre la llamada HTTP y circuit breaker. La espera
+        por un cupo local tiene su propio límite (LLM_QUEUE_TIMEOUT_SECONDS) y no cuenta
+        como fallo del proveedor.
+        Devuelve None si no hay respuesta para que cada llamador use su mensaje de respaldo.
+        Con user_id la llamada se registra en ai_history (write-behind).
+        """
+        if not cls.breaker.allow():
+            LLM_REJECTED.inc()
+            return None
+        # En half-open allow() deja pasar una sola llamada: esta es la de prueba
+        probe = cls.breaker.state == CircuitBreaker.HALF_OPEN
+        kwargs = {"response_format": {"type": "json_object"}} if json_mode else {}
+        semaphore = cls.get_semaphore()
+
+        queued = time.perf_counter()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=LLM_QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            cls.llm_shed += 1
+            if probe:
+                cls.breaker.release_trial()
+            LLM_LATENCY.labels("shed").observe(time.perf_counter() - queued)
+            logger.warning("LLM call shed waiting for a slot", extra={"queue_timeout_s": LLM_QUEUE_TIMEOUT_SECONDS})
+            return None
+        except asyncio.CancelledError:
+            if probe:
+                cls.breaker.release_trial()
+            raise
+
+        started = time.perf_counter()
+        try:
+            if not probe and cls.breaker.state != CircuitBreaker.CLOSED:
+                # Se abrió mientras esperaba cupo: no se suma carga a un proveedor que falla
+                LLM_REJECTED.inc()
+                return None
+            client = cls.get_client()
+            response = await asyncio.wait_for(
+                client.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=[{"role": "user", "content": prompt}],
+                    **kwargs
+                ),
+                timeout=LLM_TIMEOUT_SECONDS
+            )
+            content = response.choices[0].message.content
+        except asyncio.TimeoutError:
+            cls.llm_timeouts += 1
+            cls.breaker.record_failure()
+            LLM_LATENCY.labels("timeout").observe(time.perf_counter() - started)
+            logger.warning("OpenRouter call timed out", extra={"timeout_s": LLM_TIMEOUT_SECONDS})
+            return None
+        except asyncio.CancelledError:
+            # Cancelada por el llamador: solo la de prueba debe soltar el half-open
+            if probe:
+                cls.breaker.record_failure()
+            LLM_LATENCY.labels("cancelled").observe(time.perf_counter() - started)
+            raise
+        except Exception as e:
+            cls.llm_errors += 1
+            cls.breaker.record_failure()
+            LLM_LATENCY.labels("error").observe(time.perf_counter() - started)
+            logger.warning("OpenRouter call failed", extra={"error": str(e)})
+            return None
+        finally:
+            semaphore.release()
+        cls.breaker.record_success()
+        LLM_LATENCY.labels("ok").observe(time.perf_counter() - started)
+        if user_id is not None and content:
+            recorder.record(user_id, prompt, content, LLM_MODEL, int((time.perf_counter() - started) * 1000))
+        return content
+
+    @staticmethod
+    def streak_bucket(streak_count: int) -> int:
+        # Índice del primer límite que supera la racha: 0, 1-2, 3-6, 7-13, 14-29, 30+
+        for i, bound in enumerate(STREAK_BUCKETS):
+            if streak_count < bound:
+                return i
+        return len(STREAK_BUCKETS)
+
+    @staticmethod
+    def failure_bucket(failure_count: int) -> int:
+        for i, bound in enumerate(FAILURE_BUCKETS):
+            if failure_count < bound:
+                return i
+        return len(FAILURE_BUCKETS)
+
+    @staticmethod
+    def normalize_text(reminder_text: str) -> str:
+        text = unicodedata.normalize("NFKD", reminder_text.lower())
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        return " ".join(text.split())[:80]
+
+    @staticmethod
+    def _fallback_tone(streak_count: int) -> str:
+        if streak_count >= 5:
+            return "¡Estás en racha! 🚀 Sigue así."
+        return "Es hora de tu actividad programada. ⏰"
+
+    @staticmethod
+    async def get_dynamic_tone(streak_count: int, failure_count: int, reminder_text: str = "", user_id: Optional[int] = None) -> str:
+        """
+        Determina el tono del mensaje según el desempeño del usuario.
+        Orden: cache por (racha, fallos, texto) -> pool pregenerado del bucket -> LLM.
+        """
+        cls = ReminderIntelligence
+        bucket = (cls.streak_bucket(streak_count), cls.failure_bucket(failure_count))
+        key = bucket + (cls.normalize_text(reminder_text),)
+
+        variants = cls._tone_cache.get(key)
+        if variants:
+            return random.choice(variants)
+        pool = cls._tone_pools.get(bucket)
+        if pool:
+            cls.tone_pool_hits += 1
+            return random.choice(pool)
+
+        tone = await cls._generate_tone(streak_count, failure_count, reminder_text, user_id)
+        if tone is None:
+            return cls._fallback_tone(streak_count)
+        cls._tone_cache.set(key, [tone])
+        return tone
+
     @staticmethod
-    async def get_dynamic_tone(streak_count: int, failure_count: int, reminder_text: str = "") -> str:
+    async def _generate_tone(streak_count: int, failure_count: int, reminder_text: str = "", user_id: Optional[int] = None) -> Optional[str]:
         """
-        Determina el tono del mensaje según el desempeño del usuario usando LLM.
+        Genera el tono con el LLM; None si el proveedor falla.
         """
-        client = ReminderIntelligence.get_client()
         prompt = f"""
         Eres Tonalli AI, un asistente de bienestar. 
         Usuario: En racha de {streak_count} días, ha fallado {failure_count} veces recientemente.
@@ -38,40 +217,148 @@ class ReminderIntelligence:
         Responde SOLO con el mensaje, sin comillas ni explicaciones.
         """
         
+        ReminderIntelligence.tone_llm_calls += 1
+        content = await ReminderIntelligence._complete(prompt, user_id=user_id)
+        if not content or not content.strip():
+            return None
+        return content.strip()
+
+    @staticmethod
+    async def _generate_tone_pool(streak_count: int, failure_count: int) -> List[str]:
+        """
+        Pide al LLM varias variantes genéricas para un bucket (sin texto de actividad).
+        """
+        prompt = f"""
+        Eres Tonalli AI, un asistente de bienestar.
+        Usuario: En racha de {streak_count} días, ha fallado {failure_count} veces recientemente.
+        Genera {TONE_POOL_SIZE} mensajes cortos y distintos (máximo 150 caracteres cada uno),
+        motivadores o empáticos según el estado, que sirvan para cualquier actividad.
+        Responde estrictamente en formato JSON: {{"messages": ["mensaje", "..."]}}
+        """
+        content = await ReminderIntelligence._complete(prompt, json_mode=True)
+        if content is None:
+            return []
         try:
-            response = client.chat.completions.create(
-                model="openai/gpt-3.5-turbo", # O un modelo ligero de OpenRouter
-                messages=[{"role": "user", "content": prompt}]
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"Error calling OpenRouter: {e}")
-            # Fallback a lógica anterior
-            if streak_count >= 5:
-                return "¡Estás en racha! 🚀 Sigue así."
-            return "Es hora de tu actividad programada. ⏰"
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.warning("Tone pool response is not valid JSON", extra={"error": str(e)})
+            return []
+        messages = data.get("messages") if isinstance(data, dict) else None
+        if not isinstance(messages, list):
+            # Un string iteraría letra por letra y llenaría el pool de caracteres sueltos
+            logger.warning("Tone pool response without a messages list", extra={"type": type(messages).__name__})
+            return []
+        return [m.strip() for m in messages if isinstance(m, str) and 0 < len(m.strip()) <= 150]
+
+    @classmethod
+    async def refresh_tone_pools(cls):
+        # Valor representativo de cada bucket: su límite inferior
+        streak_values = [0] + STREAK_BUCKETS
+        failure_values = [0] + FAILURE_BUCKETS
+        for sb, streak in enumerate(streak_values):
+            for fb, failures in enumerate(failure_values):
+                try:
+                    pool = await cls._generate_tone_pool(streak, failures)
+                except Exception as e:
+                    logger.warning("Tone pool generation failed", extra={"bucket": f"{sb}/{fb}", "error": str(e)})
+                    continue
+                if pool:
+                    cls._tone_pools[(sb, fb)] = pool
+
+    @classmethod
+    async def run_tone_pool_refresher(cls):
+        """
+        Tarea de fondo (lifespan): regenera los pools cada TONE_POOL_REFRESH_SECONDS.
+        """
+        if not os.environ.get("OPENROUTER_API_KEY"):
+            return
+        while True:
+            await cls.refresh_tone_pools()
+            await asyncio.sleep(TONE_POOL_REFRESH_SECONDS)
+
+    @classmethod
+    def tone_stats(cls) -> Dict[str, Any]:
+        return {
+            "cache": cls._tone_cache.stats(),
+            "pools": len(cls._tone_pools),
+            "pool_hits": cls.tone_pool_hits,
+            "llm_calls": cls.tone_llm_calls,
+        }
+
+    @classmethod
+    def llm_stats(cls) -> Dict[str, Any]:
+        return {
+            "breaker": cls.breaker.stats(),
+            "timeouts": cls.llm_timeouts,
+            "errors": cls.llm_errors,
+            "shed": cls.llm_shed,
+            "max_concurrency": LLM_MAX_CONCURRENCY,
+        }
 
     @staticmethod
-    async def evaluate_context(user_context: Dict[str, Any]) -> Dict[str, Any]:
+    async def evaluate_context(user_context: Dict[str, Any], user_id: Optional[int] = None) -> Dict[str, Any]:
         """
         Analiza el contexto usando LLM para ajustar la urgencia o el mensaje.
         """
-        client = ReminderIntelligence.get_client()
         prompt = f"""
         Analiza este contexto de usuario: {json.dumps(user_context)}
         Genera un consejo breve y determina la urgencia (alta o normal).
         Responde estrictamente en formato JSON: {{"advice": "mensaje", "urgency": "alta/normal"}}
         """
         
+        content = await ReminderIntelligence._complete(prompt, json_mode=True, user_id=user_id)
+        if content is None:
+            return dict(DEFAULT_ADVICE)
         try:
-            response = client.chat.completions.create(
-                model="openai/gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                response_format={ "type": "json_object" }
-            )
-            return json.loads(response.choices[0].message.content)
-        except Exception:
-            return {
-                "advice": "¡Tú puedes con esto! ⚡",
-                "urgency": "normal"
-            }
+            return json.loads(content)
+        except ValueError:
+            return dict(DEFAULT_ADVICE)
+
+    @staticmethod
+    async def evaluate_contexts(user_contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Versión por lotes de evaluate_context: empaqueta LLM_BATCH_SIZE contextos por prompt
+        y lanza los lotes en paralelo (acotados por el semáforo del cliente).
+        Devuelve un resultado por contexto, en el mismo orden; los que falten o vengan
+        mal formados reciben el consejo por defecto. Los contextos con `user_id` se
+        registran en ai_history uno por uno.
+        """
+        indexed = list(enumerate(user_contexts))
+        chunks = [indexed[start:start + LLM_BATCH_SIZE] for start in range(0, len(indexed), LLM_BATCH_SIZE)]
+        results: List[Dict[str, Any]] = [dict(DEFAULT_ADVICE) for _ in user_contexts]
+        for chunk_results in await asyncio.gather(*[ReminderIntelligence._evaluate_chunk(c) for c in chunks]):
+            for index, result in chunk_results.items():
+                results[index] = result
+        return results
+
+    @staticmethod
+    async def _evaluate_chunk(chunk: List[Tuple[int, Dict[str, Any]]]) -> Dict[int, Dict[str, Any]]:
+        items = [{"id": index, "context": context} for index, context in chunk]
+        prompt = f"""
+        Analiza cada uno de estos contextos de usuario.
+        Contextos: {json.dumps(items)}
+        Para cada uno genera un consejo breve y determina la urgencia (alta o normal).
+        Responde estrictamente en formato JSON: {{"results": [{{"id": 0, "advice": "mensaje", "urgency": "alta/normal"}}]}}
+        """
+
+        started = time.perf_counter()
+        content = await ReminderIntelligence._complete(prompt, json_mode=True)
+        if content is None:
+            return {}
+        latency_ms = int((time.perf_counter() - started) * 1000)
+        try:
+            parsed = json.loads(content).get("results", [])
+        except (ValueError, AttributeError):
+            return {}
+        expected = {index for index, _ in chunk}
+        mapped = {}
+        for item in parsed if isinstance(parsed, list) else []:
+            if not isinstance(item, dict) or not isinstance(item.get("id"), int) or item["id"] not in expected:
+                continue
+            if not isinstance(item.get("advice"), str) or item.get("urgency") not in ("alta", "normal"):
+                continue
+            mapped[item["id"]] = {"advice": item["advice"], "urgency": item["urgency"]}
+        for index, context in chunk:
+            if index in mapped and isinstance(context.get("user_id"), int):
+                recorder.record(context["user_id"], json.dumps(context), json.dumps(mapped[index]), LLM_MODEL, latency_ms)
+        return mapped
@@ -0,0 +1,298 @@
+import os
+import time
+import heapq
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, func
+from backend.app.database import AsyncSessionLocal
+from backend.app.models.reminder import Reminder, ReactionStatus
+from backend.app.models.user import User
+from backend.app.services.telegram_outbox import outbox
+from backend.app.services.user_stats import bump_user_stats
+
+logger = logging.getLogger(__name__)
+
+# Solo un worker debe despachar recordatorios; en los demás poner REMINDER_SCHEDULER_ENABLED=0.
+# Sus altas y cambios llegan al dispatcher por el sondeo de updated_at
+REMINDER_SCHEDULER_ENABLED = os.environ.get("REMINDER_SCHEDULER_ENABLED", "1") == "1"
+# Ventana hacia adelante que se mantiene en memoria
+SCHEDULER_WINDOW_SECONDS = float(os.environ.get("SCHEDULER_WINDOW_SECONDS", "600"))
+# Recordatorios vencidos que aún se envían al arrancar
+SCHEDULER_GRACE_SECONDS = float(os.environ.get("SCHEDULER_GRACE_SECONDS", "3600"))
+SCHEDULER_BATCH_SIZE = int(os.environ.get("SCHEDULER_BATCH_SIZE", "500"))
+# Cada cuánto se buscan recordatorios cambiados por otros workers dentro de la ventana cargada
+SCHEDULER_POLL_SECONDS = float(os.environ.get("SCHEDULER_POLL_SECONDS", "2"))
+# Margen hacia atrás del sondeo: updated_at es now() del inicio de la transacción, no del commit
+SCHEDULER_POLL_OVERLAP_SECONDS = float(os.environ.get("SCHEDULER_POLL_OVERLAP_SECONDS", "10"))
+
+ACTIVE_STATUSES = (ReactionStatus.PENDING, ReactionStatus.SNOOZED)
+
+
+def reminder_keyboard(reminder_id: int) -> dict:
+    return {
+        "inline_keyboard": [[
+            {"text": "✅ Hecho", "callback_data": f"done:{reminder_id}"},
+            {"text": "⏳ +20m", "callback_data": f"snooze:{reminder_id}"},
+            {"text": "⏭️ Ignorar", "callback_data": f"ignore:{reminder_id}"}
+        ]]
+    }
+
+
+def _to_ts(value: datetime) -> float:
+    # Las fechas naive se interpretan en hora local, igual que datetime.now() en el webhook
+    return value.timestamp()
+
+
+class ReminderScheduler:
+    """
+    Despacha recordatorios a su `reminder_time`.
+    Mantiene en un min-heap solo la ventana próxima (SCHEDULER_WINDOW_SECONDS), que se
+    recarga con un range scan indexado sobre `reminder_time` una vez por ventana.
+    Las rutas de este worker avisan de altas, cambios y bajas con schedule()/cancel();
+    las de otros workers se recogen sondeando `updated_at` cada SCHEDULER_POLL_SECONDS.
+    Así el loop nunca re-escanea la ventana en cada tick. Las entradas obsoletas del
+    heap se descartan al sacarlas (borrado perezoso).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int]] = []
+        self._scheduled: Dict[int, float] = {}
+        self._loaded_until = 0.0
+        # Ids avisados por las rutas mientras una carga o un sondeo leen la base:
+        # el aviso es más reciente que la fila leída, que se ignora
+        self._touched: Optional[Set[int]] = None
+        self._changed_since: Optional[datetime] = None
+        self._next_poll = 0.0
+        # id -> (fire_at, momento del envío); el propio envío cambia updated_at y el
+        # sondeo vuelve a ver la fila
+        self._fired: Dict[int, Tuple[float, float]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+        self.skipped = 0
+        self.polled = 0
+
+    # --- API incremental, llamada desde las rutas ---
+
+    def schedule(self, reminder_id: int, reminder_time: datetime):
+        if self._task is None:
+            return
+        if self._touched is not None:
+            self._touched.add(reminder_id)
+        self._push(reminder_id, _to_ts(reminder_time))
+
+    def cancel(self, reminder_id: int):
+        if self._touched is not None:
+            self._touched.add(reminder_id)
+        self._scheduled.pop(reminder_id, None)
+
+    def track(self, reminder: Reminder):
+        """
+        Sincroniza el heap con el estado de un recordatorio recién guardado.
+        """
+        if reminder.completed or reminder.last_reaction_status not in ACTIVE_STATUSES:
+            self.cancel(reminder.id)
+        else:
+            self.schedule(reminder.id, reminder.reminder_time)
+
+    def _push(self, reminder_id: int, fire_at: float):
+        if fire_at > self._loaded_until:
+            # Fuera de la ventana: la siguiente recarga lo recogerá
+            self._scheduled.pop(reminder_id, None)
+            return
+        self._scheduled[reminder_id] = fire_at
+        heapq.heappush(self._heap, (fire_at, reminder_id))
+        if self._heap[0][1] == reminder_id:
+            self._wakeup.set()
+
+    # --- Ciclo de vida ---
+
+    async def start(self):
+        if not REMINDER_SCHEDULER_ENABLED or self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._loaded_until = time.time() - SCHEDULER_GRACE_SECONDS
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                now = time.time()
+                if now >= self._next_poll:
+                    await self._poll_changes()
+                if now + SCHEDULER_WINDOW_SECONDS / 2 >= self._loaded_until:
+                    await self._load_window(now + SCHEDULER_WINDOW_SECONDS)
+                due = self._pop_due(now)
+                if due:
+                    await self._fire(due)
+                    continue
+                next_at = self._heap[0][0] if self._heap else float("inf")
+                refresh_at = self._loaded_until - SCHEDULER_WINDOW_SECONDS / 2
+                timeout = max(0.0, min(next_at, refresh_at, self._next_poll) - time.time())
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Reminder scheduler error")
+                await asyncio.sleep(1)
+
+    async def _load_window(self, horizon: float):
+        previous = self._loaded_until
+        start = datetime.fromtimestamp(previous, tz=timezone.utc)
+        end = datetime.fromtimestamp(horizon, tz=timezone.utc)
+        # Antes de leer: un schedule() durante la lectura ya entra al heap en vez de perderse
+        self._loaded_until = horizon
+        self._touched = set()
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.stream(
+                    select(Reminder.id, Reminder.reminder_time).where(
+                        Reminder.completed == False,
+                        Reminder.reminder_time > start,
+                        Reminder.reminder_time <= end,
+                        Reminder.last_reaction_status.in_(ACTIVE_STATUSES)
+                    ).execution_options(yield_per=SCHEDULER_BATCH_SIZE)
+                )
+                async for reminder_id, reminder_time in result:
+                    if reminder_id in self._touched:
+                        continue
+                    fire_at = _to_ts(reminder_time)
+                    self._scheduled[reminder_id] = fire_at
+                    self._heap.append((fire_at, reminder_id))
+        except BaseException:
+            # La ventana se vuelve a leer completa en el siguiente intento
+            self._loaded_until = previous
+            raise
+        finally:
+            self._touched = None
+            heapq.heapify(self._heap)
+
+    async def _poll_changes(self):
+        """
+        Range scan sobre updated_at: altas, cambios y bajas hechos por otros workers desde el
+        último sondeo (con SCHEDULER_POLL_OVERLAP_SECONDS de margen). Las filas fuera de la
+        ventana cargada se ignoran; la recarga de la ventana las recoge.
+        """
+        self._next_poll = time.time() + SCHEDULER_POLL_SECONDS
+        self._touched = set()
+        try:
+            async with AsyncSessionLocal() as db:
+                # Reloj de la base, el mismo que escribe updated_at
+                db_now = (await db.execute(select(func.now()))).scalar_one()
+                if self._changed_since is not None:
+                    result = await db.stream(
+                        select(Reminder.id, Reminder.reminder_time, Reminder.completed, Reminder.last_reaction_status)
+                        .where(Reminder.updated_at > self._changed_since)
+                        .execution_options(yield_per=SCHEDULER_BATCH_SIZE)
+                    )
+                    async for reminder_id, reminder_time, completed, status in result:
+                        self.polled += 1
+                        if reminder_id in self._touched:
+                            continue
+                        fire_at = _to_ts(reminder_time)
+                        if completed or status not in ACTIVE_STATUSES:
+                            self._scheduled.pop(reminder_id, None)
+                        elif self._scheduled.get(reminder_id) != fire_at and self._fired.get(reminder_id, (None,))[0] != fire_at:
+                            self._push(reminder_id, fire_at)
+                self._changed_since = db_now - timedelta(seconds=SCHEDULER_POLL_OVERLAP_SECONDS)
+        finally:
+            self._touched = None
+
+        cutoff = time.time() - 2 * (SCHEDULER_POLL_OVERLAP_SECONDS + SCHEDULER_POLL_SECONDS)
+        while self._fired:
+            oldest = next(iter(self._fired))
+            if self._fired[oldest][1] >= cutoff:
+                break
+            del self._fired[oldest]
+
+    def _pop_due(self, now: float) -> List[int]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < SCHEDULER_BATCH_SIZE:
+            fire_at, reminder_id = heapq.heappop(self._heap)
+            if self._scheduled.get(reminder_id) != fire_at:
+                continue
+            del self._scheduled[reminder_id]
+            due.append(reminder_id)
+        return due
+
+    async def _fire(self, reminder_ids: List[int]):
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Reminder, User.telegram_id)
+                .join(User, User.id == Reminder.user_id)
+                .where(Reminder.id.in_(reminder_ids))
+            )).all()
+            now = datetime.now()
+            notified_users = set()
+            messages = []
+            for reminder, telegram_id in rows:
+                if reminder.completed or reminder.last_reaction_status not in ACTIVE_STATUSES or not telegram_id:
+                    self.skipped += 1
+                    continue
+                fire_at = _to_ts(reminder.reminder_time)
+                if fire_at > time.time():
+                    # Pospuesto desde otro worker y aún no visto por el sondeo
+                    self._push(reminder.id, fire_at)
+                    continue
+                metadata = dict(reminder.context_metadata or {})
+                notified_at = metadata.get("last_notified_at")
+                if notified_at and datetime.fromisoformat(notified_at).timestamp() >= fire_at:
+                    self.skipped += 1
+                    continue
+                text = f"⏰ {reminder.text}"
+                if metadata.get("initial_tone"):
+                    text += f"\n\n{metadata['initial_tone']}"
+                metadata["last_notified_at"] = now.isoformat()
+                reminder.context_metadata = metadata
+                notified_users.add(reminder.user_id)
+                messages.append((reminder.id, fire_at, int(telegram_id), text))
+            try:
+                # last_notified_at cambia el listado del usuario: invalida su ETag
+                for user_id in notified_users:
+                    await bump_user_stats(db, user_id)
+                await db.commit()
+            except Exception:
+                # Sin last_notified_at guardado no se envía nada: se reintentan en la siguiente vuelta
+                for reminder_id, fire_at, _, _ in messages:
+                    self._push(reminder_id, fire_at)
+                raise
+
+        # Solo después del commit: si fallara, la siguiente carga o sondeo los volvería a enviar
+        for reminder_id, fire_at, chat_id, text in messages:
+            outbox.enqueue(chat_id, "sendMessage", {
+                "chat_id": chat_id,
+                "text": text,
+                "reply_markup": reminder_keyboard(reminder_id)
+            })
+            self._fired.pop(reminder_id, None)
+            self._fired[reminder_id] = (fire_at, time.time())
+            self.fired += 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._task is not None,
+            "scheduled": len(self._scheduled),
+            "heap_size": len(self._heap),
+            "fired": self.fired,
+            "skipped": self.skipped,
+            "polled": self.polled,
+        }
+
+
+scheduler = ReminderScheduler()
@@ -0,0 +1,153 @@
+import os
+import time
+import importlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+from fastapi import Request, Response
+from backend.app.services.data_version import change_listeners
+
+RESULT_CACHE_ENABLED = os.environ.get("RESULT_CACHE_ENABLED", "1") == "1"
+RESULT_CACHE_TTL_SECONDS = float(os.environ.get("RESULT_CACHE_TTL_SECONDS", "300"))
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Backend compartido opcional, p. ej. "paquete.modulo:Clase" con la interfaz de MemoryBackend
+RESULT_CACHE_BACKEND = os.environ.get("RESULT_CACHE_BACKEND", "")
+
+# (cuerpo JSON, cabeceras a reponer como X-Next-Cursor)
+Entry = Tuple[bytes, Dict[str, str]]
+
+
+class MemoryBackend:
+    """
+    Almacén en proceso acotado por bytes (LRU), con índice por usuario para
+    invalidar todas sus entradas de una vez. Un backend compartido (Redis, etc.)
+    debe exponer los mismos métodos: get, set, invalidate_user, stats.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES, ttl: float = RESULT_CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[Entry, float, int, int]]" = OrderedDict()
+        self._by_user: Dict[int, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(key: Hashable, entry: Entry) -> int:
+        body, headers = entry
+        return len(body) + len(repr(key)) + sum(len(k) + len(v) for k, v in headers.items())
+
+    def get(self, key: Hashable) -> Optional[Entry]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            entry, expires_at = item[:2]
+            if expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, user_id: int, entry: Entry):
+        size = self._size(key, entry)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (entry, time.time() + self.ttl, size, user_id)
+            self._by_user.setdefault(user_id, set()).add(key)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> int:
+        with self._lock:
+            keys = self._by_user.pop(user_id, set())
+            for key in keys:
+                self.bytes -= self._data.pop(key)[2]
+            return len(keys)
+
+    def _remove(self, key: Hashable):
+        _, _, size, user_id = self._data.pop(key)
+        self.bytes -= size
+        user_keys = self._by_user.get(user_id)
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._by_user[user_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "users": len(self._by_user),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+
+def _load_backend():
+    if not RESULT_CACHE_BACKEND:
+        return MemoryBackend()
+    module_name, _, class_name = RESULT_CACHE_BACKEND.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class ResultCache:
+    """
+    Cache por usuario de respuestas ya serializadas (resumen y primera página de los listados).
+    La clave incluye la data_version del usuario, así una escritura en cualquier worker
+    deja de servir las entradas viejas; además las escrituras confirmadas en este proceso
+    borran las entradas del usuario (listener de data_version).
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or _load_backend()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(scope: str, user_id: int, version: int, request: Request) -> Hashable:
+        return (scope, user_id, version, tuple(sorted(request.query_params.multi_items())))
+
+    def get(self, key: Hashable) -> Optional[Response]:
+        if not RESULT_CACHE_ENABLED:
+            return None
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        body, headers = entry
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def set(self, key: Hashable, user_id: int, response: Response, header_names: Tuple[str, ...] = ()):
+        if not RESULT_CACHE_ENABLED:
+            return
+        headers = {name: response.headers[name] for name in header_names if name in response.headers}
+        self.backend.set(key, user_id, (bytes(response.body), headers))
+
+    def invalidate_user(self, user_id: int):
+        if self.backend.invalidate_user(user_id):
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "enabled": RESULT_CACHE_ENABLED,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+            **self.backend.stats(),
+        }
+
+
+result_cache = ResultCache()
+change_listeners.append(result_cache.invalidate_user)
@@ -0,0 +1,61 @@
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Sequence
+from fastapi.responses import Response
+from backend.app.models.activity import Activity
+from backend.app.models.reminder import Reminder
+from backend.app.models.user import User
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Columnas de cada *Response: los listados seleccionan solo esto como tuplas,
+# sin hidratar objetos del ORM ni validar con pydantic fila por fila
+REMINDER_COLUMNS = (
+    Reminder.id, Reminder.user_id, Reminder.text, Reminder.reminder_time, Reminder.completed,
+    Reminder.last_reaction_status, Reminder.context_metadata, Reminder.created_at
+)
+ACTIVITY_COLUMNS = (
+    Activity.id, Activity.user_id, Activity.activity_type, Activity.description, Activity.activity_date,
+    Activity.reminder_id, Activity.metadata_info, Activity.created_at
+)
+USER_COLUMNS = (User.id, User.telegram_id, User.name, User.email, User.created_at)
+
+
+def _default(value: Any):
+    # Mismo formato que pydantic: UTC como "Z"
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """
+    JSONResponse con orjson (si está instalado). Los enums `str` salen como su valor.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def rows_response(rows: Iterable[Sequence], response: Response = None) -> FastJSONResponse:
+    """
+    Serializa filas de select(*COLUMNS) directamente. Al devolver una Response FastAPI
+    no vuelve a validar contra `response_model`, así que se copian las cabeceras
+    (p. ej. X-Next-Cursor) que la ruta puso en `response`.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse([row._asdict() for row in rows], headers=headers)
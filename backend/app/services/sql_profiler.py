@@ -0,0 +1,226 @@
+import os
+import re
+import sys
+import json
+import time
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import event
+
+# Perfil de cada petición y update de Telegram (middleware). Los listeners del engine están
+# siempre: sin un perfil activo solo leen un ContextVar, y sql_profile() funciona en tests
+SQL_PROFILE_ENABLED = os.environ.get("SQL_PROFILE", "0") == "1"
+SQL_PROFILE_SLOW_MS = float(os.environ.get("SQL_PROFILE_SLOW_MS", "100"))
+SQL_PROFILE_REPEAT_THRESHOLD = int(os.environ.get("SQL_PROFILE_REPEAT_THRESHOLD", "5"))
+# Directorio donde se vuelca un JSON por petición con hallazgos (vacío = solo cabecera y log)
+SQL_PROFILE_DIR = os.environ.get("SQL_PROFILE_DIR", "")
+SQL_PROFILE_HEADER = "X-SQL-Profile"
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Frames que no cuentan como origen de la consulta
+_SKIP_FILES = {
+    os.path.abspath(__file__),
+    os.path.join(BACKEND_DIR, "app", "database.py"),
+    os.path.join(BACKEND_DIR, "app", "services", "metrics.py"),
+}
+
+_PARAM_LIST = re.compile(r"\(\s*(?:\$\d+|\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\$\d+|\?|%\(\w+\)s|:\w+))*\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_SPACES = re.compile(r"\s+")
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["QueryProfile"]] = ContextVar("sql_profile", default=None)
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Forma de la sentencia: los parámetros ya vienen como placeholders; se colapsan
+    las listas de IN expandidas y los literales numéricos para agrupar variantes.
+    """
+    shape = _SPACES.sub(" ", statement).strip()
+    shape = _PARAM_LIST.sub("(?)", shape)
+    return _NUMBER.sub("?", shape)
+
+
+def _app_frame(frame) -> Optional[str]:
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(BACKEND_DIR) and filename not in _SKIP_FILES:
+            return f"{os.path.relpath(filename, BACKEND_DIR)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def call_site() -> str:
+    """
+    Primer frame del código de la app que disparó la consulta. Con el engine async la
+    ejecución corre en un greenlet hijo: el llamador está en el frame suspendido del padre.
+    """
+    site = _app_frame(sys._getframe(1))
+    if site is None:
+        try:
+            import greenlet
+            parent = greenlet.getcurrent().parent
+            if parent is not None:
+                site = _app_frame(parent.gr_frame)
+        except ImportError:
+            pass
+    return site or "?"
+
+
+class QueryProfile:
+    """
+    Sentencias de una petición (o de un bloque `sql_profile`) con su duración y origen.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.statements: List[Dict[str, Any]] = []
+        self.closed = False
+
+    def record(self, statement: str, duration_ms: float, site: str):
+        # Tareas lanzadas desde la petición heredan el contexto; tras cerrar no se acumula más
+        if not self.closed:
+            self.statements.append({"statement": statement, "ms": round(duration_ms, 3), "site": site})
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(s["ms"] for s in self.statements), 3)
+
+    def repeated(self, threshold: Optional[int] = None) -> List[Dict[str, Any]]:
+        threshold = threshold or SQL_PROFILE_REPEAT_THRESHOLD
+        groups = defaultdict(list)
+        for s in self.statements:
+            groups[statement_shape(s["statement"])].append(s)
+        return [
+            {
+                "shape": shape,
+                "count": len(items),
+                "total_ms": round(sum(s["ms"] for s in items), 3),
+                "sites": sorted({s["site"] for s in items}),
+            }
+            for shape, items in groups.items() if len(items) >= threshold
+        ]
+
+    def slow(self) -> List[Dict[str, Any]]:
+        return [s for s in self.statements if s["ms"] >= SQL_PROFILE_SLOW_MS]
+
+    def header(self) -> str:
+        return (f"queries={len(self.statements)}; db_ms={self.total_ms}; "
+                f"repeated={len(self.repeated())}; slow={len(self.slow())}")
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "queries": len(self.statements),
+            "db_ms": self.total_ms,
+            "repeated": self.repeated(),
+            "slow": self.slow(),
+            "statements": self.statements,
+        }
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profile_start", []).append((time.perf_counter(), call_site()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    stack = conn.info.get("profile_start")
+    if profile is not None and stack:
+        started, site = stack.pop()
+        profile.record(statement, (time.perf_counter() - started) * 1000, site)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("profile_start"):
+        conn.info["profile_start"].pop()
+
+
+def install_profiler(engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def finish_profile(profile: QueryProfile):
+    """
+    Cierra el perfil y, si hay N+1 o sentencias lentas, lo registra y lo vuelca a SQL_PROFILE_DIR.
+    """
+    profile.closed = True
+    repeated, slow = profile.repeated(), profile.slow()
+    if not repeated and not slow:
+        return
+    logger.warning("SQL profile flagged %s", profile.label, extra={
+        "profile": profile.header(),
+        "repeated": [f"{g['count']}x {g['shape'][:120]} at {', '.join(g['sites'])}" for g in repeated],
+        "slow": [f"{s['ms']}ms {_SPACES.sub(' ', s['statement'])[:120]} at {s['site']}" for s in slow],
+    })
+    if SQL_PROFILE_DIR:
+        os.makedirs(SQL_PROFILE_DIR, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", profile.label).strip("_")[:80]
+        path = os.path.join(SQL_PROFILE_DIR, f"{time.time_ns()}-{name}.json")
+        with open(path, "w") as f:
+            json.dump(profile.report(), f, indent=2, default=str)
+
+
+@contextmanager
+def sql_profile(label: str) -> Iterator[QueryProfile]:
+    """
+    Perfila las consultas del bloque (p. ej. un comando de Telegram o un test).
+    """
+    profile = QueryProfile(label)
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+        finish_profile(profile)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, label: str = "assert_max_queries", max_repeats: int = 1) -> Iterator[QueryProfile]:
+    """
+    Para tests de rutas calientes: falla si el bloque ejecuta más de `max_queries`
+    sentencias o si una misma forma de sentencia aparece más de `max_repeats` veces (N+1).
+    """
+    with sql_profile(label) as profile:
+        yield profile
+    problems = []
+    if len(profile.statements) > max_queries:
+        problems.append(f"{len(profile.statements)} queries, expected at most {max_queries}")
+    for group in profile.repeated(threshold=max_repeats + 1):
+        problems.append(f"{group['count']}x {group['shape'][:160]} at {', '.join(group['sites'])}")
+    if problems:
+        statements = "\n".join(f"  {s['site']}: {_SPACES.sub(' ', s['statement'])[:160]}" for s in profile.statements)
+        raise AssertionError(f"{label}: " + "; ".join(problems) + f"\n{statements}")
+
+
+class SQLProfilerMiddleware:
+    """
+    Perfil por petición HTTP; el resumen va en la cabecera X-SQL-Profile.
+    En respuestas en streaming las consultas posteriores a las cabeceras solo aparecen en el volcado.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        with sql_profile(f"{scope['method']} {scope['path']}") as profile:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (SQL_PROFILE_HEADER.lower().encode(), profile.header().encode())
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
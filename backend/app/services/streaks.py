@@ -0,0 +1,64 @@
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+from sqlalchemy import case
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.models.user_stats import UserStats
+from backend.app.services.user_stats import dialect_insert
+
+
+async def record_completion(db: AsyncSession, user_id: int, day: Optional[date] = None):
+    """
+    Actualiza la racha en O(1): mismo día no cambia, día siguiente suma uno,
+    cualquier hueco la reinicia. Completar también reinicia los fallos recientes.
+    """
+    day = day or datetime.now().date()
+    yesterday = day - timedelta(days=1)
+    stmt = dialect_insert(db)(UserStats).values(
+        user_id=user_id,
+        current_streak=1,
+        last_completion_date=day,
+        recent_failures=0
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            "current_streak": case(
+                (UserStats.last_completion_date >= day, UserStats.current_streak),
+                (UserStats.last_completion_date == yesterday, UserStats.current_streak + 1),
+                else_=1
+            ),
+            "last_completion_date": case(
+                (UserStats.last_completion_date > day, UserStats.last_completion_date),
+                else_=day
+            ),
+            "recent_failures": 0,
+        }
+    )
+    await db.execute(stmt)
+
+
+async def record_failure(db: AsyncSession, user_id: int):
+    stmt = dialect_insert(db)(UserStats).values(user_id=user_id, recent_failures=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={"recent_failures": UserStats.recent_failures + 1}
+    )
+    await db.execute(stmt)
+
+
+def effective_streak(stats: Optional[UserStats], today: Optional[date] = None) -> int:
+    # La racha guardada solo sigue viva si la última vez fue hoy o ayer
+    if not stats or not stats.last_completion_date:
+        return 0
+    today = today or datetime.now().date()
+    if stats.last_completion_date >= today - timedelta(days=1):
+        return stats.current_streak
+    return 0
+
+
+async def get_streak(db: AsyncSession, user_id: int) -> Tuple[int, int]:
+    """
+    Devuelve (racha, fallos recientes) con una sola lectura por clave primaria.
+    """
+    stats = await db.get(UserStats, user_id)
+    return effective_streak(stats), (stats.recent_failures if stats else 0)
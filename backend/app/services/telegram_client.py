@@ -0,0 +1,90 @@
+import os
+import time
+import asyncio
+from typing import Optional
+import httpx
+from backend.app.services.metrics import TELEGRAM_LATENCY
+
+TELEGRAM_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
+TELEGRAM_API_BASE = os.environ.get("TELEGRAM_API_BASE", "https://api.telegram.org")
+
+TELEGRAM_TIMEOUT = float(os.environ.get("TELEGRAM_TIMEOUT", "10"))
+TELEGRAM_CONNECT_TIMEOUT = float(os.environ.get("TELEGRAM_CONNECT_TIMEOUT", "5"))
+TELEGRAM_MAX_CONNECTIONS = int(os.environ.get("TELEGRAM_MAX_CONNECTIONS", "100"))
+TELEGRAM_MAX_KEEPALIVE = int(os.environ.get("TELEGRAM_MAX_KEEPALIVE", "20"))
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class TelegramClient:
+    """
+    Cliente HTTP compartido para la Bot API de Telegram.
+    Se abre y cierra en el lifespan de la app para reutilizar conexiones keep-alive.
+    """
+
+    _client: Optional[httpx.AsyncClient] = None
+    _building: Optional[asyncio.Future] = None
+
+    @classmethod
+    def _build_client(cls) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=f"{TELEGRAM_API_BASE}/bot{TELEGRAM_BOT_TOKEN}/",
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(TELEGRAM_TIMEOUT, connect=TELEGRAM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=TELEGRAM_MAX_CONNECTIONS,
+                max_keepalive_connections=TELEGRAM_MAX_KEEPALIVE,
+            ),
+        )
+
+    @classmethod
+    async def start(cls):
+        # Crear el cliente carga el contexto TLS y los certificados (~0.1 s): se hace en un hilo
+        # para que el lifespan no retrase la primera petición del worker
+        if cls._client is None and cls._building is None:
+            cls._building = asyncio.ensure_future(asyncio.to_thread(cls._build_client))
+
+    @classmethod
+    async def close(cls):
+        if cls._building is not None:
+            await cls._ready()
+        if cls._client is not None:
+            await cls._client.aclose()
+            cls._client = None
+
+    @classmethod
+    async def _ready(cls) -> httpx.AsyncClient:
+        if cls._building is not None:
+            # shield: cancelar una llamada no debe cancelar la construcción que esperan las demás
+            client = await asyncio.shield(cls._building)
+            cls._client, cls._building = client, None
+        return cls.get_client()
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        # Fallback perezoso para scripts que no pasan por el lifespan
+        if cls._client is None:
+            cls._client = cls._build_client()
+        return cls._client
+
+    @classmethod
+    async def call(cls, method: str, payload: dict, timeout: Optional[float] = None) -> httpx.Response:
+        started = time.perf_counter()
+        status = "error"
+        try:
+            client = await cls._ready()
+            if timeout is None:
+                response = await client.post(method, json=payload)
+            else:
+                # getUpdates con long polling necesita más que TELEGRAM_TIMEOUT de lectura
+                response = await client.post(
+                    method, json=payload, timeout=httpx.Timeout(timeout, connect=TELEGRAM_CONNECT_TIMEOUT)
+                )
+            status = str(response.status_code)
+            return response
+        finally:
+            TELEGRAM_LATENCY.labels(method, status).observe(time.perf_counter() - started)
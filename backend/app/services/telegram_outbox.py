@@ -0,0 +1,197 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+import httpx
+from backend.app.services.telegram_client import TelegramClient
+from backend.app.services.logs import correlation, correlation_id
+from backend.app.services.metrics import TELEGRAM_OUTBOX_PENDING
+
+logger = logging.getLogger(__name__)
+
+# Límites de la Bot API: ~30 msg/s global y ~1 msg/s por chat
+OUTBOX_GLOBAL_RATE = float(os.environ.get("OUTBOX_GLOBAL_RATE", "30"))
+OUTBOX_CHAT_RATE = float(os.environ.get("OUTBOX_CHAT_RATE", "1"))
+OUTBOX_CHAT_BURST = float(os.environ.get("OUTBOX_CHAT_BURST", "1"))
+OUTBOX_MAX_RETRIES = int(os.environ.get("OUTBOX_MAX_RETRIES", "5"))
+# 429 seguidos que se toleran antes de descartar: cada uno espera su retry_after
+OUTBOX_MAX_RATE_LIMITS = int(os.environ.get("OUTBOX_MAX_RATE_LIMITS", "10"))
+OUTBOX_BACKOFF_BASE = float(os.environ.get("OUTBOX_BACKOFF_BASE", "0.5"))
+OUTBOX_MAX_PENDING = int(os.environ.get("OUTBOX_MAX_PENDING", "10000"))
+
+
+class TokenBucket:
+    """
+    Token bucket para asyncio (un solo hilo: no necesita lock).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until_full(self) -> float:
+        self._refill()
+        return (self.capacity - self.tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class TelegramOutbox:
+    """
+    Cola de salida hacia Telegram con límites global y por chat, reintentos con
+    backoff y respeto de `retry_after` en respuestas 429.
+    Cada chat tiene su propia cola FIFO y un worker que vive mientras haya mensajes,
+    así se conserva el orden por chat sin bloquear a los demás.
+    """
+
+    def __init__(self, send: Optional[Callable[[str, dict], Awaitable[httpx.Response]]] = None):
+        self._send = send or TelegramClient.call
+        self.global_bucket = TokenBucket(OUTBOX_GLOBAL_RATE, OUTBOX_GLOBAL_RATE)
+        self._queues: Dict[int, Deque[tuple]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self.pending = 0
+        self.sent = 0
+        self.retried = 0
+        self.rate_limited = 0
+        self.dropped = 0
+
+    def enqueue(self, chat_id: int, method: str, payload: dict) -> bool:
+        """
+        Encola una llamada y regresa inmediatamente. Devuelve False si la cola está llena.
+        """
+        if self.pending >= OUTBOX_MAX_PENDING:
+            self.dropped += 1
+            logger.warning("Telegram outbox full, dropping message", extra={"method": method, "chat_id": chat_id})
+            return False
+        # Se guarda el id de la petición/update que originó el mensaje para los logs de entrega
+        self._queues.setdefault(chat_id, deque()).append((method, payload, correlation_id.get()))
+        self.pending += 1
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._chat_worker(chat_id))
+        return True
+
+    async def _chat_worker(self, chat_id: int):
+        queue = self._queues[chat_id]
+        bucket = self._chat_buckets.setdefault(chat_id, TokenBucket(OUTBOX_CHAT_RATE, OUTBOX_CHAT_BURST))
+        try:
+            while True:
+                while queue:
+                    method, payload, origin = queue[0]
+                    try:
+                        with correlation(origin):
+                            await self._deliver(chat_id, bucket, method, payload)
+                    finally:
+                        # También si _deliver falla o se cancela: la cabeza no debe quedar atascada
+                        queue.popleft()
+                        self.pending -= 1
+                # Esperar a que el bucket se llene antes de soltar su estado,
+                # para que un chat nuevo no obtenga ráfaga extra
+                await asyncio.sleep(bucket.time_until_full())
+                if not queue:
+                    break
+        finally:
+            self._workers.pop(chat_id, None)
+            if not queue:
+                self._queues.pop(chat_id, None)
+                self._chat_buckets.pop(chat_id, None)
+
+    async def _deliver(self, chat_id: int, bucket: TokenBucket, method: str, payload: dict):
+        attempt = 0
+        rate_limits = 0
+        while True:
+            await bucket.acquire()
+            await self.global_bucket.acquire()
+            try:
+                response = await self._send(method, payload)
+            except httpx.HTTPError as e:
+                response = None
+                error = str(e)
+            except Exception:
+                # Error propio (payload no serializable, bug en _send): reintentar no lo arregla
+                self.dropped += 1
+                logger.exception("Telegram message failed", extra={"method": method, "chat_id": chat_id})
+                return
+
+            if response is not None:
+                if response.status_code < 400:
+                    self.sent += 1
+                    return
+                if response.status_code == 429:
+                    self.rate_limited += 1
+                    rate_limits += 1
+                    if rate_limits > OUTBOX_MAX_RATE_LIMITS:
+                        self.dropped += 1
+                        logger.error("Telegram message dropped after repeated rate limits", extra={
+                            "method": method, "chat_id": chat_id, "rate_limits": rate_limits
+                        })
+                        return
+                    retry_after = self._retry_after(response)
+                    await asyncio.sleep(retry_after)
+                    continue
+                if response.status_code < 500:
+                    self.dropped += 1
+                    logger.warning("Telegram rejected message", extra={
+                        "method": method, "chat_id": chat_id, "status": response.status_code, "body": response.text
+                    })
+                    return
+                error = f"HTTP {response.status_code}"
+
+            attempt += 1
+            if attempt > OUTBOX_MAX_RETRIES:
+                self.dropped += 1
+                logger.error("Telegram message failed", extra={
+                    "method": method, "chat_id": chat_id, "attempts": attempt, "error": error
+                })
+                return
+            self.retried += 1
+            await asyncio.sleep(OUTBOX_BACKOFF_BASE * (2 ** (attempt - 1)))
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float:
+        try:
+            return float(response.json().get("parameters", {}).get("retry_after", 1))
+        except Exception:
+            return float(response.headers.get("Retry-After", 1))
+
+    async def drain(self, timeout: float = 10.0):
+        """
+        Espera a que se vacíen las colas (al apagar la app) y cancela lo que quede.
+        """
+        workers = list(self._workers.values())
+        if not workers:
+            return
+        done, not_done = await asyncio.wait(workers, timeout=timeout)
+        for task in not_done:
+            task.cancel()
+        if not_done:
+            logger.warning("Telegram outbox shutdown with messages undelivered", extra={"pending": self.pending})
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "active_chats": len(self._workers),
+            "sent": self.sent,
+            "retried": self.retried,
+            "rate_limited": self.rate_limited,
+            "dropped": self.dropped,
+        }
+
+
+outbox = TelegramOutbox()
+TELEGRAM_OUTBOX_PENDING.set_function(lambda: outbox.pending)
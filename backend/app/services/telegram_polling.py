@@ -0,0 +1,135 @@
+import os
+import asyncio
+import logging
+from typing import Optional
+from backend.app.services.telegram_client import TelegramClient, TELEGRAM_BOT_TOKEN
+from backend.app.services.telegram_updates import UpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+# "webhook" (por defecto) o "polling" para correr detrás de NAT sin dominio público
+TELEGRAM_INGEST = os.environ.get("TELEGRAM_INGEST", "webhook")
+POLL_TIMEOUT_SECONDS = int(os.environ.get("POLL_TIMEOUT_SECONDS", "30"))
+POLL_LIMIT = int(os.environ.get("POLL_LIMIT", "100"))
+POLL_ERROR_BACKOFF_SECONDS = float(os.environ.get("POLL_ERROR_BACKOFF_SECONDS", "5"))
+# Tope del backoff exponencial ante fallos seguidos de deleteWebhook/getUpdates
+POLL_MAX_BACKOFF_SECONDS = float(os.environ.get("POLL_MAX_BACKOFF_SECONDS", "60"))
+
+
+class TelegramPoller:
+    """
+    Ingesta alternativa al webhook: getUpdates con long polling.
+    Cada lote pasa por UpdateProcessor.process_batch (la misma lógica del webhook,
+    chats en paralelo y orden por chat) y el offset avanza solo cuando el lote
+    terminó; Telegram da por confirmados los updates en el siguiente getUpdates.
+    """
+
+    def __init__(self, processor: UpdateProcessor):
+        self._processor = processor
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # True mientras se espera a Telegram (o el backoff): ahí se puede cancelar sin perder trabajo
+        self._waiting = False
+        self._webhook_deleted = False
+        self._failures = 0
+        self.offset: Optional[int] = None
+        self.batches = 0
+        self.updates = 0
+        self.errors = 0
+
+    async def start(self):
+        if TELEGRAM_INGEST != "polling" or not TELEGRAM_BOT_TOKEN or self._task is not None:
+            return
+        self._stopping = False
+        self._webhook_deleted = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Termina el lote en curso, confirma el offset y sale.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        if self._waiting:
+            self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.offset is not None:
+            try:
+                await TelegramClient.call("getUpdates", {"offset": self.offset, "timeout": 0, "limit": 1})
+            except Exception as e:
+                logger.warning("Could not confirm Telegram offset", extra={"offset": self.offset, "error": str(e)})
+
+    async def _run(self):
+        try:
+            while not self._stopping:
+                if not self._webhook_deleted:
+                    self._webhook_deleted = await self._delete_webhook()
+                    continue
+                batch = await self._poll()
+                if not batch:
+                    continue
+                self._waiting = False
+                await self._processor.process_batch(batch)
+                self.offset = max(update["update_id"] for update in batch) + 1
+                self.batches += 1
+                self.updates += len(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Telegram poller stopped")
+            raise
+
+    async def _delete_webhook(self) -> bool:
+        # getUpdates no funciona mientras haya un webhook registrado
+        self._waiting = True
+        try:
+            response = await TelegramClient.call("deleteWebhook", {"drop_pending_updates": False})
+            body = response.json()
+            if not body.get("ok"):
+                raise RuntimeError(f"{response.status_code} {body.get('description')}")
+        except Exception as e:
+            await self._backoff("Telegram deleteWebhook failed", e)
+            return False
+        self._failures = 0
+        return True
+
+    async def _poll(self):
+        self._waiting = True
+        payload = {"timeout": POLL_TIMEOUT_SECONDS, "limit": POLL_LIMIT}
+        if self.offset is not None:
+            payload["offset"] = self.offset
+        try:
+            response = await TelegramClient.call("getUpdates", payload, timeout=POLL_TIMEOUT_SECONDS + 10)
+            body = response.json()
+            if response.status_code == 409:
+                # Alguien volvió a registrar un webhook: se borra otra vez antes de seguir
+                self._webhook_deleted = False
+            if not body.get("ok"):
+                raise RuntimeError(f"{response.status_code} {body.get('description')}")
+        except Exception as e:
+            await self._backoff("Telegram getUpdates failed", e)
+            return []
+        self._failures = 0
+        return body["result"]
+
+    async def _backoff(self, message: str, error: Exception):
+        delay = min(POLL_ERROR_BACKOFF_SECONDS * 2 ** self._failures, POLL_MAX_BACKOFF_SECONDS)
+        self._failures += 1
+        self.errors += 1
+        logger.warning(message, extra={"error": str(error), "retry_in_s": delay})
+        await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "mode": TELEGRAM_INGEST,
+            "running": self._task is not None and not self._task.done(),
+            "offset": self.offset,
+            "batches": self.batches,
+            "updates": self.updates,
+            "errors": self.errors,
+        }
@@ -0,0 +1,170 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+from backend.app.services.logs import correlation
+from backend.app.services.metrics import TELEGRAM_UPDATE_LAG
+
+logger = logging.getLogger(__name__)
+
+# Workers procesando updates a la vez (cada uno abre su sesión de base de datos)
+UPDATE_WORKERS = int(os.environ.get("UPDATE_WORKERS", "16"))
+UPDATE_MAX_PENDING = int(os.environ.get("UPDATE_MAX_PENDING", "10000"))
+# update_id recientes recordados para descartar reenvíos de Telegram
+UPDATE_DEDUP_SIZE = int(os.environ.get("UPDATE_DEDUP_SIZE", "10000"))
+
+
+def update_chat_id(update: Dict[str, Any]) -> Optional[int]:
+    if "callback_query" in update:
+        return update["callback_query"].get("message", {}).get("chat", {}).get("id")
+    for key in ("message", "edited_message"):
+        if key in update:
+            return update[key].get("chat", {}).get("id")
+    return None
+
+
+class UpdateProcessor:
+    """
+    Procesa updates de Telegram fuera del request del webhook.
+    submit() descarta duplicados por `update_id`, encola y regresa de inmediato.
+    Cada chat tiene su cola FIFO y un worker que vive mientras haya updates
+    (igual que el outbox), así se conserva el orden por chat; un semáforo limita
+    cuántos updates se procesan a la vez en total.
+    process_batch() aplica las mismas reglas a un lote de getUpdates y espera a
+    que termine, para que el poller confirme el offset solo después.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Awaitable[Any]]):
+        self._handler = handler
+        self._seen: "OrderedDict[int, None]" = OrderedDict()
+        self._queues: Dict[Hashable, Deque[Tuple[float, Dict[str, Any]]]] = {}
+        self._workers: Dict[Hashable, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.pending = 0
+        self.processed = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.lag_last_ms = 0.0
+        self.lag_max_ms = 0.0
+        self._lag_total_ms = 0.0
+        self._lag_samples = 0
+
+    def is_duplicate(self, update_id: int) -> bool:
+        return update_id in self._seen
+
+    def mark_seen(self, update_id: int):
+        self._seen[update_id] = None
+        self._seen.move_to_end(update_id)
+        if len(self._seen) > UPDATE_DEDUP_SIZE:
+            self._seen.popitem(last=False)
+
+    def submit(self, update: Dict[str, Any]) -> bool:
+        """
+        Encola un update. Devuelve False si es un duplicado o si la cola está llena
+        (en ese caso no se marca como visto, para aceptar el reenvío de Telegram).
+        """
+        update_id = update["update_id"]
+        if self.is_duplicate(update_id):
+            self.duplicates += 1
+            return False
+        if self.pending >= UPDATE_MAX_PENDING:
+            self.rejected += 1
+            return False
+        self.mark_seen(update_id)
+        key = self._order_key(update)
+        self._queues.setdefault(key, deque()).append((time.monotonic(), update))
+        self.pending += 1
+        if key not in self._workers:
+            self._workers[key] = asyncio.create_task(self._chat_worker(key))
+        return True
+
+    async def process_batch(self, batch: List[Dict[str, Any]]):
+        """
+        Procesa un lote completo: chats distintos en paralelo, cada chat en orden.
+        """
+        enqueued_at = time.monotonic()
+        groups: Dict[Hashable, List[Dict[str, Any]]] = {}
+        for update in batch:
+            if self.is_duplicate(update["update_id"]):
+                self.duplicates += 1
+                continue
+            self.mark_seen(update["update_id"])
+            groups.setdefault(self._order_key(update), []).append(update)
+        self.pending += sum(len(updates) for updates in groups.values())
+
+        async def run_chat(updates: List[Dict[str, Any]]):
+            for update in updates:
+                await self._process(enqueued_at, update)
+                self.pending -= 1
+
+        await asyncio.gather(*[run_chat(updates) for updates in groups.values()])
+
+    @staticmethod
+    def _order_key(update: Dict[str, Any]) -> Hashable:
+        # Sin chat (p. ej. inline queries) no hay orden que respetar
+        key = update_chat_id(update)
+        return key if key is not None else ("update", update["update_id"])
+
+    async def _chat_worker(self, key: Hashable):
+        queue = self._queues[key]
+        try:
+            while queue:
+                enqueued_at, update = queue[0]
+                await self._process(enqueued_at, update)
+                queue.popleft()
+                self.pending -= 1
+        finally:
+            self._workers.pop(key, None)
+            if not queue:
+                self._queues.pop(key, None)
+
+    async def _process(self, enqueued_at: float, update: Dict[str, Any]):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(UPDATE_WORKERS)
+        # Los workers nacen en el contexto de la petición que los creó; cada update lleva su propio id
+        async with self._semaphore:
+            self._record_lag(enqueued_at)
+            with correlation(f"tg-{update.get('update_id')}"):
+                try:
+                    await self._handler(update)
+                    self.processed += 1
+                except Exception:
+                    self.failed += 1
+                    logger.exception("Error processing Telegram update", extra={"update_id": update.get("update_id")})
+
+    def _record_lag(self, enqueued_at: float):
+        lag = (time.monotonic() - enqueued_at) * 1000
+        TELEGRAM_UPDATE_LAG.observe(lag / 1000)
+        self.lag_last_ms = lag
+        self.lag_max_ms = max(self.lag_max_ms, lag)
+        self._lag_total_ms += lag
+        self._lag_samples += 1
+
+    async def drain(self, timeout: float = 10.0):
+        """
+        Espera a que se procesen los updates encolados (al apagar la app) y cancela lo que quede.
+        """
+        workers = list(self._workers.values())
+        if not workers:
+            return
+        done, not_done = await asyncio.wait(workers, timeout=timeout)
+        for task in not_done:
+            task.cancel()
+        if not_done:
+            logger.warning("Telegram update processor shutdown with updates unprocessed", extra={"pending": self.pending})
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "active_chats": len(self._workers),
+            "processed": self.processed,
+            "failed": self.failed,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "lag_last_ms": round(self.lag_last_ms, 1),
+            "lag_max_ms": round(self.lag_max_ms, 1),
+            "lag_avg_ms": round(self._lag_total_ms / self._lag_samples, 1) if self._lag_samples else 0.0,
+        }
@@ -0,0 +1,36 @@
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.models.user_stats import UserStats
+from backend.app.services.data_version import mark_user_changed
+
+
+def dialect_insert(db: AsyncSession):
+    # INSERT con soporte de ON CONFLICT para el dialecto de la sesión
+    return pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+
+
+async def bump_user_stats(db: AsyncSession, user_id: int, reminders: int = 0, completed: int = 0, activities: int = 0):
+    """
+    Aplica deltas a los contadores del usuario con un upsert atómico y sube su data_version.
+    Debe llamarse antes del commit para que viaje en la misma transacción que la escritura;
+    toda ruta que modifique datos del usuario la llama, aunque sea sin deltas.
+    """
+    stmt = dialect_insert(db)(UserStats).values(
+        user_id=user_id,
+        total_reminders=reminders,
+        completed_reminders=completed,
+        total_activities=activities,
+        data_version=1
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStats.user_id],
+        set_={
+            "total_reminders": UserStats.total_reminders + stmt.excluded.total_reminders,
+            "completed_reminders": UserStats.completed_reminders + stmt.excluded.completed_reminders,
+            "total_activities": UserStats.total_activities + stmt.excluded.total_activities,
+            "data_version": UserStats.data_version + 1,
+        }
+    )
+    await db.execute(stmt)
+    mark_user_changed(db, user_id)
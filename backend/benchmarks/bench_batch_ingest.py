@@ -0,0 +1,89 @@
+"""
+Throughput de alta de actividades y recordatorios: un POST por elemento contra
+POST .../batch con todos los elementos en una sola transacción.
+
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.bench_batch_ingest --items 2000
+"""
+import time
+import argparse
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert
+from backend.app.database import Base, engine
+from backend.app.models import User, Reminder, Activity, UserStats
+from backend.app.auth import get_current_user
+from backend.app.main import app
+
+BENCH_SUPABASE_ID = "bench-batch-user"
+
+
+def seed_user() -> User:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        reset(conn)
+        user_id = conn.execute(
+            insert(User).values(supabase_user_id=BENCH_SUPABASE_ID, name="bench").returning(User.id)
+        ).scalar_one()
+    return User(id=user_id, supabase_user_id=BENCH_SUPABASE_ID, name="bench")
+
+
+def reset(conn):
+    user_ids = User.__table__.select().with_only_columns(User.id).where(User.supabase_user_id == BENCH_SUPABASE_ID)
+    for model in (Activity, Reminder, UserStats):
+        conn.execute(delete(model).where(model.user_id.in_(user_ids)))
+    conn.execute(delete(User).where(User.supabase_user_id == BENCH_SUPABASE_ID))
+
+
+def payloads(n: int):
+    base = datetime.now() + timedelta(days=30)
+    activities = [
+        {"activity_type": "steps", "description": f"sample {i}", "activity_date": (base + timedelta(minutes=i)).isoformat()}
+        for i in range(n)
+    ]
+    reminders = [
+        {"text": f"habit {i}", "reminder_time": (base + timedelta(minutes=i)).isoformat()}
+        for i in range(n)
+    ]
+    return {"agenda": activities, "reminders": reminders}
+
+
+def report(name, n, elapsed):
+    print(f"{name:22} {n / elapsed:9.1f} items/s  {elapsed:7.2f}s")
+
+
+def run(client, user_id, n, single_limit):
+    for path, items in payloads(n).items():
+        single_items = items[:single_limit]
+        start = time.perf_counter()
+        for item in single_items:
+            client.post(f"/api/{path}/{user_id}", json=item).raise_for_status()
+        report(f"{path} single", len(single_items), time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = client.post(f"/api/{path}/{user_id}/batch", json=items)
+        response.raise_for_status()
+        assert len(response.json()["created"]) == n
+        report(f"{path} batch", n, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--single-limit", type=int, default=500, help="items posted one by one")
+    args = parser.parse_args()
+    user = seed_user()
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        with TestClient(app) as client:
+            run(client, user.id, args.items, min(args.single_limit, args.items))
+    finally:
+        with engine.begin() as conn:
+            reset(conn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Throughput de evaluate_context (una llamada por contexto) contra evaluate_contexts
+(lotes empaquetados) usando el proveedor falso de fake_openrouter.
+
+    python -m backend.benchmarks.bench_llm_batch --contexts 1000 --latency 0.3
+"""
+import os
+import time
+import asyncio
+import argparse
+
+PORT = 8765
+os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{PORT}/v1"
+os.environ["OPENROUTER_API_KEY"] = "fake"
+# 1000 llamadas sueltas esperan su cupo mucho más que el deadline de cada llamada HTTP
+os.environ.setdefault("LLM_QUEUE_TIMEOUT_SECONDS", "120")
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from backend.app.services.reminder_intelligence import ReminderIntelligence, DEFAULT_ADVICE
+from backend.benchmarks import fake_openrouter
+
+
+def make_contexts(n: int):
+    return [{"user_id": i, "streak": i % 30, "failures": i % 4, "pending": i % 7} for i in range(n)]
+
+
+async def measure(name, fn, contexts):
+    fake_openrouter.counters.update(requests=0, max_in_flight=0)
+    start = time.perf_counter()
+    results = await fn(contexts)
+    elapsed = time.perf_counter() - start
+    fallbacks = sum(1 for r in results if r == DEFAULT_ADVICE)
+    print(f"{name:10} {len(contexts) / elapsed:9.1f} contexts/s  {elapsed:6.2f}s  "
+          f"requests={fake_openrouter.counters['requests']} max_in_flight={fake_openrouter.counters['max_in_flight']} "
+          f"fallbacks={fallbacks} breaker={ReminderIntelligence.breaker.state}")
+    ReminderIntelligence.breaker.record_success()
+
+
+async def single(contexts):
+    return await asyncio.gather(*[ReminderIntelligence.evaluate_context(c) for c in contexts])
+
+
+async def run(n: int):
+    contexts = make_contexts(n)
+    await measure("single", single, contexts)
+    await measure("batched", ReminderIntelligence.evaluate_contexts, contexts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--contexts", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    fake_openrouter.settings.update(latency=args.latency, failure_rate=args.failure_rate)
+    fake_openrouter.serve_in_thread(PORT)
+    asyncio.run(run(args.contexts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+Carga reproducible sobre la app completa. Siembra usuarios con recordatorios y actividades
+en DATABASE_URL y levanta `backend.app.main:app` con uvicorn en un subproceso. La Bot API
+de Telegram y OpenRouter son las falsas de este paquete, servidas desde este proceso.
+Mide throughput y p50/p95/p99 por ruta y los escribe en un JSON para comparar entre commits.
+
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.bench_load --users 100 --concurrency 32 --duration 30 -o load.json
+    python -m backend.benchmarks.bench_load --compare base.json load.json
+
+Con la misma semilla y escala, los datos sembrados y la secuencia de peticiones de cada
+worker se repiten entre corridas (los datos se vuelven a sembrar al inicio).
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import signal
+import asyncio
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import httpx
+import jwt
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import select, insert, delete
+from backend.app.database import Base, engine
+from backend.app.models import User, Reminder, Activity, AIHistory, UserStats
+from backend.benchmarks import fake_telegram, fake_openrouter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BENCH_PREFIX = "bench-load-"
+BENCH_JWT_SECRET = "bench-load-secret"
+# telegram_id de los usuarios sembrados: BASE + índice
+TELEGRAM_ID_BASE = 700000000
+# Fechas fijas: los recordatorios quedan lejos de la ventana del scheduler
+REMINDER_BASE = datetime(2030, 1, 1, 9, 0)
+ACTIVITY_BASE = datetime(2025, 1, 1, 9, 0)
+INSERT_CHUNK = 10000
+
+DEFAULT_MIX = "reminders=20,agenda=15,summary=15,summary_poll=15,create_reminder=5,update_reminder=5,create_activity=5,webhook=20"
+
+
+def seed(users: int, reminders: int, activities: int) -> List[dict]:
+    """
+    Borra los datos de una corrida anterior y siembra `users` usuarios con su historial
+    y sus contadores en user_stats. Devuelve los usuarios con los ids de sus recordatorios.
+    """
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        old_ids = select(User.id).where(User.supabase_user_id.like(f"{BENCH_PREFIX}%")).scalar_subquery()
+        for model in (Activity, AIHistory, Reminder, UserStats):
+            conn.execute(delete(model).where(model.user_id.in_(old_ids)))
+        conn.execute(delete(User).where(User.supabase_user_id.like(f"{BENCH_PREFIX}%")))
+
+        user_ids = conn.execute(insert(User).returning(User.id, sort_by_parameter_order=True), [
+            {"supabase_user_id": f"{BENCH_PREFIX}{i}", "telegram_id": str(TELEGRAM_ID_BASE + i), "name": f"bench{i}"}
+            for i in range(users)
+        ]).scalars().all()
+
+        reminder_rows = [
+            {"user_id": user_id, "text": f"bench {i}", "reminder_time": REMINDER_BASE + timedelta(hours=i),
+             "completed": i % 3 == 0}
+            for user_id in user_ids for i in range(reminders)
+        ]
+        reminder_ids = []
+        for start in range(0, len(reminder_rows), INSERT_CHUNK):
+            reminder_ids += conn.execute(
+                insert(Reminder).returning(Reminder.id, sort_by_parameter_order=True),
+                reminder_rows[start:start + INSERT_CHUNK]
+            ).scalars().all()
+
+        activity_rows = [
+            {"user_id": user_id, "activity_type": "completed_reminder" if i % 2 else "exercise",
+             "description": f"bench {i}", "activity_date": ACTIVITY_BASE - timedelta(hours=i)}
+            for user_id in user_ids for i in range(activities)
+        ]
+        for start in range(0, len(activity_rows), INSERT_CHUNK):
+            conn.execute(insert(Activity), activity_rows[start:start + INSERT_CHUNK])
+
+        conn.execute(insert(UserStats), [
+            {"user_id": user_id, "total_reminders": reminders, "completed_reminders": (reminders + 2) // 3,
+             "total_activities": activities}
+            for user_id in user_ids
+        ])
+        if engine.dialect.name == "postgresql":
+            for table in ("users", "reminders", "activities", "user_stats"):
+                conn.exec_driver_sql(f"ANALYZE {table}")
+
+    return [
+        {
+            "id": user_id,
+            "chat_id": TELEGRAM_ID_BASE + i,
+            "token": jwt.encode(
+                {"sub": f"{BENCH_PREFIX}{i}", "aud": "authenticated", "exp": int(time.time()) + 24 * 3600},
+                BENCH_JWT_SECRET, algorithm="HS256"
+            ),
+            "reminder_ids": reminder_ids[i * reminders:(i + 1) * reminders],
+        }
+        for i, user_id in enumerate(user_ids)
+    ]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, route: str, elapsed_ms: float, status: str, ok: bool):
+        self.samples.setdefault(route, []).append(elapsed_ms)
+        counts = self.statuses.setdefault(route, {})
+        counts[status] = counts.get(status, 0) + 1
+        if not ok:
+            self.errors[route] = self.errors.get(route, 0) + 1
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    # Rango más cercano: estable y sin interpolar entre corridas
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+
+def summarize(recorder: Recorder, duration: float) -> Dict[str, dict]:
+    routes = {}
+    for route, values in sorted(recorder.samples.items()):
+        values = sorted(values)
+        routes[route] = {
+            "requests": len(values),
+            "errors": recorder.errors.get(route, 0),
+            "status": recorder.statuses[route],
+            "rps": round(len(values) / duration, 2),
+            "mean_ms": round(sum(values) / len(values), 3),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3),
+        }
+    return routes
+
+
+class Scenario:
+    """
+    Una petición por tipo de tráfico: paneles (listados, resumen, sondeo con ETag),
+    escrituras y updates de Telegram por el webhook.
+    """
+
+    def __init__(self, users: List[dict], seed_value: int):
+        self.users = users
+        self.etags: Dict[int, str] = {}
+        # update_id únicos entre workers para que el dedup no descarte updates
+        self.next_update_id = seed_value * 10_000_000 + 1
+
+    def _auth(self, user):
+        return {"Authorization": f"Bearer {user['token']}"}
+
+    def build(self, name: str, rng: random.Random):
+        user = rng.choice(self.users)
+        uid = user["id"]
+        if name == "reminders":
+            return "GET /api/reminders/{user_id}", "GET", f"/api/reminders/{uid}", self._auth(user), None
+        if name == "agenda":
+            return "GET /api/agenda/{user_id}", "GET", f"/api/agenda/{uid}", self._auth(user), None
+        if name == "summary":
+            return "GET /api/summary/{user_id}", "GET", f"/api/summary/{uid}", self._auth(user), None
+        if name == "summary_poll":
+            headers = self._auth(user)
+            if uid in self.etags:
+                headers["If-None-Match"] = self.etags[uid]
+            return "GET /api/summary/{user_id} (poll)", "GET", f"/api/summary/{uid}", headers, None
+        if name == "create_reminder":
+            body = {"text": "bench new", "reminder_time": (REMINDER_BASE + timedelta(days=rng.randint(1, 365))).isoformat()}
+            return "POST /api/reminders/{user_id}", "POST", f"/api/reminders/{uid}", self._auth(user), body
+        if name == "update_reminder":
+            reminder_id = rng.choice(user["reminder_ids"])
+            return ("PUT /api/reminders/{user_id}/{reminder_id}", "PUT", f"/api/reminders/{uid}/{reminder_id}",
+                    self._auth(user), {"completed": rng.random() < 0.5})
+        if name == "create_activity":
+            body = {"activity_type": "exercise", "description": "bench", "activity_date": ACTIVITY_BASE.isoformat()}
+            return "POST /api/agenda/{user_id}", "POST", f"/api/agenda/{uid}", self._auth(user), body
+        if name == "webhook":
+            return "POST /api/telegram/webhook", "POST", "/api/telegram/webhook", {}, self._update(user, rng)
+        raise ValueError(f"Unknown scenario: {name}")
+
+    def _update(self, user: dict, rng: random.Random) -> dict:
+        update_id = self.next_update_id
+        self.next_update_id += 1
+        roll = rng.random()
+        if roll < 0.1 and user["reminder_ids"]:
+            return {
+                "update_id": update_id,
+                "callback_query": {
+                    "id": str(update_id),
+                    "data": f"done:{rng.choice(user['reminder_ids'])}",
+                    "from": {"id": user["chat_id"], "is_bot": False, "first_name": "bench"},
+                    "message": {"message_id": update_id, "chat": {"id": user["chat_id"], "type": "private"}},
+                },
+            }
+        text = "/add bench desde telegram" if roll < 0.3 else "/reminders"
+        return fake_telegram.make_message(user["chat_id"], text, update_id=update_id)
+
+
+async def worker(index: int, client: httpx.AsyncClient, scenario: Scenario, mix, seed_value: int,
+                 deadline: float, warmup_until: float, recorder: Recorder):
+    rng = random.Random(seed_value * 1000 + index)
+    names, weights = zip(*mix)
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        route, method, path, headers, body = scenario.build(name, rng)
+        started = time.monotonic()
+        try:
+            response = await client.request(method, path, headers=headers, json=body)
+            status = str(response.status_code)
+            ok = response.status_code < 400
+            if ok and "etag" in response.headers and route.startswith("GET /api/summary"):
+                scenario.etags[int(path.rsplit("/", 1)[1])] = response.headers["etag"]
+        except httpx.HTTPError as e:
+            status, ok = type(e).__name__, False
+        if started >= warmup_until:
+            recorder.add(route, (time.monotonic() - started) * 1000, status, ok)
+
+
+async def wait_for_updates(client: httpx.AsyncClient, timeout: float = 60.0) -> dict:
+    # El webhook confirma antes de procesar: se espera a que la cola quede vacía
+    deadline = time.monotonic() + timeout
+    stats = {}
+    while time.monotonic() < deadline:
+        stats = (await client.get("/health")).json()
+        if stats["telegram_updates"]["pending"] == 0:
+            break
+        await asyncio.sleep(0.2)
+    return stats
+
+
+async def drive(args, users: List[dict], mix) -> dict:
+    scenario = Scenario(users, args.seed)
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=30) as client:
+        start = time.monotonic()
+        warmup_until = start + args.warmup
+        deadline = warmup_until + args.duration
+        await asyncio.gather(*[
+            worker(i, client, scenario, mix, args.seed, deadline, warmup_until, recorder)
+            for i in range(args.concurrency)
+        ])
+        duration = time.monotonic() - warmup_until
+        health = await wait_for_updates(client)
+
+    routes = summarize(recorder, duration)
+    total = sum(r["requests"] for r in routes.values())
+    return {
+        "totals": {
+            "requests": total,
+            "errors": sum(r["errors"] for r in routes.values()),
+            "duration_s": round(duration, 3),
+            "rps": round(total / duration, 2),
+        },
+        "routes": routes,
+        "telegram_updates": health.get("telegram_updates", {}),
+        "fake_telegram": dict(fake_telegram.counters),
+        "fake_openrouter": {"requests": fake_openrouter.counters["requests"],
+                            "max_in_flight": fake_openrouter.counters["max_in_flight"]},
+    }
+
+
+def start_server(args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update(
+        SUPABASE_JWT_SECRET=BENCH_JWT_SECRET,
+        TELEGRAM_BOT_TOKEN="bench",
+        TELEGRAM_API_BASE=f"http://127.0.0.1:{args.telegram_port}",
+        TELEGRAM_INGEST="webhook",
+        OPENROUTER_BASE_URL=f"http://127.0.0.1:{args.openrouter_port}/v1",
+        OPENROUTER_API_KEY="bench",
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+        cwd=REPO_ROOT, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    sys.exit("Server did not become ready")
+
+
+def stop_server(process: subprocess.Popen):
+    # SIGINT: uvicorn corre el shutdown del lifespan (drain de colas)
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def parse_mix(value: str):
+    mix = []
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix.append((name.strip(), float(weight or 1)))
+    return mix
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: dict):
+    print(f"{'route':48} {'req':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for route, r in report["routes"].items():
+        print(f"{route:48} {r['requests']:7} {r['errors']:5} {r['rps']:8.1f} "
+              f"{r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {r['p99_ms']:8.2f}")
+    t = report["totals"]
+    print(f"total {t['requests']} requests, {t['errors']} errors, {t['rps']} req/s over {t['duration_s']}s")
+    u = report["telegram_updates"]
+    if u:
+        print(f"telegram updates processed={u.get('processed')} failed={u.get('failed')} lag_max_ms={u.get('lag_max_ms')}")
+
+
+def compare(base_path: str, new_path: str):
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{base.get('meta', {}).get('commit')} -> {new.get('meta', {}).get('commit')}")
+    print(f"{'route':48} {'rps':>16} {'p50_ms':>18} {'p95_ms':>18} {'p99_ms':>18}")
+
+    def delta(old, cur):
+        if old is None or cur is None:
+            return f"{'-':>18}"
+        change = (cur - old) / old * 100 if old else 0.0
+        return f"{cur:9.2f} ({change:+5.1f}%)"
+
+    for route in sorted(set(base["routes"]) | set(new["routes"])):
+        old, cur = base["routes"].get(route, {}), new["routes"].get(route, {})
+        print(f"{route:48} " + " ".join(delta(old.get(k), cur.get(k)) for k in ("rps", "p50_ms", "p95_ms", "p99_ms")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load benchmark over the full app with fake Telegram and OpenRouter")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--reminders", type=int, default=200, help="reminders per user")
+    parser.add_argument("--activities", type=int, default=500, help="activities per user")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds excluded from the results")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,...")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--telegram-port", type=int, default=8181)
+    parser.add_argument("--openrouter-port", type=int, default=8765)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--telegram-latency", type=float, default=0.0)
+    parser.add_argument("-o", "--output", default="bench_load.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    mix = parse_mix(args.mix)
+    seed_start = time.perf_counter()
+    users = seed(args.users, args.reminders, args.activities)
+    print(f"Seeded {args.users} users x ({args.reminders} reminders, {args.activities} activities) "
+          f"in {time.perf_counter() - seed_start:.1f}s")
+
+    fake_telegram.settings["latency"] = args.telegram_latency
+    fake_openrouter.settings.update(latency=args.llm_latency, failure_rate=0.0)
+    fake_telegram.serve_in_thread(args.telegram_port)
+    fake_openrouter.serve_in_thread(args.openrouter_port)
+
+    server = start_server(args)
+    try:
+        report = asyncio.run(drive(args, users, mix))
+    finally:
+        stop_server(server)
+
+    report["meta"] = {
+        "commit": git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "args": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print_report(report)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
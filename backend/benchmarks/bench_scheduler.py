@@ -0,0 +1,186 @@
+"""
+Precisión del ReminderScheduler con muchos recordatorios pendientes. Siembra `--pending`
+recordatorios repartidos en `--span` segundos (la mayoría fuera de la ventana) más `--due`
+que vencen durante la corrida, y mide el retraso entre reminder_time y el envío.
+
+Durante la corrida otro "worker" (una sesión aparte, sin avisar al scheduler) crea
+recordatorios que vencen en pocos segundos y pospone otros ya cargados en la ventana:
+los primeros deben llegar por el sondeo de updated_at y los segundos no deben salir antes
+de tiempo.
+
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.bench_scheduler --pending 1000000 --duration 30
+"""
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import select, insert, update, delete
+from backend.app.database import Base, engine, async_engine, AsyncSessionLocal
+from backend.app.models import User, Reminder
+from backend.app.services import reminder_scheduler
+from backend.app.services.reminder_scheduler import ReminderScheduler
+
+BENCH_SUPABASE_ID = "bench-scheduler-user"
+
+
+class SentRecorder:
+    """
+    Reemplaza al outbox: anota cuándo se despachó cada recordatorio.
+    """
+
+    def __init__(self):
+        self.sent = {}
+
+    def enqueue(self, chat_id, method, payload):
+        reminder_id = int(payload["reply_markup"]["inline_keyboard"][0][0]["callback_data"].split(":")[1])
+        self.sent.setdefault(reminder_id, time.time())
+        return True
+
+
+def seed(pending: int, span: float, duration: float) -> int:
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("bench_scheduler siembra con generate_series: necesita PostgreSQL")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        old = select(User.id).where(User.supabase_user_id == BENCH_SUPABASE_ID).scalar_subquery()
+        conn.execute(delete(Reminder).where(Reminder.user_id == old))
+        conn.execute(delete(User).where(User.supabase_user_id == BENCH_SUPABASE_ID))
+        user_id = conn.execute(
+            insert(User).values(supabase_user_id=BENCH_SUPABASE_ID, telegram_id="999000111", name="bench").returning(User.id)
+        ).scalar_one()
+        # Los pendientes arrancan después de la corrida: solo los `due` vencen mientras se mide
+        conn.exec_driver_sql(
+            "INSERT INTO reminders (user_id, text, reminder_time, completed, last_reaction_status) "
+            "SELECT %(user_id)s, 'bench ' || i, now() + make_interval(secs => %(offset)s + i * %(step)s), false, 'PENDING' "
+            "FROM generate_series(1, %(pending)s) AS i",
+            {"user_id": user_id, "offset": duration + 60, "step": span / pending, "pending": pending}
+        )
+        conn.exec_driver_sql("ANALYZE reminders")
+    return user_id
+
+
+def seed_due(user_id: int, due: int, duration: float):
+    # Justo antes de arrancar el scheduler: vencen entre 2 s y el final de la corrida
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO reminders (user_id, text, reminder_time, completed, last_reaction_status) "
+            "SELECT %(user_id)s, 'due ' || i, now() + make_interval(secs => 2 + i * %(step)s), false, 'PENDING' "
+            "FROM generate_series(1, %(due)s) AS i",
+            {"user_id": user_id, "step": (duration - 4) / max(due, 1), "due": due}
+        )
+
+
+def cleanup():
+    with engine.begin() as conn:
+        old = select(User.id).where(User.supabase_user_id == BENCH_SUPABASE_ID).scalar_subquery()
+        conn.execute(delete(Reminder).where(Reminder.user_id == old))
+        conn.execute(delete(User).where(User.supabase_user_id == BENCH_SUPABASE_ID))
+
+
+async def other_worker(user_id: int, duration: float, remote: int, snoozes: int, rng: random.Random):
+    """
+    Escrituras que el scheduler solo puede ver por el sondeo. Devuelve {id: hora esperada}
+    de los creados y {id: momento del commit} de los pospuestos.
+    """
+    created, snoozed = {}, {}
+    interval = (duration - 8) / max(remote + snoozes, 1)
+    async with AsyncSessionLocal() as db:
+        candidates = dict((await db.execute(
+            select(Reminder.id, Reminder.reminder_time).where(Reminder.user_id == user_id, Reminder.text.like("due %"))
+        )).all())
+    actions = ["create"] * remote + ["snooze"] * snoozes
+    rng.shuffle(actions)
+    for action in actions:
+        await asyncio.sleep(interval)
+        now = datetime.now().astimezone()
+        async with AsyncSessionLocal() as db:
+            if action == "create":
+                when = now + timedelta(seconds=rng.uniform(1, 4))
+                reminder_id = (await db.execute(
+                    insert(Reminder).values(user_id=user_id, text="remote", reminder_time=when).returning(Reminder.id)
+                )).scalar_one()
+                created[reminder_id] = when.timestamp()
+            else:
+                # Uno ya cargado en la ventana que vence en 1-5 s: el scheduler aún no sabe del cambio
+                upcoming = [i for i, t in candidates.items()
+                            if i not in snoozed and now + timedelta(seconds=1) < t < now + timedelta(seconds=5)]
+                if not upcoming:
+                    continue
+                reminder_id = rng.choice(upcoming)
+                await db.execute(update(Reminder).where(Reminder.id == reminder_id)
+                                 .values(reminder_time=now + timedelta(seconds=duration * 10)))
+            await db.commit()
+            if action == "snooze":
+                snoozed[reminder_id] = time.time()
+    return created, snoozed
+
+
+def lateness_report(label, sent, expected):
+    lateness = sorted((sent[i] - expected[i]) * 1000 for i in expected if i in sent)
+    missing = sum(1 for i in expected if i not in sent)
+    if not lateness:
+        print(f"{label:8} sent=0 missing={missing}")
+        return
+    pick = lambda p: lateness[min(len(lateness) - 1, int(p / 100 * len(lateness)))]
+    print(f"{label:8} sent={len(lateness)} missing={missing} "
+          f"p50={pick(50):.1f}ms p99={pick(99):.1f}ms max={lateness[-1]:.1f}ms")
+
+
+async def run(user_id: int, due: int, duration: float, remote: int, snoozes: int, seed_value: int):
+    seed_due(user_id, due, duration)
+    recorder = SentRecorder()
+    reminder_scheduler.outbox = recorder
+    scheduler = ReminderScheduler()
+
+    started = time.perf_counter()
+    await scheduler.start()
+    # _loaded_until avanza antes de leer; la carga terminó cuando ya no hay lectura en curso
+    while scheduler._loaded_until < time.time() or scheduler._touched is not None:
+        await asyncio.sleep(0.001)
+    print(f"first window loaded in {(time.perf_counter() - started) * 1000:.0f}ms: {scheduler.stats()}")
+
+    created, snoozed = await other_worker(user_id, duration, remote, snoozes, random.Random(seed_value))
+    await asyncio.sleep(max(0.0, started + duration - time.perf_counter()) + 1)
+    await scheduler.stop()
+
+    async with AsyncSessionLocal() as db:
+        due = dict((await db.execute(
+            select(Reminder.id, Reminder.reminder_time).where(Reminder.user_id == user_id, Reminder.text.like("due %"))
+        )).all())
+    await async_engine.dispose()
+
+    expected = {i: t.timestamp() for i, t in due.items() if i not in snoozed}
+    print(f"scheduler: {scheduler.stats()}")
+    lateness_report("local", recorder.sent, expected)
+    lateness_report("remote", recorder.sent, created)
+    early = sum(1 for i, moved_at in snoozed.items() if recorder.sent.get(i, 0) > moved_at)
+    print(f"snoozed  {len(snoozed)} moved from another worker, {early} sent after the move")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pending", type=int, default=1000000, help="recordatorios pendientes fuera de la corrida")
+    parser.add_argument("--span", type=float, default=7 * 86400, help="segundos sobre los que se reparten")
+    parser.add_argument("--due", type=int, default=2000, help="recordatorios que vencen durante la corrida")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--remote", type=int, default=50, help="altas desde otro worker")
+    parser.add_argument("--snoozes", type=int, default=50, help="posposiciones desde otro worker")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    user_id = seed(args.pending, args.span, args.duration)
+    print(f"Seeded {args.pending} pending + {args.due} due reminders in {time.perf_counter() - started:.1f}s")
+    try:
+        asyncio.run(run(user_id, args.due, args.duration, args.remote, args.snoozes, args.seed))
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
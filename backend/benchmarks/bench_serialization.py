@@ -0,0 +1,106 @@
+"""
+Filas/segundo al serializar el listado de recordatorios: ruta anterior (entidades ORM +
+ReminderResponse a mano + revalidación de response_model + json) contra la actual
+(select de columnas + orjson directo).
+
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.bench_serialization --rows 10000
+"""
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from datetime import datetime, timedelta
+from typing import List
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import select, insert, delete
+from backend.app.database import Base, engine, async_engine, AsyncSessionLocal
+from backend.app.models import User, Reminder
+from backend.app.models.reminder import ReactionStatus
+from backend.app.schemas.schemas import ReminderResponse
+from backend.app.services.serialization import REMINDER_COLUMNS, rows_response
+
+BENCH_SUPABASE_ID = "bench-serialization-user"
+adapter = TypeAdapter(List[ReminderResponse])
+
+
+def seed(rows: int) -> int:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        user_ids = select(User.id).where(User.supabase_user_id == BENCH_SUPABASE_ID)
+        conn.execute(delete(Reminder).where(Reminder.user_id.in_(user_ids)))
+        conn.execute(delete(User).where(User.supabase_user_id == BENCH_SUPABASE_ID))
+        user_id = conn.execute(
+            insert(User).values(supabase_user_id=BENCH_SUPABASE_ID, name="bench").returning(User.id)
+        ).scalar_one()
+        base = datetime.now()
+        conn.execute(insert(Reminder), [
+            {"user_id": user_id, "text": f"reminder {i}", "reminder_time": base + timedelta(minutes=i),
+             "completed": i % 2 == 0, "last_reaction_status": ReactionStatus.PENDING,
+             "context_metadata": {"initial_tone": "¡Vamos!"} if i % 3 == 0 else None}
+            for i in range(rows)
+        ])
+    return user_id
+
+
+async def legacy(db, user_id) -> bytes:
+    result = await db.execute(select(Reminder).where(Reminder.user_id == user_id).order_by(Reminder.reminder_time, Reminder.id))
+    items = [
+        ReminderResponse(
+            id=r.id,
+            user_id=r.user_id,
+            text=r.text,
+            reminder_time=r.reminder_time,
+            completed=r.completed,
+            last_reaction_status=r.last_reaction_status.value if hasattr(r.last_reaction_status, 'value') else str(r.last_reaction_status),
+            context_metadata=r.context_metadata,
+            created_at=r.created_at
+        ) for r in result.scalars().all()
+    ]
+    # Lo que hace FastAPI con response_model: validar de nuevo, codificar y json.dumps
+    validated = adapter.validate_python(items, from_attributes=True)
+    return json.dumps(jsonable_encoder(adapter.dump_python(validated, mode="json"))).encode()
+
+
+async def lean(db, user_id) -> bytes:
+    result = await db.execute(select(*REMINDER_COLUMNS).where(Reminder.user_id == user_id).order_by(Reminder.reminder_time, Reminder.id))
+    return rows_response(result.all()).body
+
+
+async def measure(fn, user_id, rows, iterations):
+    timings = []
+    for _ in range(iterations):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await fn(db, user_id)
+            timings.append(time.perf_counter() - start)
+    mean = statistics.mean(timings)
+    return {"mean_ms": round(mean * 1000, 1), "rows_per_s": round(rows / mean)}
+
+
+async def run(user_id, rows, iterations):
+    async with AsyncSessionLocal() as db:
+        assert json.loads(await legacy(db, user_id)) == json.loads(await lean(db, user_id))
+    for name, fn in (("legacy (ORM + pydantic)", legacy), ("lean (columns + orjson)", lean)):
+        await measure(fn, user_id, rows, 2)  # warm-up
+        print(f"{name:24} {await measure(fn, user_id, rows, iterations)}")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    user_id = seed(args.rows)
+    print(f"Seeded user {user_id}: {args.rows} reminders")
+    asyncio.run(run(user_id, args.rows, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
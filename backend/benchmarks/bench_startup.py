@@ -0,0 +1,108 @@
+"""
+Arranque en frío de un worker: tiempo de `import backend.app.main` y tiempo hasta
+la primera respuesta de /health con uvicorn, cada uno en un proceso nuevo.
+También mide el piso del framework: uvicorn con una app FastAPI vacía que solo importa
+SQLAlchemy. La diferencia con ese piso es lo que cuesta la app en sí.
+
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.bench_startup --runs 5
+
+Referencia (Python 3.11, PostgreSQL local), p50 de 9 corridas:
+- piso del framework: ~0.6 s;
+- la app: ~0.94 s.
+La meta de "muy por debajo de 1 s" no se cumple.
+
+De los ~0.33 s que la app agrega sobre el piso, ~0.25 s son imports. Esos imports son en su
+mayoría trabajo del framework al importar y no se pueden diferir sin cambiar la arquitectura:
+- FastAPI construye los modelos pydantic de cada ruta al decorarla;
+- FastAPI carga pydantic.v1 en su chequeo de compatibilidad;
+- se cargan los dialectos asyncpg y psycopg2 de los dos engines;
+- se importan los schemas y modelos.
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+from dotenv import load_dotenv
+
+load_dotenv()
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import backend.app.main; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def import_time_ms() -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+FLOOR_SNIPPET = (
+    "import sys, uvicorn, sqlalchemy.orm, sqlalchemy.ext.asyncio; from fastapi import FastAPI; "
+    "app = FastAPI(); app.get('/health')(lambda: {'status': 'healthy'}); "
+    "uvicorn.run(app, port=int(sys.argv[1]), log_level='warning')"
+)
+
+
+def uvicorn_command(port: int):
+    return [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port), "--log-level", "warning"]
+
+
+def floor_command(port: int):
+    return [sys.executable, "-c", FLOOR_SNIPPET, str(port)]
+
+
+def first_request_ms(command=uvicorn_command, timeout: float = 30.0) -> float:
+    port = free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(command(port), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"worker did not answer /health within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summary(samples):
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(statistics.mean(samples), 1),
+        "p50_ms": round(samples[len(samples) // 2], 1),
+        "max_ms": round(samples[-1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    # Sin polling ni scheduler: se mide el arranque del worker, no sus tareas de fondo
+    os.environ.setdefault("TELEGRAM_INGEST", "webhook")
+    os.environ.setdefault("REMINDER_SCHEDULER_ENABLED", "0")
+    floor = summary([first_request_ms(floor_command) for _ in range(args.runs)])
+    app = summary([first_request_ms() for _ in range(args.runs)])
+    print(f"{'import backend.app.main':26} {summary([import_time_ms() for _ in range(args.runs)])}")
+    print(f"{'framework floor':26} {floor}")
+    print(f"{'time to first request':26} {app}")
+    print(f"{'app over floor (p50)':26} {round(app['p50_ms'] - floor['p50_ms'], 1)} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Compara el resumen anterior (5 consultas con count()) contra el actual
+(contadores en user_stats + dos top-5) sobre un usuario con historial grande.
+
+    DATABASE_URL=postgresql://... python -m backend.benchmarks.bench_summary --activities 100000
+"""
+import time
+import asyncio
+import argparse
+import statistics
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import select, func, insert, delete
+from backend.app.database import Base, engine, async_engine, AsyncSessionLocal
+from backend.app.models import User, Reminder, Activity, UserStats
+
+BENCH_SUPABASE_ID = "bench-summary-user"
+
+
+def seed(activities: int, reminders: int) -> int:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(delete(User).where(User.supabase_user_id == BENCH_SUPABASE_ID))
+        user_id = conn.execute(
+            insert(User).values(supabase_user_id=BENCH_SUPABASE_ID, name="bench").returning(User.id)
+        ).scalar_one()
+        base = datetime.now()
+        for start in range(0, activities, 10000):
+            conn.execute(insert(Activity), [
+                {"user_id": user_id, "activity_type": "completed_reminder" if i % 3 else "run",
+                 "activity_date": base - timedelta(minutes=i)}
+                for i in range(start, min(start + 10000, activities))
+            ])
+        for start in range(0, reminders, 10000):
+            conn.execute(insert(Reminder), [
+                {"user_id": user_id, "text": f"r{i}", "reminder_time": base - timedelta(minutes=i),
+                 "completed": i % 2 == 0}
+                for i in range(start, min(start + 10000, reminders))
+            ])
+        conn.execute(insert(UserStats).values(
+            user_id=user_id,
+            total_reminders=reminders,
+            completed_reminders=(reminders + 1) // 2,
+            total_activities=activities
+        ))
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("ANALYZE activities")
+            conn.exec_driver_sql("ANALYZE reminders")
+    return user_id
+
+
+async def legacy_summary(db, user_id):
+    total_reminders = await db.scalar(select(func.count()).select_from(Reminder).where(Reminder.user_id == user_id))
+    completed = await db.scalar(select(func.count()).select_from(Reminder).where(Reminder.user_id == user_id, Reminder.completed == True))
+    total_activities = await db.scalar(select(func.count()).select_from(Activity).where(Activity.user_id == user_id))
+    recent_activities = (await db.execute(select(Activity).where(Activity.user_id == user_id).order_by(Activity.activity_date.desc()).limit(5))).scalars().all()
+    recent_reminders = (await db.execute(select(Reminder).where(Reminder.user_id == user_id).order_by(Reminder.reminder_time.desc()).limit(5))).scalars().all()
+    return total_reminders, completed, total_activities, recent_activities, recent_reminders
+
+
+async def counter_summary(db, user_id):
+    stats = await db.get(UserStats, user_id)
+    recent_activities = (await db.execute(select(Activity).where(Activity.user_id == user_id).order_by(Activity.activity_date.desc()).limit(5))).scalars().all()
+    recent_reminders = (await db.execute(select(Reminder).where(Reminder.user_id == user_id).order_by(Reminder.reminder_time.desc()).limit(5))).scalars().all()
+    return stats.total_reminders, stats.completed_reminders, stats.total_activities, recent_activities, recent_reminders
+
+
+async def measure(fn, user_id, iterations):
+    timings = []
+    for _ in range(iterations):
+        async with AsyncSessionLocal() as db:
+            start = time.perf_counter()
+            await fn(db, user_id)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(timings[len(timings) // 2], 3),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+async def run(user_id, iterations):
+    for name, fn in (("legacy (5 queries)", legacy_summary), ("counters (3 queries)", counter_summary)):
+        await measure(fn, user_id, 5)  # warm-up
+        print(f"{name:22} {await measure(fn, user_id, iterations)}")
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--activities", type=int, default=100000)
+    parser.add_argument("--reminders", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    user_id = seed(args.activities, args.reminders)
+    print(f"Seeded user {user_id}: {args.activities} activities, {args.reminders} reminders")
+    asyncio.run(run(user_id, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
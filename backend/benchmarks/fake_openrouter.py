@@ -0,0 +1,89 @@
+"""
+Proveedor OpenAI-compatible falso para benchmarks: responde /v1/chat/completions
+con latencia configurable sin llamar a OpenRouter.
+
+    python -m backend.benchmarks.fake_openrouter --port 8765 --latency 0.3
+    OPENROUTER_BASE_URL=http://127.0.0.1:8765/v1 OPENROUTER_API_KEY=fake ...
+"""
+import re
+import json
+import time
+import asyncio
+import argparse
+import threading
+import uvicorn
+from fastapi import FastAPI, Request
+
+app = FastAPI()
+# Latencia fija por llamada + coste por contexto empaquetado; failure_rate en [0, 1]
+settings = {"latency": 0.3, "per_item_latency": 0.005, "failure_rate": 0.0}
+counters = {"requests": 0, "in_flight": 0, "max_in_flight": 0}
+
+
+def reset():
+    settings.update(latency=0.3, per_item_latency=0.005, failure_rate=0.0)
+    counters.update(requests=0, in_flight=0, max_in_flight=0)
+
+CONTEXTS = re.compile(r"Contextos: (\[.*\])")
+
+
+def completion(content: str):
+    return {
+        "id": "fake", "object": "chat.completion", "created": int(time.time()), "model": "fake",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def answer(prompt: str, json_mode: bool) -> str:
+    batch = CONTEXTS.search(prompt)
+    if batch:
+        items = json.loads(batch.group(1))
+        return json.dumps({"results": [
+            {"id": item["id"], "advice": "Sigue así", "urgency": "normal"} for item in items
+        ]})
+    if json_mode:
+        return json.dumps({"advice": "Sigue así", "urgency": "normal", "messages": ["¡Vamos! 💪", "Tú puedes ⚡"]})
+    return "¡Vamos! 💪"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    prompt = body["messages"][-1]["content"]
+    batch = CONTEXTS.search(prompt)
+    items = len(json.loads(batch.group(1))) if batch else 1
+    counters["requests"] += 1
+    number = counters["requests"]
+    counters["in_flight"] += 1
+    counters["max_in_flight"] = max(counters["max_in_flight"], counters["in_flight"])
+    try:
+        await asyncio.sleep(settings["latency"] + settings["per_item_latency"] * items)
+        if settings["failure_rate"] and number % round(1 / settings["failure_rate"]) == 0:
+            from fastapi.responses import JSONResponse
+            return JSONResponse({"error": {"message": "fake upstream error"}}, status_code=502)
+        return completion(answer(prompt, "response_format" in body))
+    finally:
+        counters["in_flight"] -= 1
+
+
+def serve_in_thread(port: int = 8765) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=settings["latency"])
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    settings.update(latency=args.latency, failure_rate=args.failure_rate)
+    uvicorn.run(app, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
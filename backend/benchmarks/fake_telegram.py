@@ -0,0 +1,135 @@
+"""
+Bot API de Telegram falsa para pruebas locales y benchmarks: getUpdates con long
+polling sobre un backlog en memoria, y métodos de envío que solo registran llamadas.
+
+    python -m backend.benchmarks.fake_telegram --port 8081 --backlog-chats 50 --backlog-per-chat 100
+    TELEGRAM_API_BASE=http://127.0.0.1:8081 TELEGRAM_BOT_TOKEN=fake TELEGRAM_INGEST=polling ...
+"""
+import time
+import asyncio
+import argparse
+import threading
+from typing import Dict, List
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI()
+# failures: método -> cuántas de sus próximas llamadas responden 502
+settings = {"latency": 0.0, "rate_limit_every": 0, "retry_after": 1, "failures": {}}
+state = {"updates": [], "next_update_id": 1, "confirmed": 0}
+sent: List[dict] = []
+counters = {"getUpdates": 0, "sendMessage": 0, "other": 0}
+# Llamadas recibidas por método, incluidas las que respondieron error
+calls: Dict[str, int] = {}
+
+
+def reset():
+    """
+    Vuelve al estado inicial entre tests.
+    """
+    settings.update(latency=0.0, rate_limit_every=0, retry_after=1, failures={})
+    state.update(updates=[], next_update_id=1, confirmed=0)
+    sent.clear()
+    counters.update(getUpdates=0, sendMessage=0, other=0)
+    calls.clear()
+
+
+def injected_failure(method: str):
+    remaining = settings["failures"].get(method, 0)
+    if remaining:
+        settings["failures"][method] = remaining - 1
+        return JSONResponse({"ok": False, "error_code": 502, "description": "Bad Gateway"}, status_code=502)
+    return None
+
+
+def make_message(chat_id: int, text: str, update_id: int = None) -> dict:
+    if update_id is None:
+        update_id = state["next_update_id"]
+    state["next_update_id"] = max(state["next_update_id"], update_id + 1)
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": f"user{chat_id}"},
+            "text": text,
+        },
+    }
+
+
+def push_updates(updates: List[dict]):
+    # Se puede llamar desde otro hilo: getUpdates revisa la lista periódicamente
+    state["updates"].extend(updates)
+
+
+def backlog(chats: int, per_chat: int, command: str = "/help") -> List[dict]:
+    # Intercalado por chat, como llegaría tráfico real
+    return [make_message(1000 + chat, f"{command} {n}") for n in range(per_chat) for chat in range(chats)]
+
+
+@app.post("/bot{token}/getUpdates")
+async def get_updates(token: str, request: Request):
+    body = await request.json()
+    calls["getUpdates"] = calls.get("getUpdates", 0) + 1
+    counters["getUpdates"] += 1
+    failure = injected_failure("getUpdates")
+    if failure:
+        return failure
+    offset = body.get("offset")
+    if offset is not None:
+        # Los updates anteriores al offset quedan confirmados y se olvidan
+        state["confirmed"] = max(state["confirmed"], offset)
+        state["updates"] = [u for u in state["updates"] if u["update_id"] >= offset]
+    limit = body.get("limit", 100)
+    deadline = time.monotonic() + body.get("timeout", 0)
+    while not state["updates"] and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    return {"ok": True, "result": state["updates"][:limit]}
+
+
+@app.post("/bot{token}/{method}")
+async def bot_method(token: str, method: str, request: Request):
+    body = await request.json()
+    calls[method] = calls.get(method, 0) + 1
+    failure = injected_failure(method)
+    if failure:
+        return failure
+    if settings["latency"]:
+        await asyncio.sleep(settings["latency"])
+    if method == "sendMessage":
+        counters["sendMessage"] += 1
+        every = settings["rate_limit_every"]
+        if every and counters["sendMessage"] % every == 0:
+            return JSONResponse({"ok": False, "error_code": 429, "description": "Too Many Requests",
+                                 "parameters": {"retry_after": settings["retry_after"]}}, status_code=429)
+        sent.append(body)
+        return {"ok": True, "result": {"message_id": len(sent), "chat": {"id": body.get("chat_id")}}}
+    counters["other"] += 1
+    return {"ok": True, "result": True}
+
+
+def serve_in_thread(port: int = 8081) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--backlog-chats", type=int, default=0)
+    parser.add_argument("--backlog-per-chat", type=int, default=10)
+    args = parser.parse_args()
+    settings["latency"] = args.latency
+    if args.backlog_chats:
+        push_updates(backlog(args.backlog_chats, args.backlog_per_chat))
+    uvicorn.run(app, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Exporta actividades, recordatorios e historial de IA en NDJSON o CSV.
+
+    python -m backend.export activities --format csv --gzip -o activities.csv.gz
+    python -m backend.export reminders --user-id 42 > reminders.ndjson
+
+Lee con un cursor del servidor por lotes, así la memoria no crece con el tamaño de la tabla.
+"""
+import sys
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from backend.app.services.export import EXPORTS, FORMATS, iter_export
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming export of interaction records")
+    parser.add_argument("kind", choices=sorted(EXPORTS))
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress the output")
+    parser.add_argument("--user-id", type=int, help="only export this user's records")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in iter_export(args.kind, args.format, compress=args.gzip, user_id=args.user_id):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
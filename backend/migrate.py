@@ -0,0 +1,191 @@
+"""
+Aplica en orden las migraciones SQL versionadas de backend/migrations.
+
+    python -m backend.migrate                 # aplica las pendientes
+    python -m backend.migrate --status        # lista aplicadas / pendientes
+    python -m backend.migrate --check-plans   # verifica que las consultas usan los índices
+
+Cada archivo `NNNN_nombre.sql` se registra en `schema_migrations`. Los archivos que
+empiezan con `-- migrate: no-transaction` se ejecutan sentencia por sentencia en
+autocommit (necesario para CREATE INDEX CONCURRENTLY).
+
+Las bases creadas por `create_all` antes de este comando no tienen filas en
+schema_migrations: si las tablas ya existen, 0001 y 0002 se marcan como aplicadas sin
+ejecutarlas (sus CREATE INDEX construirían duplicados de los `ix_*` bloqueando escrituras).
+
+La app ya no crea tablas al arrancar: este comando es el único que toca el esquema.
+Con una base que no es PostgreSQL (SQLite en desarrollo) crea las tablas desde los modelos.
+"""
+import os
+import sys
+import argparse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from sqlalchemy import select, func, text, inspect
+from backend.app.database import engine, Base
+from backend.app import models  # noqa: F401  (registra todas las tablas en Base.metadata)
+from backend.app.models.reminder import Reminder
+from backend.app.models.activity import Activity
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+NO_TRANSACTION = "-- migrate: no-transaction"
+# Esquema que la app creaba con create_all al arrancar
+BASELINE_VERSIONS = ("0001", "0002")
+
+
+def list_migrations():
+    files = sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
+    return [(f.split("_", 1)[0], os.path.join(MIGRATIONS_DIR, f)) for f in files]
+
+
+def applied_versions(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version VARCHAR(32) PRIMARY KEY, "
+        "name VARCHAR(255) NOT NULL, "
+        "applied_at TIMESTAMP WITH TIME ZONE DEFAULT NOW())"
+    ))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def stamp_baseline(conn, done):
+    """
+    Registra la línea base sin ejecutarla en bases que ya tenían las tablas.
+    Devuelve las versiones aplicadas actualizadas.
+    """
+    if done or not inspect(conn).has_table("users"):
+        return done
+    record = text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)")
+    for version, path in list_migrations():
+        if version in BASELINE_VERSIONS:
+            conn.execute(record, {"version": version, "name": os.path.basename(path)})
+            print(f"Stamped {os.path.basename(path)} (tables already exist)")
+    return done | set(BASELINE_VERSIONS)
+
+
+def split_statements(sql):
+    lines = [l for l in sql.splitlines() if not l.strip().startswith("--")]
+    return [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+
+
+def apply_migration(version, path):
+    with open(path) as f:
+        sql = f.read()
+    name = os.path.basename(path)
+    record = text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)")
+
+    if sql.lstrip().startswith(NO_TRANSACTION):
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for statement in split_statements(sql):
+                conn.exec_driver_sql(statement)
+            conn.execute(record, {"version": version, "name": name})
+    else:
+        with engine.begin() as conn:
+            conn.exec_driver_sql(sql)
+            conn.execute(record, {"version": version, "name": name})
+    print(f"Applied {name}")
+
+
+def migrate():
+    with engine.begin() as conn:
+        done = stamp_baseline(conn, applied_versions(conn))
+    pending = [(v, p) for v, p in list_migrations() if v not in done]
+    if not pending:
+        print("Database is up to date")
+    for version, path in pending:
+        apply_migration(version, path)
+
+
+def status():
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    for version, path in list_migrations():
+        mark = "applied" if version in done else "pending"
+        print(f"{mark:8} {os.path.basename(path)}")
+
+
+# Forma de las consultas calientes de cada ruta -> índice(s) que puede usar
+PLAN_CHECKS = [
+    ("GET /api/reminders",
+     select(Reminder).where(Reminder.user_id == 1).order_by(Reminder.reminder_time, Reminder.id).limit(51),
+     "ix_reminders_user_time"),
+    ("GET /api/summary completed count",
+     select(func.count()).select_from(Reminder).where(Reminder.user_id == 1, Reminder.completed == True),
+     "ix_reminders_user_completed"),
+    ("GET /api/summary recent reminders",
+     select(Reminder).where(Reminder.user_id == 1).order_by(Reminder.reminder_time.desc()).limit(5),
+     "ix_reminders_user_time"),
+    ("GET /api/summary recent activities",
+     select(Activity).where(Activity.user_id == 1).order_by(Activity.activity_date.desc()).limit(5),
+     "ix_activities_user_date"),
+    ("GET /api/agenda",
+     select(Activity).where(Activity.user_id == 1).order_by(Activity.activity_date.desc(), Activity.id.desc()).limit(51),
+     "ix_activities_user_date"),
+    ("telegram /reminders",
+     select(Reminder).where(Reminder.user_id == 1, Reminder.completed == False),
+     "ix_reminders_user_completed"),
+    ("telegram /add streak",
+     select(Activity.id).where(Activity.user_id == 1, Activity.activity_type == "completed_reminder"),
+     "ix_activities_user_type"),
+    ("reminder scheduler window",
+     select(Reminder.id, Reminder.reminder_time).where(
+         Reminder.completed == False,
+         Reminder.reminder_time > func.now(),
+         Reminder.reminder_time <= func.now() + text("interval '10 minutes'")),
+     # Bases creadas con 0001 tienen además el índice simple sobre reminder_time
+     ("ix_reminders_pending_time", "idx_reminders_reminder_time")),
+    ("reminder scheduler poll",
+     select(Reminder.id, Reminder.reminder_time).where(Reminder.updated_at > func.now() - text("interval '10 seconds'")),
+     "ix_reminders_updated_at"),
+]
+
+
+def check_plans():
+    """
+    Corre EXPLAIN sobre cada consulta y falla si no aparece el índice esperado.
+    Se desactivan seq scan y sort explícito para que tablas pequeñas o sin
+    estadísticas no oculten qué índice puede servir la consulta.
+    """
+    failures = 0
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SET enable_seqscan = off")
+        conn.exec_driver_sql("SET enable_sort = off")
+        for label, stmt, indexes in PLAN_CHECKS:
+            if isinstance(indexes, str):
+                indexes = (indexes,)
+            compiled = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = "\n".join(row[0] for row in conn.exec_driver_sql(f"EXPLAIN {compiled}"))
+            ok = any(index in plan for index in indexes)
+            failures += not ok
+            print(f"{'OK  ' if ok else 'FAIL'} {label}: expected {' or '.join(indexes)}")
+            if not ok:
+                print(plan)
+        conn.rollback()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Versioned SQL migrations")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    parser.add_argument("--check-plans", action="store_true", help="verify hot queries use the composite indexes")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        if args.status or args.check_plans:
+            sys.exit(f"Migrations target PostgreSQL, got {engine.dialect.name}")
+        Base.metadata.create_all(bind=engine)
+        print(f"Created tables from models ({engine.dialect.name})")
+        return
+
+    if args.status:
+        status()
+    elif args.check_plans:
+        sys.exit(1 if check_plans() else 0)
+    else:
+        migrate()
+
+
+if __name__ == "__main__":
+    main()
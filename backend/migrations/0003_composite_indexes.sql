@@ -0,0 +1,12 @@
+-- migrate: no-transaction
+-- Composite indexes for the hot query shapes (user_id + filter/sort column).
+-- CONCURRENTLY avoids locking writes on existing tables; it cannot run inside a transaction.
+-- If a build fails it leaves an INVALID index: DROP INDEX CONCURRENTLY it and re-run.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reminders_user_time ON reminders(user_id, reminder_time);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reminders_user_completed ON reminders(user_id, completed);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activities_user_date ON activities(user_id, activity_date);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_activities_user_type ON activities(user_id, activity_type);
+
+-- Range scan of the reminder scheduler over pending reminders
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reminders_pending_time ON reminders(reminder_time) WHERE completed = false;
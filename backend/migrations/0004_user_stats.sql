@@ -0,0 +1,19 @@
+-- Per-user counters for the summary endpoint, maintained by the write paths
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    total_reminders INTEGER NOT NULL DEFAULT 0,
+    completed_reminders INTEGER NOT NULL DEFAULT 0,
+    total_activities INTEGER NOT NULL DEFAULT 0
+);
+
+-- Backfill from existing data (overwrites rows created before the backfill ran)
+INSERT INTO user_stats (user_id, total_reminders, completed_reminders, total_activities)
+SELECT u.id,
+       (SELECT COUNT(*) FROM reminders r WHERE r.user_id = u.id),
+       (SELECT COUNT(*) FROM reminders r WHERE r.user_id = u.id AND r.completed),
+       (SELECT COUNT(*) FROM activities a WHERE a.user_id = u.id)
+FROM users u
+ON CONFLICT (user_id) DO UPDATE SET
+    total_reminders = EXCLUDED.total_reminders,
+    completed_reminders = EXCLUDED.completed_reminders,
+    total_activities = EXCLUDED.total_activities;
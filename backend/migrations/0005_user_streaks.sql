@@ -0,0 +1,40 @@
+-- Streak and failure tracking on user_stats, updated incrementally by the write paths
+ALTER TABLE user_stats ADD COLUMN IF NOT EXISTS current_streak INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE user_stats ADD COLUMN IF NOT EXISTS last_completion_date DATE;
+ALTER TABLE user_stats ADD COLUMN IF NOT EXISTS recent_failures INTEGER NOT NULL DEFAULT 0;
+
+-- Backfill: gaps-and-islands over completion days; keep the island that ends on the last day
+WITH days AS (
+    SELECT DISTINCT user_id, activity_date::date AS day
+    FROM activities
+    WHERE activity_type = 'completed_reminder'
+),
+islands AS (
+    SELECT user_id, day,
+           day - (ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY day))::int AS grp
+    FROM days
+),
+last_island AS (
+    SELECT DISTINCT ON (user_id) user_id, COUNT(*) AS streak, MAX(day) AS last_day
+    FROM islands
+    GROUP BY user_id, grp
+    ORDER BY user_id, MAX(day) DESC
+)
+UPDATE user_stats s
+SET current_streak = l.streak,
+    last_completion_date = l.last_day
+FROM last_island l
+WHERE s.user_id = l.user_id;
+
+-- Failures since the last completion
+UPDATE user_stats s
+SET recent_failures = f.failures
+FROM (
+    SELECT r.user_id, COUNT(*) AS failures
+    FROM reminders r
+    JOIN user_stats us ON us.user_id = r.user_id
+    WHERE r.last_reaction_status::text IN ('ignored', 'IGNORED')
+      AND (us.last_completion_date IS NULL OR r.updated_at::date >= us.last_completion_date)
+    GROUP BY r.user_id
+) f
+WHERE s.user_id = f.user_id;
@@ -0,0 +1,16 @@
+-- Align ai_history with the model: 0001 created `created_at`, the app reads `timestamp`
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'ai_history' AND column_name = 'created_at')
+       AND NOT EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name = 'ai_history' AND column_name = 'timestamp') THEN
+        ALTER TABLE ai_history RENAME COLUMN created_at TO "timestamp";
+    END IF;
+END $$;
+
+ALTER TABLE ai_history ADD COLUMN IF NOT EXISTS "timestamp" TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE ai_history ADD COLUMN IF NOT EXISTS model VARCHAR(255);
+
+-- Latency of the LLM call, recorded by the write-behind recorder
+ALTER TABLE ai_history ADD COLUMN IF NOT EXISTS latency_ms INTEGER;
@@ -0,0 +1,30 @@
+-- The model maps last_reaction_status to the native `reactionstatus` enum (member names),
+-- while 0001 created a VARCHAR holding lowercase values. Now that the app no longer runs
+-- create_all at startup, migrations must produce the schema the model expects.
+--
+-- MAINTENANCE WINDOW REQUIRED on databases migrated from 0001 (VARCHAR column):
+-- ALTER COLUMN ... TYPE rewrites the whole reminders table while holding an ACCESS
+-- EXCLUSIVE lock, so every read and write on reminders blocks until it finishes.
+-- The time grows with the table size. Run it with the workers stopped, or with
+-- lock_timeout set so it fails fast instead of queueing behind live traffic. Databases
+-- that create_all built already have the enum, and the block below skips them without
+-- taking the lock.
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'reactionstatus') THEN
+        CREATE TYPE reactionstatus AS ENUM ('PENDING', 'COMPLETED', 'DELAYED', 'IGNORED', 'SNOOZED');
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM information_schema.columns
+               WHERE table_name = 'reminders' AND column_name = 'last_reaction_status'
+                 AND data_type = 'character varying') THEN
+        ALTER TABLE reminders ALTER COLUMN last_reaction_status DROP DEFAULT;
+        ALTER TABLE reminders ALTER COLUMN last_reaction_status TYPE reactionstatus USING (
+            CASE WHEN upper(last_reaction_status) IN ('PENDING', 'COMPLETED', 'DELAYED', 'IGNORED', 'SNOOZED')
+                 THEN upper(last_reaction_status)
+                 ELSE 'PENDING'
+            END
+        )::reactionstatus;
+        ALTER TABLE reminders ALTER COLUMN last_reaction_status SET DEFAULT 'PENDING';
+    END IF;
+END $$;
@@ -0,0 +1,2 @@
+-- Per-user data version for ETag / If-None-Match, bumped by every write path
+ALTER TABLE user_stats ADD COLUMN IF NOT EXISTS data_version BIGINT NOT NULL DEFAULT 0;
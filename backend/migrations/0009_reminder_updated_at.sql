@@ -0,0 +1,6 @@
+-- migrate: no-transaction
+-- The reminder scheduler polls updated_at to pick up reminders created or changed on other
+-- workers, so new rows get it on insert too. SET DEFAULT only touches the catalog.
+
+ALTER TABLE reminders ALTER COLUMN updated_at SET DEFAULT NOW();
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reminders_updated_at ON reminders(updated_at);
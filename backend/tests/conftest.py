@@ -0,0 +1,102 @@
+"""
+Los tests corren contra los servidores falsos de backend/benchmarks (Bot API de Telegram y
+OpenRouter) en puertos locales. Las variables se fijan antes de importar la app porque los
+módulos leen su configuración al importarse. Sin DATABASE_URL se usa un SQLite temporal.
+"""
+import os
+import socket
+import tempfile
+import uuid
+import pytest
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+TELEGRAM_PORT = _free_port()
+OPENROUTER_PORT = _free_port()
+os.environ.update(
+    TELEGRAM_API_BASE=f"http://127.0.0.1:{TELEGRAM_PORT}",
+    TELEGRAM_BOT_TOKEN="fake",
+    OPENROUTER_BASE_URL=f"http://127.0.0.1:{OPENROUTER_PORT}/v1",
+    OPENROUTER_API_KEY="fake",
+)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tests.db')}")
+
+from backend.app.services.telegram_client import TelegramClient
+from backend.benchmarks import fake_telegram, fake_openrouter
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def telegram_server():
+    server = fake_telegram.serve_in_thread(TELEGRAM_PORT)
+    yield
+    server.should_exit = True
+
+
+@pytest.fixture(scope="session")
+def openrouter_server():
+    server = fake_openrouter.serve_in_thread(OPENROUTER_PORT)
+    yield
+    server.should_exit = True
+
+
+@pytest.fixture
+async def fake_tg(telegram_server):
+    fake_telegram.reset()
+    yield fake_telegram
+    # El cliente httpx queda atado al event loop del test
+    await TelegramClient.close()
+
+
+@pytest.fixture
+def fake_llm(openrouter_server):
+    fake_openrouter.reset()
+    yield fake_openrouter
+
+
+@pytest.fixture
+def api_user():
+    """
+    Usuario nuevo por test; se borra con sus datos al terminar.
+    """
+    from sqlalchemy import insert, delete
+    from backend.app.database import Base, engine
+    from backend.app.models import User, Reminder, Activity, UserStats
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            insert(User).values(supabase_user_id=f"test-{uuid.uuid4()}", name="test").returning(User.id)
+        ).scalar_one()
+    yield User(id=user_id, supabase_user_id=None, name="test")
+    with engine.begin() as conn:
+        for model in (Activity, Reminder, UserStats):
+            conn.execute(delete(model).where(model.user_id == user_id))
+        conn.execute(delete(User).where(User.id == user_id))
+
+
+@pytest.fixture
+async def api(api_user):
+    """
+    Cliente ASGI de la app autenticado como `api_user`.
+    """
+    import httpx
+    from backend.app.main import app
+    from backend.app.auth import get_current_user
+    from backend.app.database import async_engine
+
+    app.dependency_overrides[get_current_user] = lambda: api_user
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_current_user, None)
+    # Las conexiones del pool async quedan atadas al event loop del test
+    await async_engine.dispose()
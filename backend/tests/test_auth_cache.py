@@ -0,0 +1,99 @@
+import time
+import uuid
+import jwt
+import httpx
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from backend.app import auth
+from backend.app.auth import token_cache, invalidate_user_cache, get_current_user, _token_key
+from backend.app.database import Base, engine, SessionLocal
+from backend.app.main import app
+from backend.app.routes import users
+from backend.app.services.sql_profiler import assert_max_queries
+
+SECRET = "test-secret"
+
+
+@pytest.fixture
+def secret(monkeypatch):
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(auth, "SUPABASE_JWT_SECRET", SECRET)
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+def make_token(exp_in: float = 3600) -> str:
+    sub = str(uuid.uuid4())
+    claims = {"sub": sub, "aud": "authenticated", "exp": int(time.time() + exp_in), "email": f"{sub}@test"}
+    return jwt.encode(claims, SECRET, algorithm="HS256")
+
+
+def authenticate(token: str):
+    with SessionLocal() as db:
+        return get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+
+
+def test_cache_hit_resolves_user_without_select(secret):
+    token = make_token()
+    first = authenticate(token)
+
+    with assert_max_queries(0, "cached token"):
+        second = authenticate(token)
+
+    assert second.id == first.id
+    assert second.supabase_user_id == first.supabase_user_id
+
+
+def test_entry_ttl_is_capped_at_token_exp(secret):
+    token = make_token(exp_in=60)
+    authenticate(token)
+
+    _value, expires_at = token_cache._data[_token_key(token)]
+    exp = jwt.decode(token, options={"verify_signature": False})["exp"]
+    assert expires_at == exp
+    assert expires_at < time.time() + auth.AUTH_CACHE_TTL_SECONDS
+
+
+def test_invalidate_user_cache_evicts_identity(secret):
+    token = make_token()
+    user = authenticate(token)
+    other = make_token()
+    authenticate(other)
+
+    invalidate_user_cache(user.id)
+
+    assert token_cache.get(_token_key(token)) is None
+    assert token_cache.get(_token_key(other)) is not None
+    # Sin entrada en cache vuelve a leer el usuario de la base
+    with pytest.raises(AssertionError):
+        with assert_max_queries(0, "evicted token"):
+            authenticate(token)
+
+
+@pytest.mark.anyio
+async def test_create_user_invalidates_new_id(secret, monkeypatch):
+    evicted = []
+    monkeypatch.setattr(users, "invalidate_user_cache", evicted.append)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/users/", json={"telegram_id": str(uuid.uuid4()), "name": "nuevo"})
+
+    assert response.status_code == 200
+    assert evicted == [response.json()["id"]]
+
+
+def test_delete_where_drops_only_that_user():
+    token_cache.clear()
+    token_cache.set("a1", ({"sub": "a"}, {"id": 1}))
+    token_cache.set("a2", ({"sub": "a"}, {"id": 1}))
+    token_cache.set("b", ({"sub": "b"}, {"id": 2}))
+
+    invalidate_user_cache(1)
+
+    assert token_cache.get("a1") is None
+    assert token_cache.get("a2") is None
+    assert token_cache.get("b") is not None
+
+    invalidate_user_cache()
+    assert len(token_cache) == 0
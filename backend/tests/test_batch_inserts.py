@@ -0,0 +1,53 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_reminder_batch_inserts_valid_rows_in_order(api, api_user):
+    items = [
+        {"text": "uno", "reminder_time": "2030-01-01T09:00:00"},
+        {"text": "sin hora"},
+        {"text": "dos", "reminder_time": "2030-01-02T09:00:00"},
+        "no es un objeto",
+        {"text": "tres", "reminder_time": "2030-01-03T09:00:00"},
+    ]
+
+    response = await api.post(f"/api/reminders/{api_user.id}/batch", json=items)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["text"] for r in body["created"]] == ["uno", "dos", "tres"]
+    ids = [r["id"] for r in body["created"]]
+    assert ids == sorted(ids)
+    assert [e["index"] for e in body["errors"]] == [1, 3]
+    assert body["errors"][0]["errors"][0]["loc"] == ["reminder_time"]
+
+    listed = (await api.get(f"/api/reminders/{api_user.id}")).json()
+    assert [(r["id"], r["text"]) for r in listed] == [(r["id"], r["text"]) for r in body["created"]]
+
+
+async def test_activity_batch_reports_errors_by_index(api, api_user):
+    items = [
+        {"activity_type": "run", "activity_date": "fecha mala"},
+        {"activity_type": "run", "activity_date": "2030-01-01T07:00:00"},
+        {"activity_date": "2030-01-01T08:00:00"},
+        {"activity_type": "swim", "activity_date": "2030-01-01T09:00:00"},
+    ]
+
+    response = await api.post(f"/api/agenda/{api_user.id}/batch", json=items)
+
+    body = response.json()
+    assert [a["activity_type"] for a in body["created"]] == ["run", "swim"]
+    assert all(a["user_id"] == api_user.id for a in body["created"])
+    assert [e["index"] for e in body["errors"]] == [0, 2]
+    assert body["errors"][1]["errors"][0]["loc"] == ["activity_type"]
+
+    summary = (await api.get(f"/api/summary/{api_user.id}")).json()
+    assert summary["total_activities"] == 2
+
+
+async def test_all_invalid_batch_inserts_nothing(api, api_user):
+    response = await api.post(f"/api/reminders/{api_user.id}/batch", json=[{}, {"text": "x"}])
+
+    assert response.json()["created"] == []
+    assert len(response.json()["errors"]) == 2
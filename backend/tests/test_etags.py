@@ -0,0 +1,60 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+REMINDER = {"text": "Caminar", "reminder_time": "2030-01-01T09:00:00"}
+ACTIVITY = {"activity_type": "run", "activity_date": "2030-01-01T07:00:00"}
+
+
+async def revalidate(api, url: str):
+    first = await api.get(url)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    repeat = await api.get(url, headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.headers["ETag"] == etag
+    assert repeat.content == b""
+    return etag
+
+
+async def assert_changed(api, url: str, etag: str):
+    response = await api.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    return response
+
+
+async def test_reminders_etag_changes_after_create_and_update(api, api_user):
+    url = f"/api/reminders/{api_user.id}"
+    etag = await revalidate(api, url)
+
+    created = (await api.post(url, json=REMINDER)).json()
+    response = await assert_changed(api, url, etag)
+    assert [r["text"] for r in response.json()] == ["Caminar"]
+
+    etag = await revalidate(api, url)
+    await api.put(f"{url}/{created['id']}", json={"text": "Correr"})
+    response = await assert_changed(api, url, etag)
+    assert [r["text"] for r in response.json()] == ["Correr"]
+
+
+async def test_reminders_etag_changes_after_batch_insert(api, api_user):
+    url = f"/api/reminders/{api_user.id}"
+    etag = await revalidate(api, url)
+
+    await api.post(f"{url}/batch", json=[REMINDER, REMINDER])
+
+    response = await assert_changed(api, url, etag)
+    assert len(response.json()) == 2
+
+
+async def test_agenda_etag_changes_after_delete(api, api_user):
+    url = f"/api/agenda/{api_user.id}"
+    created = (await api.post(url, json=ACTIVITY)).json()
+    etag = await revalidate(api, url)
+
+    response = await api.delete(f"{url}/{created['id']}")
+    assert response.status_code == 200
+
+    response = await assert_changed(api, url, etag)
+    assert response.json() == []
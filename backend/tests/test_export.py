@@ -0,0 +1,14 @@
+import gzip
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_gzip_export_is_a_gz_file_not_a_transfer_encoding(api, api_user):
+    response = await api.get(f"/api/export/{api_user.id}/activities", params={"format": "csv", "gzip": "true"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    assert "content-encoding" not in response.headers
+    assert 'filename="activities.csv.gz"' in response.headers["content-disposition"]
+    assert gzip.decompress(response.content).startswith(b"id,")
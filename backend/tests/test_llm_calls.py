@@ -0,0 +1,130 @@
+import time
+import asyncio
+import pytest
+from backend.app.services import reminder_intelligence
+from backend.app.services.circuit_breaker import CircuitBreaker
+from backend.app.services.reminder_intelligence import ReminderIntelligence, DEFAULT_ADVICE
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def llm(fake_llm, monkeypatch):
+    monkeypatch.setattr(reminder_intelligence, "LLM_TIMEOUT_SECONDS", 0.3)
+    monkeypatch.setattr(reminder_intelligence, "LLM_QUEUE_TIMEOUT_SECONDS", 1.0)
+    monkeypatch.setattr(ReminderIntelligence, "breaker", CircuitBreaker(failure_threshold=2, reset_timeout=0.3))
+    monkeypatch.setattr(ReminderIntelligence, "_semaphore", None)
+    for counter in ("llm_timeouts", "llm_errors", "llm_shed"):
+        monkeypatch.setattr(ReminderIntelligence, counter, 0)
+    fake_llm.settings.update(latency=0.01, per_item_latency=0.0)
+    # El cliente se crea con el deadline parcheado y queda atado al event loop del test
+    ReminderIntelligence._client = None
+    yield fake_llm
+    if ReminderIntelligence._client is not None:
+        await ReminderIntelligence._client.close()
+        ReminderIntelligence._client = None
+
+
+async def test_successful_call(llm):
+    assert await ReminderIntelligence._complete("hola") == "¡Vamos! 💪"
+    assert ReminderIntelligence.breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_slow_provider_times_out_and_counts_as_failure(llm):
+    llm.settings["latency"] = 1.0
+
+    started = time.monotonic()
+    assert await ReminderIntelligence._complete("hola") is None
+
+    assert time.monotonic() - started < 0.9
+    assert ReminderIntelligence.llm_timeouts == 1
+    assert ReminderIntelligence.breaker.consecutive_failures == 1
+
+
+async def test_breaker_trips_and_rejects_without_calling_provider(llm):
+    llm.settings["failure_rate"] = 1.0
+    for _ in range(2):
+        assert await ReminderIntelligence._complete("hola") is None
+    assert ReminderIntelligence.breaker.state == CircuitBreaker.OPEN
+    requests = llm.counters["requests"]
+
+    result = await ReminderIntelligence.evaluate_context({"streak": 1})
+
+    assert result == DEFAULT_ADVICE
+    assert llm.counters["requests"] == requests
+    assert ReminderIntelligence.breaker.rejected == 1
+
+
+async def test_breaker_recovers_after_reset_timeout(llm):
+    llm.settings["failure_rate"] = 1.0
+    for _ in range(2):
+        await ReminderIntelligence._complete("hola")
+    assert ReminderIntelligence.breaker.state == CircuitBreaker.OPEN
+
+    llm.settings["failure_rate"] = 0.0
+    await asyncio.sleep(0.35)
+    assert await ReminderIntelligence._complete("hola") == "¡Vamos! 💪"
+    assert ReminderIntelligence.breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_failed_probe_reopens_breaker(llm):
+    llm.settings["failure_rate"] = 1.0
+    for _ in range(2):
+        await ReminderIntelligence._complete("hola")
+    await asyncio.sleep(0.35)
+
+    assert await ReminderIntelligence._complete("hola") is None
+    assert ReminderIntelligence.breaker.state == CircuitBreaker.OPEN
+    assert ReminderIntelligence.breaker.trips == 2
+
+
+async def test_queue_wait_is_shed_without_tripping_breaker(llm, monkeypatch):
+    monkeypatch.setattr(reminder_intelligence, "LLM_QUEUE_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(ReminderIntelligence, "_semaphore", asyncio.Semaphore(1))
+    llm.settings["latency"] = 0.2
+
+    results = await asyncio.gather(*[ReminderIntelligence._complete("hola") for _ in range(5)])
+
+    # Solo la primera obtiene cupo; el resto espera más que LLM_QUEUE_TIMEOUT_SECONDS
+    assert results.count("¡Vamos! 💪") == 1
+    assert ReminderIntelligence.llm_shed == 4
+    assert ReminderIntelligence.breaker.state == CircuitBreaker.CLOSED
+    assert ReminderIntelligence.breaker.consecutive_failures == 0
+
+
+async def test_cancelled_call_does_not_count_as_failure(llm):
+    llm.settings["latency"] = 0.2
+    task = asyncio.create_task(ReminderIntelligence._complete("hola"))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert ReminderIntelligence.breaker.consecutive_failures == 0
+    assert ReminderIntelligence.breaker.state == CircuitBreaker.CLOSED
+
+
+async def test_contexts_are_batched_one_result_each(llm, monkeypatch):
+    monkeypatch.setattr(reminder_intelligence, "LLM_BATCH_SIZE", 3)
+
+    results = await ReminderIntelligence.evaluate_contexts([{"streak": n} for n in range(7)])
+
+    # 7 contextos en lotes de 3: tres llamadas, un resultado por contexto
+    assert llm.counters["requests"] == 3
+    assert [r["advice"] for r in results] == ["Sigue así"] * 7
+
+
+@pytest.mark.parametrize("content", ['{"messages": "texto"}', '{"messages": ', '["uno", "dos"]', '{}'])
+async def test_malformed_tone_pool_is_empty(llm, monkeypatch, content):
+    async def complete(prompt, **kwargs):
+        return content
+
+    monkeypatch.setattr(ReminderIntelligence, "_complete", complete)
+
+    assert await ReminderIntelligence._generate_tone_pool(3, 0) == []
+
+
+async def test_tone_pool_parses_messages_list(llm):
+    pool = await ReminderIntelligence._generate_tone_pool(3, 0)
+
+    assert pool == ["¡Vamos! 💪", "Tú puedes ⚡"]
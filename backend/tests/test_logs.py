@@ -0,0 +1,41 @@
+import queue
+import logging
+from backend.app.services.logs import NonBlockingQueueHandler
+
+
+class Recorder(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_queue_handler_leaves_record_intact_for_other_handlers():
+    log_queue = queue.SimpleQueue()
+    recorder = Recorder()
+    logger = logging.getLogger("test_logs.shared")
+    logger.propagate = False
+    handler = NonBlockingQueueHandler(log_queue)
+    logger.addHandler(handler)
+    logger.addHandler(recorder)
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("fallo %s", "x")
+    finally:
+        logger.removeHandler(handler)
+        logger.removeHandler(recorder)
+
+    queued = log_queue.get_nowait()
+    assert queued.getMessage() == "fallo x"
+    assert queued.args is None and queued.exc_info is None
+    assert "ValueError: boom" in queued.exc_text
+
+    # El registro que ve el otro handler conserva args y exc_info
+    shared = recorder.records[0]
+    assert shared is not queued
+    assert shared.args == ("x",)
+    assert shared.exc_info[0] is ValueError
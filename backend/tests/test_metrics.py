@@ -0,0 +1,46 @@
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from backend.app.main import app
+from backend.app.services.metrics import instrument_engine
+from backend.app.services.telegram_updates import UpdateProcessor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_telegram_queue_metrics_are_exported():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    for name in ("telegram_updates_pending", "telegram_update_lag_seconds_count", "telegram_outbox_pending"):
+        assert name in response.text
+
+
+async def test_update_lag_is_observed_per_update():
+    async def handler(update):
+        pass
+
+    before = REGISTRY.get_sample_value("telegram_update_lag_seconds_count") or 0
+    await UpdateProcessor(handler).process_batch([
+        {"update_id": n, "message": {"chat": {"id": 1}, "text": "hola"}} for n in range(3)
+    ])
+
+    assert REGISTRY.get_sample_value("telegram_update_lag_seconds_count") == before + 3
+
+
+def test_pool_metrics_survive_engine_dispose():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, "dispose-test")
+
+    for _ in range(2):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        # dispose() recrea el pool: la instrumentación debe seguir en el nuevo
+        engine.dispose()
+
+    labels = {"engine": "dispose-test"}
+    assert REGISTRY.get_sample_value("db_pool_connect_seconds_count", labels) == 2
+    assert REGISTRY.get_sample_value("db_pool_held_seconds_count", labels) == 2
+    assert REGISTRY.get_sample_value("db_pool_checked_out", labels) == 0
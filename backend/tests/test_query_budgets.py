@@ -0,0 +1,96 @@
+"""
+Presupuesto de consultas de las rutas calientes: un N+1 o una consulta extra que se cuele
+en un cambio hace fallar el test con el listado de sentencias y su origen.
+"""
+import uuid
+from datetime import datetime, timedelta
+import httpx
+import pytest
+from sqlalchemy import insert, delete
+from backend.app.main import app
+from backend.app.auth import get_current_user
+from backend.app.database import Base, engine, async_engine, AsyncSessionLocal
+from backend.app.models import User, Reminder, Activity, UserStats
+from backend.app.services.result_cache import result_cache
+from backend.app.services.sql_profiler import assert_max_queries
+
+pytestmark = pytest.mark.anyio
+
+HISTORY = 60
+
+
+@pytest.fixture(scope="module")
+def user():
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            insert(User).values(supabase_user_id=f"test-{uuid.uuid4()}", name="test").returning(User.id)
+        ).scalar_one()
+        base = datetime(2030, 1, 1, 9, 0)
+        conn.execute(insert(Reminder), [
+            {"user_id": user_id, "text": f"r{i}", "reminder_time": base + timedelta(hours=i), "completed": i % 3 == 0}
+            for i in range(HISTORY)
+        ])
+        conn.execute(insert(Activity), [
+            {"user_id": user_id, "activity_type": "run", "activity_date": base - timedelta(hours=i)}
+            for i in range(HISTORY)
+        ])
+        conn.execute(insert(UserStats).values(
+            user_id=user_id, total_reminders=HISTORY, completed_reminders=HISTORY // 3, total_activities=HISTORY
+        ))
+    user = User(id=user_id, supabase_user_id=None, name="test")
+    yield user
+    with engine.begin() as conn:
+        for model in (Activity, Reminder, UserStats):
+            conn.execute(delete(model).where(model.user_id == user_id))
+        conn.execute(delete(User).where(User.id == user_id))
+
+
+@pytest.fixture
+async def client(user):
+    app.dependency_overrides[get_current_user] = lambda: user
+    result_cache.invalidate_user(user.id)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.pop(get_current_user, None)
+    # Las conexiones del pool async quedan atadas al event loop del test
+    await async_engine.dispose()
+
+
+async def test_reminder_pages(client, user):
+    with assert_max_queries(2, "GET /api/reminders first page"):
+        first = await client.get(f"/api/reminders/{user.id}", params={"limit": 20})
+    assert first.status_code == 200
+    assert len(first.json()) == 20
+
+    with assert_max_queries(2, "GET /api/reminders next page"):
+        second = await client.get(f"/api/reminders/{user.id}",
+                                  params={"limit": 20, "cursor": first.headers["X-Next-Cursor"]})
+    assert second.json()[0]["text"] == "r20"
+
+
+async def test_agenda_first_page(client, user):
+    with assert_max_queries(2, "GET /api/agenda"):
+        response = await client.get(f"/api/agenda/{user.id}")
+    assert response.status_code == 200
+    assert len(response.json()) == 50
+
+
+async def test_summary(client, user):
+    with assert_max_queries(4, "GET /api/summary"):
+        response = await client.get(f"/api/summary/{user.id}")
+    assert response.status_code == 200
+    assert response.json()["total_reminders"] == HISTORY
+
+    # Segunda lectura sin cambios: sale del cache de resultados sin tocar el SQL de la ruta
+    with assert_max_queries(1, "GET /api/summary cached") as profile:
+        await client.get(f"/api/summary/{user.id}")
+    assert len(profile.statements) == 1
+
+
+async def test_assert_max_queries_reports_n_plus_one(client):
+    with pytest.raises(AssertionError, match="3x"):
+        with assert_max_queries(10, "n+1"):
+            async with AsyncSessionLocal() as db:
+                for reminder_id in range(3):
+                    await db.get(Reminder, reminder_id)
@@ -0,0 +1,104 @@
+import time
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert, select, update
+from backend.app.database import engine, async_engine
+from backend.app.models import User, Reminder
+from backend.app.models.reminder import ReactionStatus
+from backend.app.services import reminder_scheduler, telegram_outbox
+from backend.app.services.reminder_scheduler import ReminderScheduler
+from backend.app.services.telegram_outbox import outbox
+
+pytestmark = pytest.mark.anyio
+
+CHAT_ID = 4242
+
+
+@pytest.fixture
+async def scheduler(fake_tg, api_user, monkeypatch):
+    monkeypatch.setattr(reminder_scheduler, "SCHEDULER_POLL_SECONDS", 0.1)
+    monkeypatch.setattr(telegram_outbox, "OUTBOX_CHAT_RATE", 1000.0)
+    with engine.begin() as conn:
+        conn.execute(update(User).where(User.id == api_user.id).values(telegram_id=str(CHAT_ID)))
+    scheduler = ReminderScheduler()
+    yield scheduler
+    await scheduler.stop()
+    await outbox.drain()
+    # Las conexiones del pool async quedan atadas al event loop del test
+    await async_engine.dispose()
+
+
+def add_reminder(user_id: int, text: str, at: datetime, **values) -> int:
+    with engine.begin() as conn:
+        return conn.execute(insert(Reminder).values(
+            user_id=user_id, text=text, reminder_time=at, last_reaction_status=ReactionStatus.PENDING, **values
+        ).returning(Reminder.id)).scalar_one()
+
+
+def notified_at(reminder_id: int):
+    with engine.connect() as conn:
+        metadata = conn.execute(select(Reminder.context_metadata).where(Reminder.id == reminder_id)).scalar_one()
+    return (metadata or {}).get("last_notified_at")
+
+
+async def wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.02)
+
+
+async def test_due_reminder_is_sent_and_marked(scheduler, fake_tg, api_user):
+    now = datetime.now()
+    due = add_reminder(api_user.id, "tomar agua", now - timedelta(seconds=1))
+    add_reminder(api_user.id, "hecho", now - timedelta(seconds=1), completed=True)
+    add_reminder(api_user.id, "mañana", now + timedelta(days=1))
+
+    await scheduler.start()
+    await wait_for(lambda: len(fake_tg.sent) == 1)
+
+    message = fake_tg.sent[0]
+    assert message["chat_id"] == CHAT_ID
+    assert message["text"] == "⏰ tomar agua"
+    assert message["reply_markup"]["inline_keyboard"][0][0]["callback_data"] == f"done:{due}"
+    assert notified_at(due) is not None
+    assert scheduler.stats()["fired"] == 1
+    # El de mañana queda fuera de la ventana cargada
+    assert scheduler.stats()["scheduled"] == 0
+
+
+async def test_scheduled_reminder_fires_at_its_time(scheduler, fake_tg, api_user):
+    await scheduler.start()
+    at = datetime.now() + timedelta(seconds=0.5)
+    reminder_id = add_reminder(api_user.id, "estirar", at)
+    scheduler.schedule(reminder_id, at)
+
+    await wait_for(lambda: len(fake_tg.sent) == 1)
+
+    assert time.time() >= at.timestamp()
+    assert notified_at(reminder_id) is not None
+
+
+async def test_failed_commit_sends_nothing_and_retries(scheduler, fake_tg, api_user, monkeypatch):
+    calls = []
+    bump = reminder_scheduler.bump_user_stats
+
+    async def flaky_bump(db, user_id, **deltas):
+        calls.append(user_id)
+        if len(calls) == 1:
+            raise RuntimeError("base caída")
+        await bump(db, user_id, **deltas)
+
+    monkeypatch.setattr(reminder_scheduler, "bump_user_stats", flaky_bump)
+    reminder_id = add_reminder(api_user.id, "meditar", datetime.now() - timedelta(seconds=1))
+
+    await scheduler.start()
+    # El primer intento falla antes del commit: nada sale al outbox hasta el reintento
+    await wait_for(lambda: len(calls) == 1)
+    assert fake_tg.sent == []
+    await wait_for(lambda: len(fake_tg.sent) == 1)
+
+    assert len(calls) == 2
+    assert notified_at(reminder_id) is not None
+    assert scheduler.stats()["fired"] == 1
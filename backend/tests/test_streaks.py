@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+import pytest
+from backend.app.database import AsyncSessionLocal, async_engine
+from backend.app.models import UserStats
+from backend.app.services.streaks import record_completion, record_failure, effective_streak, get_streak
+from backend.app.services.reminder_intelligence import ReminderIntelligence
+
+pytestmark = pytest.mark.anyio
+
+DAY = date(2030, 3, 10)
+
+
+@pytest.fixture
+async def db(api_user):
+    async with AsyncSessionLocal() as session:
+        yield session
+    await async_engine.dispose()
+
+
+async def stats(db, user_id) -> UserStats:
+    await db.commit()
+    db.expire_all()
+    return await db.get(UserStats, user_id)
+
+
+async def test_streak_counts_consecutive_days(db, api_user):
+    await record_completion(db, api_user.id, DAY)
+    assert (await stats(db, api_user.id)).current_streak == 1
+
+    # Otra completada el mismo día no suma
+    await record_completion(db, api_user.id, DAY)
+    assert (await stats(db, api_user.id)).current_streak == 1
+
+    await record_completion(db, api_user.id, DAY + timedelta(days=1))
+    await record_completion(db, api_user.id, DAY + timedelta(days=2))
+    row = await stats(db, api_user.id)
+    assert row.current_streak == 3
+    assert row.last_completion_date == DAY + timedelta(days=2)
+
+
+async def test_gap_resets_streak(db, api_user):
+    for offset in range(3):
+        await record_completion(db, api_user.id, DAY + timedelta(days=offset))
+
+    await record_completion(db, api_user.id, DAY + timedelta(days=5))
+
+    assert (await stats(db, api_user.id)).current_streak == 1
+
+
+async def test_streak_expires_when_read_after_a_missed_day(db, api_user):
+    await record_completion(db, api_user.id, DAY)
+    await record_completion(db, api_user.id, DAY + timedelta(days=1))
+    row = await stats(db, api_user.id)
+
+    assert effective_streak(row, DAY + timedelta(days=2)) == 2
+    assert effective_streak(row, DAY + timedelta(days=3)) == 0
+    assert effective_streak(None, DAY) == 0
+
+
+async def test_failures_count_up_and_reset_on_completion(db, api_user):
+    for _ in range(3):
+        await record_failure(db, api_user.id)
+    await db.commit()
+    assert await get_streak(db, api_user.id) == (0, 3)
+
+    await record_completion(db, api_user.id)
+    row = await stats(db, api_user.id)
+    assert row.recent_failures == 0
+    assert row.current_streak == 1
+
+
+@pytest.mark.parametrize("streak, failures, bucket", [
+    (0, 0, (0, 0)), (2, 0, (1, 0)), (7, 0, (3, 0)), (45, 0, (5, 0)), (3, 1, (2, 1)), (3, 5, (2, 2)),
+])
+async def test_streak_and_failures_pick_the_tone_pool_bucket(streak, failures, bucket, monkeypatch):
+    monkeypatch.setattr(ReminderIntelligence, "_tone_pools", {bucket: [f"pool {bucket}"]})
+    monkeypatch.setattr(ReminderIntelligence, "tone_pool_hits", 0)
+
+    tone = await ReminderIntelligence.get_dynamic_tone(streak, failures, f"texto {streak}-{failures}")
+
+    assert tone == f"pool {bucket}"
+    assert ReminderIntelligence.tone_pool_hits == 1
@@ -0,0 +1,122 @@
+import time
+import asyncio
+import pytest
+from backend.app.services import telegram_outbox
+from backend.app.services.telegram_outbox import TelegramOutbox
+from backend.app.services.telegram_client import TelegramClient
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def fast_limits(monkeypatch):
+    # Sin esperas de 1 msg/s por chat; los buckets leen estos valores al crearse
+    monkeypatch.setattr(telegram_outbox, "OUTBOX_GLOBAL_RATE", 1000.0)
+    monkeypatch.setattr(telegram_outbox, "OUTBOX_CHAT_RATE", 1000.0)
+    monkeypatch.setattr(telegram_outbox, "OUTBOX_BACKOFF_BASE", 0.01)
+
+
+async def wait_idle(outbox: TelegramOutbox, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while outbox.pending or outbox.stats()["active_chats"]:
+        assert time.monotonic() < deadline, outbox.stats()
+        await asyncio.sleep(0.01)
+
+
+def message(chat_id: int, text: str) -> dict:
+    return {"chat_id": chat_id, "text": text}
+
+
+async def test_429_waits_retry_after_and_resends(fake_tg, fast_limits):
+    fake_tg.settings.update(rate_limit_every=3, retry_after=0.3)
+    outbox = TelegramOutbox()
+
+    # El tercer envío recibe 429 con retry_after=0.3
+    started = time.monotonic()
+    for n in range(3):
+        outbox.enqueue(1, "sendMessage", message(1, f"m{n}"))
+    await wait_idle(outbox)
+
+    assert [m["text"] for m in fake_tg.sent] == ["m0", "m1", "m2"]
+    assert outbox.rate_limited == 1
+    assert outbox.dropped == 0
+    assert time.monotonic() - started >= 0.3
+
+
+async def test_per_chat_order_survives_retries(fake_tg, fast_limits):
+    fake_tg.settings.update(rate_limit_every=7, retry_after=0.05)
+    fake_tg.settings["failures"]["sendMessage"] = 3
+    outbox = TelegramOutbox()
+
+    for n in range(10):
+        for chat_id in (1, 2, 3):
+            outbox.enqueue(chat_id, "sendMessage", message(chat_id, f"{chat_id}-{n}"))
+    await wait_idle(outbox)
+
+    assert len(fake_tg.sent) == 30
+    for chat_id in (1, 2, 3):
+        texts = [m["text"] for m in fake_tg.sent if m["chat_id"] == chat_id]
+        assert texts == [f"{chat_id}-{n}" for n in range(10)]
+    assert outbox.retried == 3
+    assert outbox.rate_limited > 0
+
+
+async def test_per_chat_rate_limit(fake_tg, monkeypatch):
+    monkeypatch.setattr(telegram_outbox, "OUTBOX_CHAT_RATE", 10.0)
+    monkeypatch.setattr(telegram_outbox, "OUTBOX_CHAT_BURST", 1.0)
+    outbox = TelegramOutbox()
+
+    started = time.monotonic()
+    for n in range(4):
+        outbox.enqueue(1, "sendMessage", message(1, f"m{n}"))
+    await wait_idle(outbox)
+
+    # Ráfaga de 1 y 10 msg/s: los otros tres esperan ~0.1 s cada uno
+    assert time.monotonic() - started >= 0.28
+    assert len(fake_tg.sent) == 4
+
+
+async def test_retry_cap_drops_message_and_continues(fake_tg, fast_limits, monkeypatch):
+    monkeypatch.setattr(telegram_outbox, "OUTBOX_MAX_RETRIES", 2)
+    fake_tg.settings["failures"]["sendMessage"] = 3
+    outbox = TelegramOutbox()
+
+    outbox.enqueue(1, "sendMessage", message(1, "lost"))
+    outbox.enqueue(1, "sendMessage", message(1, "next"))
+    await wait_idle(outbox)
+
+    # Un intento más OUTBOX_MAX_RETRIES reintentos, luego se descarta y sigue la cola
+    assert fake_tg.calls["sendMessage"] == 4
+    assert outbox.retried == 2
+    assert outbox.dropped == 1
+    assert [m["text"] for m in fake_tg.sent] == ["next"]
+
+
+async def test_endless_rate_limits_are_capped(fake_tg, fast_limits, monkeypatch):
+    monkeypatch.setattr(telegram_outbox, "OUTBOX_MAX_RATE_LIMITS", 2)
+    fake_tg.settings.update(rate_limit_every=1, retry_after=0.01)
+    outbox = TelegramOutbox()
+
+    outbox.enqueue(1, "sendMessage", message(1, "m0"))
+    await wait_idle(outbox)
+
+    # Primer intento más OUTBOX_MAX_RATE_LIMITS reintentos tras 429
+    assert fake_tg.calls["sendMessage"] == 3
+    assert outbox.rate_limited == 3
+    assert outbox.dropped == 1
+
+
+async def test_unexpected_send_error_drops_head_and_keeps_chat_moving(fake_tg, fast_limits):
+    async def send(method, payload):
+        if payload["text"] == "bad":
+            raise ValueError("payload roto")
+        return await TelegramClient.call(method, payload)
+
+    outbox = TelegramOutbox(send=send)
+    outbox.enqueue(1, "sendMessage", message(1, "bad"))
+    outbox.enqueue(1, "sendMessage", message(1, "next"))
+    await wait_idle(outbox)
+
+    assert outbox.pending == 0
+    assert outbox.dropped == 1
+    assert [m["text"] for m in fake_tg.sent] == ["next"]
@@ -0,0 +1,104 @@
+import time
+import asyncio
+import pytest
+from backend.app.services import telegram_polling
+from backend.app.services.telegram_polling import TelegramPoller
+
+pytestmark = pytest.mark.anyio
+
+
+class RecordingProcessor:
+    """
+    Reemplaza a UpdateProcessor: el poller solo necesita process_batch.
+    """
+
+    def __init__(self):
+        self.update_ids = []
+
+    async def process_batch(self, batch):
+        self.update_ids += [update["update_id"] for update in batch]
+
+
+@pytest.fixture
+def polling(fake_tg, monkeypatch):
+    monkeypatch.setattr(telegram_polling, "TELEGRAM_INGEST", "polling")
+    monkeypatch.setattr(telegram_polling, "POLL_TIMEOUT_SECONDS", 1)
+    monkeypatch.setattr(telegram_polling, "POLL_LIMIT", 4)
+    monkeypatch.setattr(telegram_polling, "POLL_ERROR_BACKOFF_SECONDS", 0.02)
+    return fake_tg
+
+
+async def wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.02)
+
+
+async def test_offset_advances_past_each_batch(polling):
+    polling.push_updates(polling.backlog(chats=3, per_chat=3))
+    processor = RecordingProcessor()
+    poller = TelegramPoller(processor)
+
+    await poller.start()
+    await wait_for(lambda: len(processor.update_ids) == 9)
+    await poller.stop()
+
+    assert processor.update_ids == list(range(1, 10))
+    assert poller.offset == 10
+    # POLL_LIMIT=4: tres lotes
+    assert poller.batches == 3
+    # stop() confirma el último offset con un getUpdates final
+    assert polling.state["confirmed"] == 10
+
+
+async def test_restart_resumes_after_confirmed_offset(polling):
+    polling.push_updates(polling.backlog(chats=2, per_chat=2))
+    first = RecordingProcessor()
+    poller = TelegramPoller(first)
+    await poller.start()
+    await wait_for(lambda: len(first.update_ids) == 4)
+    await poller.stop()
+
+    # Un proceso nuevo arranca sin offset: solo debe ver lo que llegó después
+    polling.push_updates(polling.backlog(chats=1, per_chat=2))
+    second = RecordingProcessor()
+    restarted = TelegramPoller(second)
+    await restarted.start()
+    await wait_for(lambda: len(second.update_ids) == 2)
+    await restarted.stop()
+
+    assert first.update_ids == [1, 2, 3, 4]
+    assert second.update_ids == [5, 6]
+
+
+async def test_delete_webhook_failures_are_retried(polling):
+    polling.settings["failures"]["deleteWebhook"] = 3
+    polling.push_updates(polling.backlog(chats=1, per_chat=1))
+    processor = RecordingProcessor()
+    poller = TelegramPoller(processor)
+
+    await poller.start()
+    await wait_for(lambda: processor.update_ids == [1])
+    assert poller.stats()["running"]
+    await poller.stop()
+
+    assert polling.calls["deleteWebhook"] == 4
+    assert poller.errors == 3
+
+
+async def test_get_updates_errors_back_off_and_keep_offset(polling):
+    polling.push_updates(polling.backlog(chats=1, per_chat=2))
+    processor = RecordingProcessor()
+    poller = TelegramPoller(processor)
+    await poller.start()
+    await wait_for(lambda: len(processor.update_ids) == 2)
+
+    polling.settings["failures"]["getUpdates"] = 2
+    await wait_for(lambda: poller.errors == 2)
+    polling.push_updates(polling.backlog(chats=1, per_chat=1))
+    await wait_for(lambda: len(processor.update_ids) == 3)
+    await poller.stop()
+
+    # Sin duplicados: el offset no se perdió con los errores
+    assert processor.update_ids == [1, 2, 3]
@@ -7,7 +7,9 @@ import { agendaApi, Activity } from '@/services/api';
 
 export default function Agenda() {
   const [activities, setActivities] = useState<Activity[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [newActivity, setNewActivity] = useState({
     activity_type: '',
@@ -20,10 +22,12 @@ export default function Agenda() {
     loadActivities();
   }, []);
 
+  // Solo la primera pagina; el resto se pide con "Cargar mas"
   const loadActivities = async () => {
     try {
-      const response = await agendaApi.getAll(userId);
-      setActivities(response.data);
+      const page = await agendaApi.getPage(userId);
+      setActivities(page.items);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.log('Error loading activities');
     } finally {
@@ -31,6 +35,20 @@ export default function Agenda() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const page = await agendaApi.getPage(userId, nextCursor);
+      setActivities((current) => [...current, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.log('Error loading activities');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleCreate = async () => {
     if (!newActivity.activity_type || !newActivity.activity_date) return;
     try {
@@ -91,6 +109,13 @@ export default function Agenda() {
                 <p className="text-gray-500 text-center">No hay actividades programadas</p>
               </Card>
             )}
+            {nextCursor && (
+              <div className="flex justify-center">
+                <Button variant="secondary" onClick={loadMore} disabled={loadingMore}>
+                  {loadingMore ? 'Cargando...' : 'Cargar mas'}
+                </Button>
+              </div>
+            )}
           </div>
         )}
 
@@ -57,14 +57,27 @@ export interface Summary {
   recent_reminders: Reminder[];
 }
 
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+// Paginacion keyset del backend: el cursor de la pagina siguiente llega en X-Next-Cursor
+async function getPage<T>(url: string, cursor?: string | null): Promise<Page<T>> {
+  const response = await api.get<T[]>(url, { params: cursor ? { cursor } : undefined });
+  const nextCursor = response.headers['x-next-cursor'] as string | undefined;
+  return { items: response.data, nextCursor: nextCursor ?? null };
+}
+
 export const userApi = {
-  getAll: () => api.get<User[]>('/api/users'),
+  getPage: (cursor?: string | null) => getPage<User>('/api/users', cursor),
   getById: (id: string | number) => api.get<User>(`/api/users/${id}`),
   create: (data: Partial<User>) => api.post<User>('/api/users', data),
 };
 
 export const reminderApi = {
-  getAll: (userId: string | number) => api.get<Reminder[]>(`/api/reminders/${userId}`),
+  getPage: (userId: string | number, cursor?: string | null) =>
+    getPage<Reminder>(`/api/reminders/${userId}`, cursor),
   create: (userId: string | number, data: { text: string; reminder_time: string }) =>
     api.post<Reminder>(`/api/reminders/${userId}`, data),
   update: (userId: string | number, reminderId: number, data: Partial<Reminder>) =>
@@ -74,7 +87,8 @@ export const reminderApi = {
 };
 
 export const agendaApi = {
-  getAll: (userId: string | number) => api.get<Activity[]>(`/api/agenda/${userId}`),
+  getPage: (userId: string | number, cursor?: string | null) =>
+    getPage<Activity>(`/api/agenda/${userId}`, cursor),
   create: (userId: string | number, data: { activity_type: string; description?: string; activity_date: string }) =>
     api.post<Activity>(`/api/agenda/${userId}`, data),
   delete: (userId: string | number, activityId: number) =>